@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Análisis en lote de las válidas de una carpeta.
+Busca todos los Excel de válidas bajo una carpeta (ej. Informes/Motocross/Primer semestre),
+los analiza en un grupo de procesos con analizar_valida y escribe el JSON de cada
+uno junto a su Excel (datos_<nombre>.json, como generar_informe_completo.ps1).
+Al final muestra un resumen con el tiempo de cada archivo.
+
+Uso: python Informes/analizar_lote.py <carpeta> [--procesos N] [--modo matriz|filas] ...
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_excel import DIRECTORIO_CACHE
+from estado_temporada import estado_valida, fin_de_temporada, guardar_estado, opciones_estado, ruta_estado
+import analizar_valida
+
+def buscar_validas(carpeta, patron='.xlsx'):
+    """
+    Retorna las rutas de los Excel bajo la carpeta, ordenadas. Se omiten los
+    archivos temporales de Excel (~$...) y la carpeta de la caché.
+    """
+    rutas = []
+    for raiz, carpetas, archivos in os.walk(carpeta):
+        carpetas[:] = sorted(c for c in carpetas if os.path.join(raiz, c) != DIRECTORIO_CACHE and not c.startswith('.'))
+        for archivo in sorted(archivos):
+            if archivo.lower().endswith(patron) and not archivo.startswith('~$'):
+                rutas.append(os.path.join(raiz, archivo))
+    return rutas
+
+def ruta_json(excel_path):
+    """
+    Ruta del JSON de una válida: datos_<nombre>.json en la carpeta del Excel.
+    """
+    carpeta, archivo = os.path.split(excel_path)
+    return os.path.join(carpeta, f"datos_{os.path.splitext(archivo)[0]}.json")
+
+def opciones_del_estado(opciones):
+    """
+    Opciones del análisis que se guardan en el estado de cada válida. Sin
+    fecha de referencia se usa el fin de la temporada, no la de hoy: la fecha
+    es parte de la vigencia del estado.
+    """
+    return opciones_estado(opciones.get('fecha_referencia') or fin_de_temporada(),
+                           opciones.get('limites_edad', analizar_valida.LIMITES_EDAD),
+                           opciones.get('modo', 'matriz'), opciones.get('modalidad'))
+
+def analizar_archivo(excel_path, opciones, guardar_estados=False):
+    """
+    Analiza una válida y escribe su JSON (y su estado para los totales de
+    temporada si guardar_estados es True). Se ejecuta en un proceso del grupo,
+    así que la salida en consola se captura y se retorna junto al resultado
+    para no mezclar los mensajes de varios archivos.
+    """
+    inicio = time.perf_counter()
+    salida = io.StringIO()
+    resultado = {'excel': excel_path, 'json': ruta_json(excel_path), 'error': None}
+    try:
+        with contextlib.redirect_stdout(salida):
+            resultados = analizar_valida.extraer_datos_excel(excel_path, **opciones)
+            datos_json = analizar_valida.generar_json(resultados, resultado['json'])
+            if guardar_estados:
+                estado = estado_valida(resultados, excel_path, opciones_del_estado(opciones))
+                guardar_estado(estado, ruta_estado(excel_path))
+        resultado['pilotos_unicos'] = datos_json['total_pilotos_unicos']
+        resultado['participaciones'] = datos_json['total_participaciones']
+    except Exception as e:
+        resultado['error'] = f"{type(e).__name__}: {e}"
+    resultado['segundos'] = time.perf_counter() - inicio
+    resultado['salida'] = salida.getvalue()
+    return resultado
+
+def analizar_lote(rutas, procesos=None, guardar_estados=False, **opciones):
+    """
+    Analiza las válidas en un grupo de procesos (por defecto uno por núcleo)
+    y retorna los resultados en el mismo orden de las rutas.
+    """
+    if guardar_estados and not opciones.get('fecha_referencia'):
+        # Las edades del JSON y del estado se calculan con la misma fecha
+        opciones['fecha_referencia'] = fin_de_temporada()
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(rutas) <= 1:
+        return [analizar_archivo(ruta, opciones, guardar_estados) for ruta in rutas]
+    with ProcessPoolExecutor(max_workers=min(procesos, len(rutas))) as grupo:
+        return list(grupo.map(analizar_archivo, rutas, [opciones] * len(rutas), [guardar_estados] * len(rutas)))
+
+def imprimir_resumen(resultados, carpeta, segundos_total):
+    """
+    Muestra el tiempo y los totales de cada archivo.
+    """
+    print("\n" + "=" * 80)
+    print("RESUMEN DEL LOTE")
+    print("=" * 80)
+    for resultado in resultados:
+        nombre = os.path.relpath(resultado['excel'], carpeta)
+        if resultado['error']:
+            print(f"  [ERROR] {nombre} ({resultado['segundos']:.2f} s): {resultado['error']}")
+        else:
+            print(f"  [OK] {nombre} ({resultado['segundos']:.2f} s): "
+                  f"{resultado['pilotos_unicos']} pilotos únicos, {resultado['participaciones']} participaciones")
+    errores = sum(1 for resultado in resultados if resultado['error'])
+    suma = sum(resultado['segundos'] for resultado in resultados)
+    print(f"\n- Archivos: {len(resultados)} ({errores} con error)")
+    print(f"- Tiempo total: {segundos_total:.2f} s (suma por archivo: {suma:.2f} s)")
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analiza todas las válidas de una carpeta y genera sus JSON")
+    parser.add_argument('carpeta', help="Carpeta donde buscar los Excel de las válidas (se incluyen subcarpetas)")
+    parser.add_argument('--procesos', type=int, default=0,
+                        help="Cantidad de procesos (por defecto: uno por núcleo)")
+    parser.add_argument('--detalle', action='store_true',
+                        help="Mostrar la salida completa del análisis de cada archivo")
+    parser.add_argument('--estados', action='store_true',
+                        help="Guardar también estado_<nombre>.json para los totales de temporada")
+    parser.add_argument('--modo', choices=['matriz', 'filas'], default='matriz',
+                        help="Método de detección de participaciones (por defecto: matriz)")
+    parser.add_argument('--fecha-referencia', type=lambda v: datetime.strptime(v, '%Y-%m-%d'), default=None,
+                        help="Fecha para calcular edades, ej. fin de temporada (por defecto: hoy; "
+                             "con --estados, el 31 de diciembre del año en curso)")
+    parser.add_argument('--modalidad', default=None,
+                        help="Modalidad de las válidas, ej. Motocross (por defecto: nombre de cada hoja)")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="Leer los Excel sin usar la caché de libros ya leídos")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Leer los Excel por bloques de filas, sin cargar cada libro completo")
+    args = parser.parse_args()
+
+    rutas = buscar_validas(args.carpeta)
+    if not rutas:
+        print(f"No se encontraron archivos Excel en {args.carpeta}")
+        sys.exit(1)
+
+    print(f"Analizando {len(rutas)} válidas de {args.carpeta}...")
+    inicio = time.perf_counter()
+    # La fecha de referencia se fija una vez para que todas las válidas usen la misma;
+    # los estados usan el fin de temporada para seguir vigentes los días siguientes
+    fecha_referencia = args.fecha_referencia or (fin_de_temporada() if args.estados else datetime.now())
+    resultados = analizar_lote(rutas, procesos=args.procesos, guardar_estados=args.estados, modo=args.modo,
+                               fecha_referencia=fecha_referencia,
+                               modalidad=args.modalidad, usar_cache=not args.sin_cache,
+                               streaming=args.streaming)
+    segundos_total = time.perf_counter() - inicio
+
+    if args.detalle:
+        for resultado in resultados:
+            print(f"\n--- {resultado['excel']} ---")
+            print(resultado['salida'], end='')
+
+    imprimir_resumen(resultados, args.carpeta, segundos_total)
+    if any(resultado['error'] for resultado in resultados):
+        sys.exit(1)
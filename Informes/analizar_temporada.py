@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Totales de semestre o de temporada a partir de los estados de las válidas.
+Cada válida de la carpeta (ej. Informes/Motocross para la temporada o
+Informes/Motocross/Primer semestre para un semestre) se analiza solo si su
+estado (estado_<nombre>.json) no existe o está desactualizado; las demás se
+toman del estado guardado. Luego los estados se combinan con conteos de
+licencias únicas exactos y se genera un JSON con la forma de datos_<válida>.json.
+
+Uso: python Informes/analizar_temporada.py <carpeta> <ruta_output_json> [--por modalidad|valida|hoja] ...
+Ejemplo: python Informes/analizar_temporada.py "Informes/Motocross" "Informes/Motocross/datos_temporada.json" --fecha-referencia 2025-12-31
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estado_temporada import AGRUPACIONES, cargar_estado, combinar_estados, estado_vigente, fin_de_temporada, ruta_estado
+from conteo_aproximado import PRECISION, HyperLogLog, ResumenAproximado
+from base_participaciones import abrir_base, insertar_valida
+from analizar_lote import analizar_lote, buscar_validas, imprimir_resumen, opciones_del_estado
+import analizar_valida
+
+def resumen_aproximado(estados, por='modalidad', precision=PRECISION):
+    """
+    Construye un ResumenAproximado (conteo_aproximado) uniendo los estados de
+    las válidas una por una, sin armar la tabla combinada de todas.
+    """
+    resumen = ResumenAproximado(precision)
+    for estado in estados:
+        resumen.agregar(combinar_estados([estado], por=por))
+    return resumen
+
+def analizar_temporada(rutas, output_json, por='modalidad', procesos=None, forzar=False,
+                       conteo='exacto', precision=PRECISION, ruta_resumen=None, base=None, temporada=None,
+                       **opciones):
+    """
+    Analiza las válidas sin estado vigente, combina los estados de todas y
+    escribe el JSON de totales. Retorna (datos_json, resultados del lote).
+    
+    conteo: 'exacto' (por defecto) o 'aproximado' (HyperLogLog con la
+    precisión dada). En modo aproximado el resumen se puede guardar en
+    ruta_resumen para unirlo después con el de otras temporadas.
+    base: ruta de una base SQLite (base_participaciones) donde guardar las
+    válidas con la temporada indicada.
+    """
+    if conteo not in ('exacto', 'aproximado'):
+        raise ValueError(f"Conteo no soportado: {conteo}")
+    if not opciones.get('fecha_referencia'):
+        opciones['fecha_referencia'] = fin_de_temporada(temporada)
+
+    opciones_estado = opciones_del_estado(opciones)
+    estados = {}
+    if not forzar:
+        for ruta in rutas:
+            estado = estado_vigente(ruta_estado(ruta), ruta, opciones_estado)
+            if estado is not None:
+                estados[ruta] = estado
+
+    pendientes = [ruta for ruta in rutas if ruta not in estados]
+    print(f"Válidas: {len(rutas)} ({len(estados)} con estado vigente, {len(pendientes)} por analizar)")
+    resultados_lote = analizar_lote(pendientes, procesos=procesos, guardar_estados=True, **opciones)
+    errores = [resultado for resultado in resultados_lote if resultado['error']]
+    if errores:
+        raise RuntimeError(f"No se pudieron analizar {len(errores)} válidas: {errores[0]['excel']}: {errores[0]['error']}")
+
+    for ruta in pendientes:
+        estados[ruta] = cargar_estado(ruta_estado(ruta))
+    
+    if base:
+        conexion = abrir_base(base)
+        try:
+            for ruta in rutas:
+                insertar_valida(conexion, estados[ruta], temporada)
+        finally:
+            conexion.close()
+        print(f"Participaciones guardadas en la base: {base} (temporada {temporada})")
+
+    if conteo == 'exacto':
+        resultados = combinar_estados([estados[ruta] for ruta in rutas], por=por)
+        datos_json = analizar_valida.generar_json(resultados, output_json)
+        return datos_json, resultados_lote
+    
+    resumen = resumen_aproximado([estados[ruta] for ruta in rutas], por=por, precision=precision)
+    if ruta_resumen:
+        resumen.guardar(ruta_resumen)
+        print(f"Resumen aproximado guardado en: {ruta_resumen}")
+    datos_json = resumen.datos_json(con_edad=True)
+    with open(output_json, 'w', encoding='utf-8') as f:
+        json.dump(datos_json, f, ensure_ascii=False, indent=2)
+    print(f"JSON generado en: {output_json} (conteo aproximado, error típico {HyperLogLog(precision).error_relativo:.1%})")
+    return datos_json, resultados_lote
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Combina las válidas de una carpeta en totales de semestre o temporada")
+    parser.add_argument('carpeta', help="Carpeta con los Excel de las válidas (se incluyen subcarpetas)")
+    parser.add_argument('output_json', help="Ruta del JSON de totales")
+    parser.add_argument('--por', choices=AGRUPACIONES, default='modalidad',
+                        help="Agrupación del detalle por modalidad del JSON (por defecto: modalidad)")
+    parser.add_argument('--conteo', choices=['exacto', 'aproximado'], default='exacto',
+                        help="Conteo de pilotos únicos exacto o aproximado con HyperLogLog (por defecto: exacto)")
+    parser.add_argument('--precision', type=int, default=PRECISION,
+                        help=f"Precisión del conteo aproximado, de 4 a 18 (por defecto: {PRECISION})")
+    parser.add_argument('--guardar-resumen', default=None,
+                        help="Guardar el resumen aproximado para unirlo con otros (conteo_aproximado.py)")
+    parser.add_argument('--base', default=None,
+                        help="Guardar también las participaciones de todas las válidas en esta base SQLite")
+    parser.add_argument('--temporada', default=None,
+                        help="Temporada con la que se guardan las válidas en la base, ej. 2025")
+    parser.add_argument('--forzar', action='store_true',
+                        help="Volver a analizar todas las válidas aunque tengan estado vigente")
+    parser.add_argument('--procesos', type=int, default=0,
+                        help="Cantidad de procesos para las válidas por analizar (por defecto: uno por núcleo)")
+    parser.add_argument('--modo', choices=['matriz', 'filas'], default='matriz',
+                        help="Método de detección de participaciones (por defecto: matriz)")
+    parser.add_argument('--fecha-referencia', type=lambda v: datetime.strptime(v, '%Y-%m-%d'), default=None,
+                        help="Fecha para calcular edades (por defecto: 31 de diciembre del año de --temporada "
+                             "o del año en curso). Los estados solo se reutilizan con la misma fecha")
+    parser.add_argument('--modalidad', default=None,
+                        help="Modalidad de las válidas, ej. Motocross (por defecto: nombre de cada hoja)")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="Leer los Excel sin usar la caché de libros ya leídos")
+    args = parser.parse_args()
+    if args.base and not args.temporada:
+        parser.error("--base requiere --temporada")
+
+    rutas = buscar_validas(args.carpeta)
+    if not rutas:
+        print(f"No se encontraron archivos Excel en {args.carpeta}")
+        sys.exit(1)
+
+    fecha_referencia = args.fecha_referencia or fin_de_temporada(args.temporada)
+    print(f"Fecha de referencia para las edades: {fecha_referencia:%Y-%m-%d}")
+    inicio = time.perf_counter()
+    datos_json, resultados_lote = analizar_temporada(
+        rutas, args.output_json, por=args.por, procesos=args.procesos, forzar=args.forzar,
+        conteo=args.conteo, precision=args.precision, ruta_resumen=args.guardar_resumen,
+        base=args.base, temporada=args.temporada,
+        modo=args.modo, fecha_referencia=fecha_referencia,
+        modalidad=args.modalidad, usar_cache=not args.sin_cache
+    )
+    if resultados_lote:
+        imprimir_resumen(resultados_lote, args.carpeta, time.perf_counter() - inicio)
+
+    print(f"\nResumen:")
+    print(f"- Total pilotos únicos: {datos_json['total_pilotos_unicos']}")
+    print(f"- Total participaciones: {datos_json['total_participaciones']}")
+    print(f"- Modalidades: {len(datos_json['modalidades'])}")
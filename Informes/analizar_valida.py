@@ -4,263 +4,495 @@ Script para analizar archivos Excel de válidas y generar datos JSON
 Asegura el manejo correcto de caracteres UTF-8 (acentos, ñ, etc.)
 """
 
-import pandas as pd
-import unicodedata
 import json
-from collections import defaultdict
 import os
-from datetime import datetime
+import re
+import sys
+from bisect import bisect_right
+from datetime import date, datetime
 
-def normalizar_liga(nombre):
+# Los módulos compartidos (normalizacion, etc.) están en la raíz del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import lector_xlsx
+from carga_perezosa import ModuloPerezoso
+from normalizacion import normalizar_liga, normalizar_serie
+from participaciones import (AgregadorIncremental, contar_agregados, contar_agregados_filas, modalidad_de_hoja,
+                             tabla_participaciones)
+from disposicion_valida import Disposiciones, columnas_candidatas, recordadas_vigentes
+from perfil_ejecucion import SIN_PERFIL, agregar_argumentos, perfil_de_argumentos
+
+# pandas, numpy, openpyxl y los módulos que los usan se importan la primera vez
+# que se necesitan: el motor ligero no los usa y así arranca mucho más rápido
+pd = ModuloPerezoso('pandas')
+np = ModuloPerezoso('numpy')
+lector_excel = ModuloPerezoso('lector_excel')
+modulo_licencias = ModuloPerezoso('licencias')
+estado_temporada = ModuloPerezoso('estado_temporada')
+base_participaciones = ModuloPerezoso('base_participaciones')
+analizador_fechas = ModuloPerezoso('dateutil.parser')
+
+# Valores que indican participación en una categoría (tras upper() y strip())
+MARCAS_PARTICIPACION = ['X', 'X ', ' X']
+
+# Límites inferiores de los rangos de edad: grupos de 5 años empezando desde 1-5 años.
+# Las edades menores al primer límite van al rango "0 años" y las mayores o
+# iguales al último al rango abierto "66+ años".
+LIMITES_EDAD = [1, 6, 11, 16, 21, 26, 31, 36, 41, 46, 51, 56, 61, 66]
+
+def etiquetas_rangos_edad(limites=LIMITES_EDAD):
+    """
+    Construye las etiquetas de los rangos de edad definidos por los límites.
+    """
+    primera = "0 años" if limites[0] == 1 else f"0-{limites[0] - 1} años"
+    intermedias = [f"{inicio}-{fin - 1} años" for inicio, fin in zip(limites[:-1], limites[1:])]
+    return [primera] + intermedias + [f"{limites[-1]}+ años"]
+
+def calcular_rango_edad(fecha_nacimiento, fecha_referencia, limites=LIMITES_EDAD):
     """
-    Normaliza el nombre de la liga: quita tildes, convierte a mayúsculas,
-    y limpia espacios extra.
+    Calcula el rango de edad de una sola fecha de nacimiento.
+    Retorna None si no hay fecha o no se puede interpretar.
     """
-    if pd.isna(nombre) or nombre == '':
+    if pd.isna(fecha_nacimiento):
         return None
+    try:
+        if isinstance(fecha_nacimiento, str):
+            fecha_nac = pd.to_datetime(fecha_nacimiento)
+        else:
+            fecha_nac = fecha_nacimiento
+        
+        # Textos vacíos o de solo espacios se interpretan como NaT
+        if pd.isna(fecha_nac):
+            return None
+        
+        edad = fecha_referencia.year - fecha_nac.year
+        if (fecha_referencia.month, fecha_referencia.day) < (fecha_nac.month, fecha_nac.day):
+            edad -= 1
+    except:
+        return None  # Si no se puede calcular la edad, se omite
+    
+    return etiquetas_rangos_edad(limites)[bisect_right(limites, edad)]
+
+def parsear_fechas(serie):
+    """
+    Convierte la columna FN a fechas de una sola vez. Los textos se interpretan
+    uno a uno (formato mixto) y los valores que no son fechas quedan como NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
     
-    # Convertir a string y limpiar
-    nombre = str(nombre).strip()
+    es_fecha = serie.map(lambda v: isinstance(v, (str, date)))
+    return pd.to_datetime(serie.where(es_fecha), errors='coerce', format='mixed')
+
+def calcular_rangos_edad(fechas, fecha_referencia, limites=LIMITES_EDAD):
+    """
+    Calcula los rangos de edad de toda una columna FN en una sola operación.
+    Retorna un arreglo de etiquetas con None donde no hay fecha válida.
+    """
+    fechas = parsear_fechas(fechas)
+    validas = fechas.notna().to_numpy()
     
-    # Quitar tildes
-    nombre = unicodedata.normalize('NFD', nombre)
-    nombre = ''.join(c for c in nombre if unicodedata.category(c) != 'Mn')
+    anios = fechas.dt.year.to_numpy(dtype=float)
+    meses = fechas.dt.month.to_numpy(dtype=float)
+    dias = fechas.dt.day.to_numpy(dtype=float)
     
-    # Convertir a mayúsculas para unificar
-    nombre = nombre.upper()
+    # Restar un año si aún no se ha cumplido años en la fecha de referencia
+    no_cumplidos = (fecha_referencia.month < meses) | ((fecha_referencia.month == meses) & (fecha_referencia.day < dias))
+    edades = fecha_referencia.year - anios - no_cumplidos
     
-    return nombre
+    etiquetas = np.array(etiquetas_rangos_edad(limites), dtype=object)
+    rangos = etiquetas[np.digitize(np.where(validas, edades, 0), limites)]
+    rangos[~validas] = None
+    return rangos
 
-def extraer_datos_excel(excel_path):
+def detectar_columnas_categorias(df, candidatas=None):
     """
-    Extrae todos los datos del Excel de una válida.
-    Estructura: columnas de información del piloto + columnas de categorías con "x"
+    Identifica las columnas de categorías: las candidatas que contienen
+    marcas "x" (indicando participación). Todas las candidatas se evalúan
+    de una sola vez con la matriz de participación.
+    
+    Retorna (columnas_categorias, matriz) con la matriz ya reducida a esas
+    columnas, para no volver a construirla al procesar la hoja.
+    """
+    if candidatas is None:
+        candidatas = columnas_candidatas(df.columns)
+    matriz = construir_matriz_participacion(df, candidatas)
+    con_marcas = matriz.any(axis=0)
+    return [col for col, marcada in zip(candidatas, con_marcas) if marcada], matriz[:, con_marcas]
+
+def detectar_con_disposicion(df, disposicion):
+    """
+    Como detectar_columnas_categorias, pero si la disposición ya tiene
+    categorías recordadas de un libro anterior solo se construye la matriz de
+    esas columnas; las demás candidatas se revisan solo por si tienen algún
+    valor (disposicion_valida.recordadas_vigentes).
+    """
+    recordadas = disposicion['categorias']
+    if recordadas is not None:
+        matriz = construir_matriz_participacion(df, recordadas)
+        con_marcas = dict(zip(recordadas, matriz.any(axis=0)))
+        if recordadas_vigentes(disposicion, con_marcas.get, lambda columna: df[columna].notna().any()):
+            return list(recordadas), matriz
+    return detectar_columnas_categorias(df, disposicion['candidatas'])
+
+def construir_matriz_participacion(df, columnas_categorias):
     """
-    excel_file = pd.ExcelFile(excel_path)
+    Convierte las columnas de categorías en una matriz booleana
+    (filas x categorías) donde True indica una marca "x". Cada valor
+    distinto se evalúa una sola vez (las columnas repiten "x" y vacíos).
+    """
+    valores = df[columnas_categorias].to_numpy(dtype=object)
+    codigos, distintos = pd.factorize(valores.ravel())
+    marcas = {m.strip() for m in MARCAS_PARTICIPACION}
+    # El código -1 (celda vacía) toma el último elemento: sin marca
+    marcados = np.array([str(valor).upper().strip() in marcas for valor in distintos] + [False], dtype=bool)
+    return marcados[codigos].reshape(valores.shape)
+
+def obtener_licencia(valor):
+    """
+    Convierte la licencia a entero si es numérica; los textos se conservan.
+    """
+    return int(valor) if isinstance(valor, (int, float)) else valor
+
+def procesar_hoja_matriz(df, columnas_categorias, fecha_referencia, limites_edad, matriz=None):
+    """
+    Procesa una hoja usando la matriz booleana de participaciones: las filas
+    válidas y las marcas se evalúan de una sola vez y se retorna una fila
+    (licencia, liga, categoria, edad) por cada celda marcada con "x".
+    matriz: la de detectar_columnas_categorias, si ya se construyó.
+    """
+    # Intentar obtener licencia de 'Licencia' o 'LICEN'
+    licencias = df['Licencia'] if 'Licencia' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    if 'LICEN' in df.columns:
+        licencias = licencias.where(licencias.notna(), df['LICEN'])
     
-    resultados = {
-        'modalidades': {},
-        'total_pilotos_unicos': set(),
-        'total_participaciones': 0,
-        'pilotos_por_categoria': defaultdict(set),
-        'deportistas_por_liga_total': defaultdict(set),
-        'deportistas_por_liga_categoria': defaultdict(lambda: defaultdict(set)),
-        'licencias_unicas_por_edad': defaultdict(set)  # Cambiado a set para contar licencias únicas
-    }
+    # Normalizar solo los valores distintos de liga y mapearlos de vuelta
+    ligas_normalizadas = normalizar_serie(df['Liga'])
     
-    print(f"Procesando {len(excel_file.sheet_names)} hojas...")
+    # Validar que tenemos licencia y liga
+    validas = (licencias.notna() & ligas_normalizadas.notna() & (ligas_normalizadas != '')).to_numpy(dtype=bool)
     
-    for sheet_name in excel_file.sheet_names:
-        print(f"\nProcesando hoja: {sheet_name}")
-        df = pd.read_excel(excel_file, sheet_name=sheet_name)
+    if matriz is None:
+        matriz = construir_matriz_participacion(df, columnas_categorias)
+    matriz = matriz[validas]
+    licencias = np.array([obtener_licencia(l) for l in licencias[validas].tolist()], dtype=object)
+    ligas_normalizadas = ligas_normalizadas[validas].to_numpy(dtype=object)
+    if 'FN' in df.columns:
+        rangos_edad = calcular_rangos_edad(df['FN'][validas], fecha_referencia, limites_edad)
+    else:
+        rangos_edad = np.full(len(licencias), None, dtype=object)
+    
+    # Una fila por celda marcada con "x"
+    filas, columnas = np.nonzero(matriz)
+    return pd.DataFrame({
+        'licencia': licencias[filas],
+        'liga': ligas_normalizadas[filas],
+        'categoria': np.array(columnas_categorias, dtype=object)[columnas],
+        'edad': rangos_edad[filas]
+    })
+
+def procesar_hoja_filas(df, columnas_categorias, fecha_referencia, limites_edad):
+    """
+    Procesa una hoja recorriendo fila por fila (método original) y retorna
+    una fila (licencia, liga, categoria, edad) por cada participación.
+    """
+    participaciones = []
+    for idx, row in df.iterrows():
+        # Intentar obtener licencia de 'Licencia' o 'LICEN'
+        licencia = row.get('Licencia', None)
+        if pd.isna(licencia):
+            licencia = row.get('LICEN', None)
         
-        modalidad_data = {
-            'pilotos_unicos': set(),
-            'total_participaciones': 0,
-            'pilotos_por_categoria': defaultdict(set),
-            'deportistas_por_liga': defaultdict(set),
-            'deportistas_por_liga_categoria': defaultdict(lambda: defaultdict(set)),
-            'licencias_unicas_por_edad': defaultdict(set)  # Cambiado a set para contar licencias únicas
-        }
+        liga = row.get('Liga', None)
         
-        # Fecha de referencia para calcular edades (año actual)
-        fecha_referencia = datetime.now()
+        # Validar que tenemos licencia y liga
+        if pd.isna(licencia) or pd.isna(liga):
+            continue
         
-        # Identificar columnas de categorías: solo las que están DESPUÉS de la columna "Formatos"
-        # Buscar la posición de la columna "Formatos"
-        indice_formatos = None
-        for i, col in enumerate(df.columns):
-            if str(col).strip().upper() == 'FORMATOS':
-                indice_formatos = i
-                break
+        licencia = obtener_licencia(licencia)
+        liga_normalizada = normalizar_liga(liga)
         
-        columnas_categorias = []
-        if indice_formatos is not None:
-            print(f"  Columna 'Formatos' encontrada en índice {indice_formatos}")
-            # Solo considerar columnas después de "Formatos"
-            for i in range(indice_formatos + 1, len(df.columns)):
-                col = df.columns[i]
-                if str(col) != 'nan':
-                    # Verificar si esta columna tiene valores "x" (indicando participación)
-                    if df[col].notna().any():
-                        valores_unicos = df[col].dropna().unique()
-                        # Si tiene "x" o valores similares, es una categoría
-                        if any(str(v).upper().strip() in ['X', 'x', 'X ', ' x'] for v in valores_unicos):
-                            columnas_categorias.append(col)
-        else:
-            print(f"  ADVERTENCIA: No se encontró la columna 'Formatos', usando método fallback")
-            # Si no se encuentra "Formatos", usar el método anterior como fallback
-            columnas_info = ['Consecutivo', 'Licencia', 'LICEN', 'TX', 'Nombre', 'Apellido', 'Liga', 
-                            'Club', 'FN', 'RH', 'MOTO', 'Documento', 'EPS', 'Pago Licencia', 
-                            'Poliza', 'Celular', 'Mail', 'Formatos', 'PRACT']
-            for col in df.columns:
-                if col not in columnas_info and str(col) != 'nan':
-                    if df[col].notna().any():
-                        valores_unicos = df[col].dropna().unique()
-                        if any(str(v).upper().strip() in ['X', 'x', 'X ', ' x'] for v in valores_unicos):
-                            columnas_categorias.append(col)
+        if not liga_normalizada:
+            continue
         
-        print(f"  Categorías encontradas: {columnas_categorias}")
+        # Calcular edad si hay fecha de nacimiento
+        edad_rango = calcular_rango_edad(row.get('FN', None), fecha_referencia, limites_edad)
         
-        # Verificar que tenemos la columna Liga
-        if 'Liga' not in df.columns:
-            print(f"  ADVERTENCIA: No se encontró la columna 'Liga'")
-            continue
+        # Procesar cada categoría
+        for categoria in columnas_categorias:
+            valor_categoria = row.get(categoria, None)
+            
+            # Verificar si el piloto participa en esta categoría (tiene "x")
+            if pd.notna(valor_categoria):
+                valor_str = str(valor_categoria).upper().strip()
+                if valor_str in MARCAS_PARTICIPACION:
+                    participaciones.append({
+                        'licencia': licencia,
+                        'liga': liga_normalizada,
+                        'categoria': categoria,
+                        'edad': edad_rango
+                    })
+    
+    return pd.DataFrame(participaciones, columns=['licencia', 'liga', 'categoria', 'edad'])
+
+def extraer_datos_excel(excel_path, modo='matriz', fecha_referencia=None, limites_edad=LIMITES_EDAD, modalidad=None,
+                        usar_cache=True, streaming=False, perfil=SIN_PERFIL):
+    """
+    Extrae todos los datos del Excel de una válida.
+    Estructura: columnas de información del piloto + columnas de categorías con "x"
+    
+    modo: 'matriz' (por defecto) detecta las marcas de todas las categorías con
+    una matriz booleana; 'filas' usa el recorrido original fila por fila.
+    fecha_referencia: fecha con la que se calculan las edades (ej. fin de
+    temporada). Si no se indica se usa la fecha actual.
+    limites_edad: límites inferiores de los rangos de edad.
+    modalidad: modalidad de la válida (ej. "Motocross"); si no se indica se
+    toma del nombre de cada hoja.
+    usar_cache: leer las hojas a través de la caché de libros (cache_excel) y
+    recordar la disposición de columnas de cada encabezado (disposicion_valida).
+    streaming: leer las hojas por bloques de filas (lector_excel) y acumular
+    las participaciones en un AgregadorIncremental (la tabla de
+    participaciones sigue creciendo con el libro). Las
+    categorías son entonces todas las columnas candidatas: una columna sin
+    marcas no produce participaciones, así que el resultado es el mismo.
+    perfil: Perfil (perfil_ejecucion) donde se registran los tiempos de
+    lectura, detección de columnas y participaciones de cada hoja.
+    
+    Retorna la tabla de participaciones de todas las hojas, las hojas
+    procesadas con su modalidad y el codificador de licencias.
+    """
+    if modo not in ('matriz', 'filas'):
+        raise ValueError(f"Modo no soportado: {modo}")
+    
+    # Fecha de referencia para calcular edades, fija para todas las hojas
+    if fecha_referencia is None:
+        fecha_referencia = datetime.now()
+    
+    with perfil.etapa('apertura_excel'):
+        nombres_hojas, hojas_excel = lector_excel.leer_hojas(excel_path, usar_cache=usar_cache, streaming=streaming)
+    disposiciones = Disposiciones(usar_cache=usar_cache)
+    codificador = modulo_licencias.CodificadorLicencias()
+    agregador = AgregadorIncremental() if streaming else None
+    bloques = []
+    hojas = []
+    modalidad_por_hoja = {}
+    
+    print(f"Procesando {len(nombres_hojas)} hojas...")
+    
+    for sheet_name, bloques_hoja in hojas_excel:
+        print(f"\nProcesando hoja: {sheet_name}")
         
-        # Procesar cada fila
-        for idx, row in df.iterrows():
-            # Intentar obtener licencia de 'Licencia' o 'LICEN'
-            licencia = row.get('Licencia', None)
-            if pd.isna(licencia):
-                licencia = row.get('LICEN', None)
+        categorias_con_marcas = set()
+        matriz = None
+        for numero_bloque, df in enumerate(perfil.iterar('lectura', bloques_hoja, sheet_name)):
+            if numero_bloque == 0:
+                with perfil.etapa('deteccion_columnas', sheet_name, len(df)):
+                    disposicion = disposiciones.obtener(df.columns)
+                    if streaming:
+                        columnas_categorias = disposicion['candidatas']
+                    else:
+                        columnas_categorias, matriz = detectar_con_disposicion(df, disposicion)
+                        disposiciones.registrar_categorias(disposicion, columnas_categorias)
+                if not streaming:
+                    print(f"  Categorías encontradas: {columnas_categorias}")
+                
+                # Verificar que tenemos la columna Liga
+                if disposicion['liga'] is None:
+                    print(f"  ADVERTENCIA: No se encontró la columna 'Liga'")
+                    break
+                hojas.append(sheet_name)
+                modalidad_por_hoja[sheet_name] = modalidad or modalidad_de_hoja(sheet_name)
             
-            liga = row.get('Liga', None)
+            with perfil.etapa('participaciones', sheet_name, len(df)):
+                if modo == 'matriz':
+                    tabla = procesar_hoja_matriz(df, columnas_categorias, fecha_referencia, limites_edad, matriz)
+                    matriz = None
+                else:
+                    tabla = procesar_hoja_filas(df, columnas_categorias, fecha_referencia, limites_edad)
+                
+                tabla['codigo'] = codificador.codificar(tabla['licencia'])
+                tabla['modalidad'] = modalidad_por_hoja[sheet_name]
+                tabla['hoja'] = sheet_name
+                if agregador:
+                    agregador.agregar(tabla)
+                    categorias_con_marcas.update(tabla['categoria'].unique())
+                else:
+                    bloques.append(tabla)
+        
+        if streaming and sheet_name in hojas:
+            columnas_categorias = [c for c in columnas_categorias if c in categorias_con_marcas]
+            disposiciones.registrar_categorias(disposicion, columnas_categorias)
+            print(f"  Categorías encontradas: {columnas_categorias}")
+    disposiciones.guardar()
+    
+    with perfil.etapa('combinacion') as registro:
+        participaciones = agregador.tabla() if agregador else tabla_participaciones(bloques)
+        registro['filas'] = len(participaciones)
+    resultados = {
+        'participaciones': participaciones,
+        'hojas': hojas,
+        'modalidad_por_hoja': modalidad_por_hoja,
+        'codificador': codificador
+    }
+    if agregador:
+        resultados['participaciones_por_hoja'] = agregador.participaciones_por_hoja
+    return resultados
+
+# Valores por defecto de las partes que faltan en una fecha de texto, como en
+# pd.to_datetime (ej. "2010" -> 01/01/2010); los textos que empiezan con una
+# hora (ej. "10:30") toman la fecha de hoy
+FECHA_POR_DEFECTO = datetime(1, 1, 1)
+PATRON_FECHA_ISO = re.compile(r'\d{4}-\d{2}-\d{2}([ T]|$)')
+PATRON_HORA = re.compile(r'([01]?[0-9]|2[0-3]):([0-5][0-9])')
+
+def parsear_fecha(valor):
+    """
+    Convierte un valor de FN a fecha como parsear_fechas, sin pandas: las
+    fechas se conservan, los textos se interpretan uno a uno (ISO o, si no,
+    con dateutil, que es lo que usa pd.to_datetime con formato mixto) y lo
+    demás queda como None.
+    """
+    if isinstance(valor, date):
+        return valor
+    if not isinstance(valor, str):
+        return None
+    if valor in ('now', 'today'):
+        return datetime.now()
+    if PATRON_FECHA_ISO.match(valor):
+        try:
+            return datetime.fromisoformat(valor)
+        except ValueError:
+            pass
+    
+    # Igual que pandas: los textos numéricos menores a 1000 no son fechas
+    try:
+        if float(valor.replace(',', '')) < 1000:
+            return None
+    except ValueError:
+        pass
+    por_defecto = FECHA_POR_DEFECTO
+    if PATRON_HORA.match(valor):
+        por_defecto = datetime.combine(date.today(), datetime.min.time())
+    try:
+        return analizador_fechas.parse(valor, default=por_defecto)
+    except (ValueError, OverflowError):
+        return None
+
+def rango_edad(fecha, fecha_referencia, limites, etiquetas):
+    """
+    Rango de edad de una fecha ya interpretada (parsear_fecha), o None.
+    """
+    if fecha is None:
+        return None
+    edad = fecha_referencia.year - fecha.year
+    if (fecha_referencia.month, fecha_referencia.day) < (fecha.month, fecha.day):
+        edad -= 1
+    return etiquetas[bisect_right(limites, edad)]
+
+def extraer_datos_ligero(excel_path, fecha_referencia=None, limites_edad=LIMITES_EDAD, modalidad=None,
+                         usar_cache=True, perfil=SIN_PERFIL):
+    """
+    Motor ligero: mismo resultado que extraer_datos_excel (modo matriz) sin
+    pandas, numpy ni openpyxl, que tardan más en importarse de lo que toma
+    analizar una válida pequeña. El libro se lee con lector_xlsx, cada
+    columna se convierte como pd.read_excel (lector_xlsx.inferir_tipos) y las
+    participaciones quedan como tuplas para contar_agregados_filas. Con
+    usar_cache se recuerda la disposición de columnas de cada encabezado
+    (disposicion_valida); el libro se lee siempre completo.
+    
+    Retorna las participaciones (tuplas con los valores de COLUMNAS_FILA),
+    las hojas procesadas y su modalidad.
+    """
+    if fecha_referencia is None:
+        fecha_referencia = datetime.now()
+    etiquetas = etiquetas_rangos_edad(limites_edad)
+    marcas = {marca.strip() for marca in MARCAS_PARTICIPACION}
+    
+    with perfil.etapa('apertura_excel'):
+        libro = lector_xlsx.LibroXlsx(excel_path)
+    disposiciones = Disposiciones(usar_cache=usar_cache)
+    filas = []
+    hojas = []
+    modalidad_por_hoja = {}
+    
+    with libro:
+        print(f"Procesando {len(libro.nombres_hojas)} hojas...")
+        
+        for sheet_name in libro.nombres_hojas:
+            print(f"\nProcesando hoja: {sheet_name}")
             
-            # Validar que tenemos licencia y liga
-            if pd.isna(licencia) or pd.isna(liga):
-                continue
+            with perfil.etapa('lectura', sheet_name) as registro:
+                columnas, datos = libro.leer_hoja(sheet_name)
+                registro['filas'] = len(datos)
+            indices = {columna: i for i, columna in enumerate(columnas)}
             
-            licencia = int(licencia) if isinstance(licencia, (int, float)) else licencia
-            liga_normalizada = normalizar_liga(liga)
+            def valores(columna):
+                if columna not in indices:
+                    return [None] * len(datos)
+                return lector_xlsx.inferir_tipos(lector_xlsx.columna(datos, indices[columna]))
             
-            if not liga_normalizada:
-                continue
+            def marcadas(categoria):
+                return [str(valor).upper().strip() in marcas if valor is not None else False
+                        for valor in lector_xlsx.columna(datos, indices[categoria])]
             
-            # Calcular edad si hay fecha de nacimiento
-            edad_rango = None
-            fecha_nacimiento = row.get('FN', None)
-            if pd.notna(fecha_nacimiento):
-                try:
-                    if isinstance(fecha_nacimiento, str):
-                        fecha_nac = pd.to_datetime(fecha_nacimiento)
-                    else:
-                        fecha_nac = fecha_nacimiento
-                    
-                    edad = fecha_referencia.year - fecha_nac.year
-                    if fecha_referencia.month < fecha_nac.month or (fecha_referencia.month == fecha_nac.month and fecha_referencia.day < fecha_nac.day):
-                        edad -= 1
-                    
-                    # Agrupar en rangos de 5 años, empezando desde 1-5 años
-                    if edad < 1:
-                        edad_rango = "0 años"
-                    elif edad <= 5:
-                        edad_rango = "1-5 años"
-                    elif edad <= 10:
-                        edad_rango = "6-10 años"
-                    elif edad <= 15:
-                        edad_rango = "11-15 años"
-                    elif edad <= 20:
-                        edad_rango = "16-20 años"
-                    elif edad <= 25:
-                        edad_rango = "21-25 años"
-                    elif edad <= 30:
-                        edad_rango = "26-30 años"
-                    elif edad <= 35:
-                        edad_rango = "31-35 años"
-                    elif edad <= 40:
-                        edad_rango = "36-40 años"
-                    elif edad <= 45:
-                        edad_rango = "41-45 años"
-                    elif edad <= 50:
-                        edad_rango = "46-50 años"
-                    elif edad <= 55:
-                        edad_rango = "51-55 años"
-                    elif edad <= 60:
-                        edad_rango = "56-60 años"
-                    elif edad <= 65:
-                        edad_rango = "61-65 años"
-                    else:
-                        edad_rango = "66+ años"
-                except:
-                    pass  # Si no se puede calcular la edad, se omite
+            def con_valores(categoria):
+                return any(valor is not None for valor in lector_xlsx.columna(datos, indices[categoria]))
             
-            # Procesar cada categoría
-            for categoria in columnas_categorias:
-                valor_categoria = row.get(categoria, None)
-                
-                # Verificar si el piloto participa en esta categoría (tiene "x")
-                if pd.notna(valor_categoria):
-                    valor_str = str(valor_categoria).upper().strip()
-                    if valor_str in ['X', 'X ', ' X']:
-                        # El piloto participa en esta categoría
-                        resultados['total_pilotos_unicos'].add(licencia)
-                        resultados['total_participaciones'] += 1
-                        resultados['pilotos_por_categoria'][categoria].add(licencia)
-                        resultados['deportistas_por_liga_total'][liga_normalizada].add(licencia)
-                        resultados['deportistas_por_liga_categoria'][categoria][liga_normalizada].add(licencia)
-                        
-                        # Agregar licencia única por edad (no participación)
-                        if edad_rango:
-                            resultados['licencias_unicas_por_edad'][edad_rango].add(licencia)
-                        
-                        # Agregar a modalidad específica
-                        modalidad_data['pilotos_unicos'].add(licencia)
-                        modalidad_data['total_participaciones'] += 1
-                        modalidad_data['pilotos_por_categoria'][categoria].add(licencia)
-                        modalidad_data['deportistas_por_liga'][liga_normalizada].add(licencia)
-                        modalidad_data['deportistas_por_liga_categoria'][categoria][liga_normalizada].add(licencia)
-                        
-                        # Agregar licencia única por edad en modalidad (no participación)
-                        if edad_rango:
-                            modalidad_data['licencias_unicas_por_edad'][edad_rango].add(licencia)
-        
-        resultados['modalidades'][sheet_name] = modalidad_data
+            with perfil.etapa('deteccion_columnas', sheet_name, len(datos)):
+                disposicion = disposiciones.obtener(columnas)
+                # Columnas candidatas con alguna marca "x", y en qué filas la tienen; con
+                # categorías recordadas para este encabezado solo se revisan esas
+                filas_marcadas = {categoria: marcadas(categoria) for categoria in disposicion['categorias'] or []}
+                if not recordadas_vigentes(disposicion, lambda categoria: any(filas_marcadas[categoria]),
+                                           con_valores):
+                    filas_marcadas = {}
+                    for categoria in disposicion['candidatas']:
+                        filas_categoria = marcadas(categoria)
+                        if any(filas_categoria):
+                            filas_marcadas[categoria] = filas_categoria
+                disposiciones.registrar_categorias(disposicion, list(filas_marcadas))
+            print(f"  Categorías encontradas: {list(filas_marcadas)}")
+            
+            # Verificar que tenemos la columna Liga
+            if disposicion['liga'] is None:
+                print(f"  ADVERTENCIA: No se encontró la columna 'Liga'")
+                continue
+            hojas.append(sheet_name)
+            modalidad_por_hoja[sheet_name] = modalidad or modalidad_de_hoja(sheet_name)
+            
+            with perfil.etapa('participaciones', sheet_name, len(datos)):
+                # Licencia de 'Licencia' o, si está vacía, de 'LICEN'
+                licencias = [next((valor for valor in opciones if valor is not None), None)
+                             for opciones in zip(*(valores(c) for c in disposicion['licencia']))]
+                ligas = valores(disposicion['liga'])
+                fechas = valores(disposicion['fn'])
+                for i, (licencia, liga) in enumerate(zip(licencias, ligas)):
+                    liga_normalizada = normalizar_liga(liga)
+                    if licencia is None or not liga_normalizada:
+                        continue
+                    licencia = obtener_licencia(licencia)
+                    edad = rango_edad(parsear_fecha(fechas[i]), fecha_referencia, limites_edad, etiquetas)
+                    for categoria, marcadas in filas_marcadas.items():
+                        if marcadas[i]:
+                            filas.append((licencia, liga_normalizada, categoria, edad, sheet_name))
+    disposiciones.guardar()
     
-    return resultados
+    return {
+        'filas': filas,
+        'hojas': hojas,
+        'modalidad_por_hoja': modalidad_por_hoja
+    }
 
 def generar_json(resultados, output_file):
     """
     Genera un archivo JSON con los datos estructurados para la página web.
+    Todos los conteos se calculan a partir de la tabla de participaciones
+    (o de las tuplas de participaciones del motor ligero).
     """
-    datos_json = {
-        'total_pilotos_unicos': len(resultados['total_pilotos_unicos']),
-        'total_participaciones': resultados['total_participaciones'],
-        'pilotos_por_categoria': {
-            cat: len(pilotos) 
-            for cat, pilotos in sorted(resultados['pilotos_por_categoria'].items())
-        },
-        'deportistas_por_liga_total': {
-            liga: len(deportistas) 
-            for liga, deportistas in sorted(resultados['deportistas_por_liga_total'].items())
-        },
-        'deportistas_por_liga_categoria': {
-            cat: {
-                liga: len(deportistas)
-                for liga, deportistas in sorted(ligas.items())
-            }
-            for cat, ligas in sorted(resultados['deportistas_por_liga_categoria'].items())
-        },
-        'participaciones_por_edad': {
-            edad: len(licencias) 
-            for edad, licencias in sorted(resultados['licencias_unicas_por_edad'].items())
-        },
-        'modalidades': {
-            modalidad: {
-                'pilotos_unicos': len(data['pilotos_unicos']),
-                'total_participaciones': data['total_participaciones'],
-                'pilotos_por_categoria': {
-                    cat: len(pilotos)
-                    for cat, pilotos in sorted(data['pilotos_por_categoria'].items())
-                },
-                'deportistas_por_liga': {
-                    liga: len(deportistas)
-                    for liga, deportistas in sorted(data['deportistas_por_liga'].items())
-                },
-                'deportistas_por_liga_categoria': {
-                    cat: {
-                        liga: len(deportistas)
-                        for liga, deportistas in sorted(ligas.items())
-                    }
-                    for cat, ligas in sorted(data['deportistas_por_liga_categoria'].items())
-                },
-                'participaciones_por_edad': {
-                    edad: len(licencias)
-                    for edad, licencias in sorted(data['licencias_unicas_por_edad'].items())
-                }
-            }
-            for modalidad, data in resultados['modalidades'].items()
-        }
-    }
+    if 'filas' in resultados:
+        datos_json = contar_agregados_filas(resultados['filas'], resultados['hojas'], con_edad=True)
+    else:
+        datos_json = contar_agregados(resultados['participaciones'], resultados['hojas'], con_edad=True,
+                                      participaciones_por_hoja=resultados.get('participaciones_por_hoja'))
     
     # Escribir JSON con encoding UTF-8 y ensure_ascii=False para preservar caracteres especiales
     try:
@@ -274,24 +506,63 @@ def generar_json(resultados, output_file):
     return datos_json
 
 # Ejecutar análisis
-# Uso: python analizar_valida.py <ruta_excel> <ruta_output_json>
-# Ejemplo: python analizar_valida.py "Valida de ejemplo/valejempo.xlsx" "Valida de ejemplo/datos_valida_ejemplo.json"
+# Uso: python analizar_valida.py <ruta_excel> <ruta_output_json> [--motor completo|ligero] [--fecha-referencia AAAA-MM-DD] [--limites-edad 1,6,11,...] [--perfil [ruta_json]]
+# Ejemplo: python analizar_valida.py "Valida de ejemplo/valejempo.xlsx" "Valida de ejemplo/datos_valida_ejemplo.json" --fecha-referencia 2025-12-31
 if __name__ == "__main__":
-    import sys
+    import argparse
     
-    if len(sys.argv) < 3:
-        print("Uso: python analizar_valida.py <ruta_excel> <ruta_output_json>")
-        print('Ejemplo: python analizar_valida.py "Valida de ejemplo/valejempo.xlsx" "Valida de ejemplo/datos_valida_ejemplo.json"')
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Analiza el Excel de una válida y genera el JSON de datos")
+    parser.add_argument('excel_path', help="Ruta del archivo Excel de la válida")
+    parser.add_argument('output_json', help="Ruta del JSON de salida")
+    parser.add_argument('--motor', choices=['completo', 'ligero'], default='completo',
+                        help="completo: pandas (por defecto); ligero: sin pandas ni openpyxl, arranca en una "
+                             "fracción del tiempo (no admite --modo filas, --streaming ni --base)")
+    parser.add_argument('--modo', choices=['matriz', 'filas'], default='matriz',
+                        help="Método de detección de participaciones (por defecto: matriz)")
+    parser.add_argument('--fecha-referencia', type=lambda v: datetime.strptime(v, '%Y-%m-%d'), default=None,
+                        help="Fecha para calcular edades, ej. fin de temporada (por defecto: hoy)")
+    parser.add_argument('--modalidad', default=None,
+                        help="Modalidad de la válida, ej. Motocross (por defecto: nombre de cada hoja)")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="No usar la caché de libros ya leídos ni la de disposiciones de columnas")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Leer el Excel por bloques de filas, sin cargar el libro completo")
+    parser.add_argument('--limites-edad', type=lambda v: [int(x) for x in v.split(',')], default=LIMITES_EDAD,
+                        help="Límites inferiores de los rangos de edad separados por coma")
+    parser.add_argument('--base', default=None,
+                        help="Guardar también las participaciones en esta base SQLite (base_participaciones.py)")
+    parser.add_argument('--temporada', default=None,
+                        help="Temporada con la que se guardan las participaciones en la base, ej. 2025")
+    agregar_argumentos(parser, 'perfil_analizar_valida.json')
+    args = parser.parse_args()
+    if args.base and not args.temporada:
+        parser.error("--base requiere --temporada")
+    if args.motor == 'ligero' and (args.modo == 'filas' or args.streaming or args.base):
+        parser.error("--modo filas, --streaming y --base requieren --motor completo")
+    perfil = perfil_de_argumentos(args, 'analizar_valida.py')
     
-    excel_path = sys.argv[1]
-    output_json = sys.argv[2]
+    excel_path = args.excel_path
+    output_json = args.output_json
     
     print("Iniciando análisis del Excel de ejemplo...")
-    resultados = extraer_datos_excel(excel_path)
+    if args.motor == 'ligero':
+        resultados = extraer_datos_ligero(excel_path, fecha_referencia=args.fecha_referencia,
+                                          limites_edad=args.limites_edad, modalidad=args.modalidad,
+                                          usar_cache=not args.sin_cache, perfil=perfil)
+    else:
+        resultados = extraer_datos_excel(excel_path, modo=args.modo, fecha_referencia=args.fecha_referencia,
+                                         limites_edad=args.limites_edad, modalidad=args.modalidad,
+                                         usar_cache=not args.sin_cache, streaming=args.streaming, perfil=perfil)
     
     print("\nGenerando JSON...")
-    datos_json = generar_json(resultados, output_json)
+    with perfil.etapa('json'):
+        datos_json = generar_json(resultados, output_json)
+    
+    if args.base:
+        with perfil.etapa('base'):
+            base_participaciones.guardar_en_base(args.base, estado_temporada.estado_valida(resultados, excel_path),
+                                                 args.temporada)
+        print(f"Participaciones guardadas en la base: {args.base} (temporada {args.temporada})")
     
     print("\n¡Análisis completado!")
     print(f"\nResumen:")
@@ -301,3 +572,6 @@ if __name__ == "__main__":
     print(f"\nCategorías encontradas:")
     for cat in sorted(datos_json['pilotos_por_categoria'].keys()):
         print(f"  - {cat}: {datos_json['pilotos_por_categoria'][cat]} pilotos únicos")
+    
+    if args.perfil:
+        perfil.guardar(args.perfil)
@@ -2,140 +2,139 @@
 """
 Script para generar informes HTML a partir de datos JSON
 Asegura el manejo correcto de caracteres UTF-8 (acentos, ñ, etc.)
+
+Se puede importar: render_report(datos, output_path, nombre_valida) genera un
+informe y render_batch(trabajos) genera muchos en un solo proceso.
 """
 
 import json
 import os
 import sys
-import re
+import base64
 import glob
+import gzip
+import hashlib
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Configurar encoding UTF-8 para stdout en Windows
-if sys.platform == 'win32':
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+from documento_pdf import DocumentoPDF, ancho_texto, partir_lineas, recortar_texto
+from manifiesto_informes import DIRECTORIO_RAIZ, RUTA_MENU, entrada_informe, generar_menu, registrar_informes
+from perfil_ejecucion import SIN_PERFIL, Perfil, agregar_argumentos, perfil_de_argumentos
 
 # Uso: python generar_informe.py <ruta_json> <ruta_output_html> <nombre_valida>
 # Ejemplo: python generar_informe.py "Valida de ejemplo/datos_valida_ejemplo.json" "Valida de ejemplo/informe_valida_ejemplo.html" "Valida de ejemplo"
-
-if len(sys.argv) < 4:
-    print("Uso: python generar_informe.py <ruta_json> <ruta_output_html> <nombre_valida>")
-    print('Ejemplo: python generar_informe.py "Valida de ejemplo/datos_valida_ejemplo.json" "Valida de ejemplo/informe_valida_ejemplo.html" "Valida de ejemplo"')
-    sys.exit(1)
-
-json_path = sys.argv[1]
-output_path = sys.argv[2]
-# Decodificar nombre_valida correctamente para UTF-8
-nombre_valida = sys.argv[3]
-try:
-    # Intentar decodificar desde la codificación del sistema
-    nombre_valida = nombre_valida.encode('latin-1').decode('utf-8')
-except:
+# Lote: python generar_informe.py --lote <carpeta> [--procesos N] [--conservar-json]
+# Con --incrustar los estilos y el script van dentro del HTML (un solo archivo para compartir)
+# Con --datos minificado|comprimido los datos se incrustan sin sangría o con gzip + base64
+# Con --prerenderizar las gráficas iniciales se generan en Python y van en el HTML
+# Con --pdf también se genera informe_<nombre>.pdf (vectorial, sin navegador) junto al HTML
+# Con --perfil [ruta_json] se guardan los tiempos de cada etapa (y de cada informe del lote)
+# Genera informe_<nombre>.html para cada datos_<nombre>.json de la carpeta (y subcarpetas)
+
+def decodificar_nombre(nombre_valida):
+    """
+    Decodifica el nombre de la válida recibido por línea de comandos para UTF-8.
+    """
     try:
-        # Si falla, intentar directamente
-        nombre_valida = nombre_valida.encode('cp1252').decode('utf-8')
+        # Intentar decodificar desde la codificación del sistema
+        return nombre_valida.encode('latin-1').decode('utf-8')
     except:
-        # Si todo falla, usar tal cual
-        pass
-
-# Calcular la profundidad del archivo de salida para las rutas relativas
-# output_path puede ser relativo a Informes/ o incluir "Informes/" en el path
-# Normalizar el path para trabajar con rutas relativas desde Informes/
-script_dir = os.path.dirname(os.path.abspath(__file__))
-
-# Si output_path incluye "Informes/", removerlo para trabajar relativo a Informes/
-output_path_norm = output_path.replace('\\', '/')
-if 'Informes/' in output_path_norm:
-    # Extraer la parte después de "Informes/"
-    parts = output_path_norm.split('Informes/')
-    if len(parts) > 1:
-        output_path_rel = parts[-1]
+        try:
+            # Si falla, intentar directamente
+            return nombre_valida.encode('cp1252').decode('utf-8')
+        except:
+            # Si todo falla, usar tal cual
+            return nombre_valida
+
+def calcular_rutas(output_path):
+    """
+    Calcula la profundidad del archivo de salida y las rutas relativas hasta
+    la raíz. output_path puede ser relativo a Informes/ o incluir "Informes/"
+    en el path.
+    """
+    # Si output_path incluye "Informes/", removerlo para trabajar relativo a Informes/
+    output_path_norm = output_path.replace('\\', '/')
+    if 'Informes/' in output_path_norm:
+        # Extraer la parte después de "Informes/"
+        parts = output_path_norm.split('Informes/')
+        if len(parts) > 1:
+            output_path_rel = parts[-1]
+        else:
+            output_path_rel = output_path_norm
     else:
         output_path_rel = output_path_norm
-else:
-    output_path_rel = output_path_norm
-
-output_dir = os.path.dirname(output_path_rel)
-# Contar cuántos niveles hay desde Informes/ hasta el archivo
-# Si output_path_rel es "Modalidad de ejemplo/informe.html", output_dir es "Modalidad de ejemplo"
-# Necesitamos subir depth niveles desde el archivo hasta Informes/, y luego 1 más hasta la raíz
-if output_dir:
-    # Contar partes del directorio (normalizar separadores)
-    output_dir_norm = output_dir.replace('\\', '/')
-    depth = len([p for p in output_dir_norm.split('/') if p]) if output_dir_norm else 0
-else:
-    depth = 0
-
-# Calcular niveles hasta la raíz:
-# - Si depth = 0: archivo está en Informes/, necesitamos subir 1 nivel (../)
-# - Si depth = 1: archivo está en Informes/Modalidad/, necesitamos subir 2 niveles (../../)
-depth_to_root = depth + 1
-
-# Extraer modalidad y subcarpeta para construir el título del informe
-# output_dir_norm contiene la ruta relativa desde Informes/, ej: "Velocidad" o "Motocross/Primer semestre"
-partes_directorio = [p for p in output_dir_norm.split('/') if p] if output_dir_norm else []
-
-# Determinar modalidad (primera parte del directorio)
-modalidad = partes_directorio[0].lower() if len(partes_directorio) > 0 else ""
-
-# Determinar subcarpeta (segunda parte del directorio, si existe)
-subcarpeta = partes_directorio[1].lower() if len(partes_directorio) > 1 else ""
-
-# Construir el título del informe
-# Formato: "Campeonato nacional de [modalidad] [subcarpeta si existe] - Informe [nombre del informe]"
-if subcarpeta:
-    titulo_informe = f"Campeonato nacional de {modalidad} {subcarpeta} - Informe {nombre_valida}"
-else:
-    titulo_informe = f"Campeonato nacional de {modalidad} - Informe {nombre_valida}"
-
-# Generar las rutas relativas
-ruta_inicio = '../' * depth_to_root + 'index.html'
-ruta_logo = '../' * depth_to_root + 'fedemoto-logo.png'
-# Ruta al script de carga del menú (desde el archivo generado hasta la raíz)
-ruta_load_menu = '../' * depth_to_root + 'load-menu.js'
-# Para informe_2025_fedemoto.html, está en Informes/, así que desde Informes/Modalidad/ es ../informe_2025_fedemoto.html
-# Desde Informes/ es informe_2025_fedemoto.html (mismo nivel)
-if depth == 0:
-    ruta_informe_2025 = 'informe_2025_fedemoto.html'
-else:
-    ruta_informe_2025 = '../' * (depth_to_root - 1) + 'informe_2025_fedemoto.html'
-
-# Leer los datos del JSON con encoding UTF-8
-try:
-    with open(json_path, 'r', encoding='utf-8') as f:
-        datos = json.load(f)
-except UnicodeDecodeError:
-    # Si falla, intentar con diferentes encodings
-    with open(json_path, 'r', encoding='latin-1') as f:
-        datos = json.load(f)
-except Exception as e:
-    print(f"Error al leer el archivo JSON: {e}")
-    sys.exit(1)
-
-# Convertir datos a formato JavaScript
-datos_js = json.dumps(datos, ensure_ascii=False, indent=2)
-
-# Generar el HTML
-html_content = f'''<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{titulo_informe}</title>
-    <link rel="icon" type="image/png" href="{ruta_logo}">
-    <!-- Librerías para generar PDF -->
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
-    <!-- SweetAlert2 para modales -->
-    <script src="https://cdn.jsdelivr.net/npm/sweetalert2@11"></script>
-    <style>
-        * {{
+
+    # Contar cuántos niveles hay desde Informes/ hasta el archivo
+    # Si output_path_rel es "Modalidad de ejemplo/informe.html", el directorio es "Modalidad de ejemplo"
+    # Necesitamos subir depth niveles desde el archivo hasta Informes/, y luego 1 más hasta la raíz
+    output_dir_norm = os.path.dirname(output_path_rel).replace('\\', '/')
+    # output_dir_norm contiene la ruta relativa desde Informes/, ej: "Velocidad" o "Motocross/Primer semestre"
+    partes_directorio = [p for p in output_dir_norm.split('/') if p]
+    depth = len(partes_directorio)
+
+    # Calcular niveles hasta la raíz:
+    # - Si depth = 0: archivo está en Informes/, necesitamos subir 1 nivel (../)
+    # - Si depth = 1: archivo está en Informes/Modalidad/, necesitamos subir 2 niveles (../../)
+    depth_to_root = depth + 1
+
+    rutas = {
+        'partes_directorio': partes_directorio,
+        'ruta_inicio': '../' * depth_to_root + 'index.html',
+        'ruta_logo': '../' * depth_to_root + 'fedemoto-logo.png',
+        # Ruta al script de carga del menú (desde el archivo generado hasta la raíz)
+        'ruta_load_menu': '../' * depth_to_root + 'load-menu.js',
+        'ruta_recursos': '../' * depth_to_root + DIRECTORIO_RECURSOS + '/'
+    }
+    # Para informe_2025_fedemoto.html, está en Informes/, así que desde Informes/Modalidad/ es ../informe_2025_fedemoto.html
+    # Desde Informes/ es informe_2025_fedemoto.html (mismo nivel)
+    if depth == 0:
+        rutas['ruta_informe_2025'] = 'informe_2025_fedemoto.html'
+    else:
+        rutas['ruta_informe_2025'] = '../' * (depth_to_root - 1) + 'informe_2025_fedemoto.html'
+    return rutas
+
+def titulo_del_informe(partes_directorio, nombre_valida):
+    """
+    Construye el título del informe con la modalidad y la subcarpeta.
+    Formato: "Campeonato nacional de [modalidad] [subcarpeta si existe] - Informe [nombre del informe]"
+    """
+    # Determinar modalidad (primera parte del directorio)
+    modalidad = partes_directorio[0].lower() if len(partes_directorio) > 0 else ""
+
+    # Determinar subcarpeta (segunda parte del directorio, si existe)
+    subcarpeta = partes_directorio[1].lower() if len(partes_directorio) > 1 else ""
+
+    if subcarpeta:
+        return f"Campeonato nacional de {modalidad} {subcarpeta} - Informe {nombre_valida}"
+    return f"Campeonato nacional de {modalidad} - Informe {nombre_valida}"
+
+def leer_datos(json_path):
+    """
+    Lee los datos del JSON con encoding UTF-8 (o latin-1 si falla).
+    """
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except UnicodeDecodeError:
+        # Si falla, intentar con diferentes encodings
+        with open(json_path, 'r', encoding='latin-1') as f:
+            return json.load(f)
+
+# Carpeta de los estilos y el script comunes a todos los informes (en la raíz del proyecto)
+DIRECTORIO_RECURSOS = 'recursos'
+
+# Hoja de estilos de los informes
+ESTILOS_INFORME = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: #ffffff;
             color: #333;
@@ -143,10 +142,10 @@ html_content = f'''<!DOCTYPE html>
             padding: 20px;
             padding-top: 120px;
             min-height: 100vh;
-        }}
+        }
 
         /* Header fijo con menú */
-        .fixed-header {{
+        .fixed-header {
             position: fixed;
             top: 0;
             left: 0;
@@ -156,9 +155,9 @@ html_content = f'''<!DOCTYPE html>
             z-index: 10000;
             box-shadow: 0 4px 10px rgba(0,0,0,0.2);
             width: 100%;
-        }}
+        }
 
-        .header-content {{
+        .header-content {
             max-width: 1400px;
             margin: 0 auto;
             display: flex;
@@ -166,40 +165,40 @@ html_content = f'''<!DOCTYPE html>
             justify-content: space-between;
             padding: 15px 30px;
             width: 100%;
-        }}
+        }
 
-        .logo-container {{
+        .logo-container {
             display: flex;
             align-items: center;
             gap: 15px;
-        }}
+        }
 
-        .logo-container img {{
+        .logo-container img {
             height: 50px;
             width: auto;
-        }}
+        }
 
-        .logo-container h1 {{
+        .logo-container h1 {
             font-size: 1.8em;
             margin: 0;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
-        }}
+        }
 
-        .nav-menu {{
+        .nav-menu {
             display: flex;
             gap: 0;
             list-style: none;
             margin: 0;
             padding: 0;
-        }}
+        }
 
-        .nav-menu li {{
+        .nav-menu li {
             margin: 0;
             padding: 0;
             position: relative;
-        }}
+        }
 
-        .nav-menu > li > a {{
+        .nav-menu > li > a {
             display: block;
             padding: 12px 25px;
             color: white;
@@ -211,31 +210,31 @@ html_content = f'''<!DOCTYPE html>
             position: relative;
             white-space: nowrap;
             cursor: pointer;
-        }}
+        }
 
-        .nav-menu > li > a:hover {{
+        .nav-menu > li > a:hover {
             background: rgba(255,255,255,0.1);
             transform: translateY(-2px);
-        }}
+        }
 
-        .nav-menu > li > a.active {{
+        .nav-menu > li > a.active {
             background: #F7C31D;
             color: #123E92;
-        }}
+        }
 
         /* Menú desplegable */
-        .dropdown {{
+        .dropdown {
             position: relative;
-        }}
+        }
 
-        .dropdown > a::after {{
+        .dropdown > a::after {
             content: ' ▼';
             font-size: 0.8em;
             margin-left: 5px;
-        }}
+        }
 
         /* Puente invisible para mantener el hover activo */
-        .dropdown::before {{
+        .dropdown::before {
             content: '';
             position: absolute;
             top: 100%;
@@ -244,9 +243,9 @@ html_content = f'''<!DOCTYPE html>
             height: 5px;
             background: transparent;
             z-index: 10002;
-        }}
+        }
 
-        .dropdown-menu {{
+        .dropdown-menu {
             display: none;
             position: absolute;
             top: calc(100% + 5px);
@@ -261,15 +260,15 @@ html_content = f'''<!DOCTYPE html>
             padding: 0;
             margin: 0;
             overflow: visible;
-        }}
+        }
         
         /* Submenús dentro de dropdowns (para Motocross, Velotierra, etc.) */
-        .dropdown-menu .dropdown {{
+        .dropdown-menu .dropdown {
             position: relative;
-        }}
+        }
         
         /* Puente invisible para submenús anidados */
-        .dropdown-menu .dropdown::before {{
+        .dropdown-menu .dropdown::before {
             content: '';
             position: absolute;
             top: 0;
@@ -278,14 +277,14 @@ html_content = f'''<!DOCTYPE html>
             height: 100%;
             background: transparent;
             z-index: 10004;
-        }}
+        }
         
-        .dropdown-menu .dropdown > a {{
+        .dropdown-menu .dropdown > a {
             position: relative;
             padding-right: 35px;
-        }}
+        }
         
-        .dropdown-menu .dropdown > a::after {{
+        .dropdown-menu .dropdown > a::after {
             content: ' ▶';
             position: absolute;
             right: 15px;
@@ -294,9 +293,9 @@ html_content = f'''<!DOCTYPE html>
             font-size: 0.8em;
             margin: 0;
             float: none;
-        }}
+        }
         
-        .dropdown-menu .dropdown .dropdown-menu {{
+        .dropdown-menu .dropdown .dropdown-menu {
             display: none !important;
             position: absolute;
             left: 100%;
@@ -308,44 +307,44 @@ html_content = f'''<!DOCTYPE html>
             box-shadow: 0 8px 16px rgba(0,0,0,0.2);
             border-radius: 8px;
             overflow: visible;
-        }}
+        }
         
         /* En "Resultados generales", mostrar submenús a la izquierda */
-        .nav-menu > .dropdown:nth-child(4) .dropdown-menu > .dropdown > .dropdown-menu {{
+        .nav-menu > .dropdown:nth-child(4) .dropdown-menu > .dropdown > .dropdown-menu {
             left: auto;
             right: 100%;
             margin-left: 0;
             margin-right: 5px;
-        }}
+        }
         
-        .dropdown-menu .dropdown:hover > .dropdown-menu {{
+        .dropdown-menu .dropdown:hover > .dropdown-menu {
             display: block !important;
-        }}
+        }
 
         /* Solo aplicar hover al primer nivel de dropdown (no a submenús anidados) */
         .nav-menu > .dropdown:hover > .dropdown-menu,
-        .nav-menu > .dropdown.active > .dropdown-menu {{
+        .nav-menu > .dropdown.active > .dropdown-menu {
             display: block;
             animation: fadeInDown 0.3s ease;
-        }}
+        }
 
-        @keyframes fadeInDown {{
-            from {{
+        @keyframes fadeInDown {
+            from {
                 opacity: 0;
                 transform: translateY(-10px);
-            }}
-            to {{
+            }
+            to {
                 opacity: 1;
                 transform: translateY(0);
-            }}
-        }}
+            }
+        }
 
-        .dropdown-menu li {{
+        .dropdown-menu li {
             margin: 0;
             position: relative;
-        }}
+        }
 
-        .dropdown-menu a {{
+        .dropdown-menu a {
             display: block;
             padding: 12px 20px;
             color: #333;
@@ -353,145 +352,145 @@ html_content = f'''<!DOCTYPE html>
             font-size: 1em;
             transition: all 0.2s;
             border-bottom: 1px solid #f0f0f0;
-        }}
+        }
 
-        .dropdown-menu a:last-child {{
+        .dropdown-menu a:last-child {
             border-bottom: none;
-        }}
+        }
 
-        .dropdown-menu a:hover {{
+        .dropdown-menu a:hover {
             background: #f8f9fa;
             color: #123E92;
-        }}
+        }
         
         /* Los elementos con submenú mantienen el padding al hacer hover */
-        .dropdown-menu .dropdown > a:hover {{
+        .dropdown-menu .dropdown > a:hover {
             padding-left: 20px;
-        }}
+        }
 
-        .dropdown-menu a.active {{
+        .dropdown-menu a.active {
             background: #F7C31D;
             color: #123E92;
             font-weight: 600;
-        }}
+        }
 
-        .dropdown.active > a {{
+        .dropdown.active > a {
             background: rgba(255,255,255,0.15);
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             border-radius: 20px;
             box-shadow: 0 20px 60px rgba(0,0,0,0.3);
             overflow: hidden;
-        }}
+        }
 
-        .container > header {{
+        .container > header {
             background: #123E92;
             color: white;
             padding: 40px;
             text-align: center;
-        }}
+        }
 
-        .container > header h1 {{
+        .container > header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
-        }}
+        }
 
-        .container > header p {{
+        .container > header p {
             font-size: 1.2em;
             opacity: 0.9;
-        }}
+        }
 
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 20px;
             padding: 30px;
             background: #f8f9fa;
-        }}
+        }
 
-        .stat-card {{
+        .stat-card {
             background: white;
             padding: 25px;
             border-radius: 15px;
             box-shadow: 0 5px 15px rgba(0,0,0,0.1);
             text-align: center;
             transition: transform 0.3s, box-shadow 0.3s;
-        }}
+        }
 
-        .stat-card:hover {{
+        .stat-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 10px 25px rgba(0,0,0,0.2);
-        }}
+        }
 
-        .stat-card .number {{
+        .stat-card .number {
             font-size: 3em;
             font-weight: bold;
             color: #123E92;
             margin-bottom: 10px;
-        }}
+        }
 
-        .stat-card .label {{
+        .stat-card .label {
             font-size: 1.1em;
             color: #666;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
+        }
 
-        .section {{
+        .section {
             padding: 40px;
             border-bottom: 1px solid #e0e0e0;
-        }}
+        }
 
-        .section:last-child {{
+        .section:last-child {
             border-bottom: none;
-        }}
+        }
 
-        .section h2 {{
+        .section h2 {
             font-size: 2em;
             color: #123E92;
             margin-bottom: 25px;
             padding-bottom: 15px;
             border-bottom: 3px solid #F7C31D;
-        }}
+        }
 
-        .chart-container {{
+        .chart-container {
             background: white;
             padding: 20px;
             border-radius: 10px;
             margin-top: 20px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
             overflow-x: auto;
-        }}
+        }
 
-        .bar-chart {{
+        .bar-chart {
             display: flex;
             flex-direction: column;
             gap: 10px;
             min-width: 100%;
-        }}
+        }
 
-        .bar-item {{
+        .bar-item {
             display: flex;
             align-items: center;
             gap: 15px;
             min-width: 100%;
-        }}
+        }
 
-        .bar-label {{
+        .bar-label {
             min-width: 120px;
             max-width: 120px;
             font-weight: 500;
             color: #333;
             font-size: 0.9em;
             flex-shrink: 0;
-        }}
+        }
 
-        .bar-wrapper {{
+        .bar-wrapper {
             flex: 1;
             height: 30px;
             background: #e0e0e0;
@@ -500,9 +499,9 @@ html_content = f'''<!DOCTYPE html>
             position: relative;
             display: flex;
             align-items: flex-end;
-        }}
+        }
 
-        .bar-fill {{
+        .bar-fill {
             height: 100%;
             background: #123E92;
             border-radius: 15px;
@@ -514,10 +513,10 @@ html_content = f'''<!DOCTYPE html>
             color: white;
             font-weight: bold;
             font-size: 0.9em;
-        }}
+        }
 
         /* Gráfica de columnas verticales */
-        .column-chart {{
+        .column-chart {
             display: flex;
             flex-direction: row;
             align-items: flex-end;
@@ -525,18 +524,18 @@ html_content = f'''<!DOCTYPE html>
             gap: 15px;
             min-height: 300px;
             padding: 20px 0;
-        }}
+        }
 
-        .column-item {{
+        .column-item {
             display: flex;
             flex-direction: column;
             align-items: center;
             flex: 1;
             min-width: 60px;
             max-width: 120px;
-        }}
+        }
 
-        .column-wrapper {{
+        .column-wrapper {
             width: 100%;
             height: 250px;
             background: #e0e0e0;
@@ -545,9 +544,9 @@ html_content = f'''<!DOCTYPE html>
             display: flex;
             align-items: flex-end;
             justify-content: center;
-        }}
+        }
 
-        .column-fill {{
+        .column-fill {
             width: 100%;
             background: #123E92;
             border-radius: 5px 5px 0 0;
@@ -561,9 +560,9 @@ html_content = f'''<!DOCTYPE html>
             font-size: 0.9em;
             min-height: 20px;
             position: relative;
-        }}
+        }
 
-        .column-label {{
+        .column-label {
             margin-top: 10px;
             font-weight: 500;
             color: #333;
@@ -571,16 +570,16 @@ html_content = f'''<!DOCTYPE html>
             text-align: center;
             word-wrap: break-word;
             max-width: 100%;
-        }}
+        }
 
-        .filters-container {{
+        .filters-container {
             display: grid;
             grid-template-columns: 2fr 1fr 1fr;
             gap: 15px;
             margin-bottom: 20px;
-        }}
+        }
 
-        .search-box {{
+        .search-box {
             width: 100%;
             padding: 15px;
             font-size: 1em;
@@ -588,14 +587,14 @@ html_content = f'''<!DOCTYPE html>
             border-radius: 10px;
             transition: border-color 0.3s;
             box-sizing: border-box;
-        }}
+        }
 
-        .search-box:focus {{
+        .search-box:focus {
             outline: none;
             border-color: #F7C31D;
-        }}
+        }
 
-        .filter-select {{
+        .filter-select {
             padding: 15px;
             font-size: 1em;
             border: 2px solid #e0e0e0;
@@ -605,14 +604,14 @@ html_content = f'''<!DOCTYPE html>
             transition: border-color 0.3s;
             width: 100%;
             box-sizing: border-box;
-        }}
+        }
 
-        .filter-select:focus {{
+        .filter-select:focus {
             outline: none;
             border-color: #F7C31D;
-        }}
+        }
 
-        footer {{
+        footer {
             background: #f8f9fa;
             padding: 30px 40px;
             text-align: center;
@@ -620,148 +619,61 @@ html_content = f'''<!DOCTYPE html>
             color: #666;
             font-size: 0.9em;
             line-height: 1.8;
-        }}
+        }
 
-        @media (max-width: 768px) {{
-            body {{
+        @media (max-width: 768px) {
+            body {
                 padding: 10px;
                 padding-top: 150px;
-            }}
+            }
 
-            .header-content {{
+            .header-content {
                 flex-direction: column;
                 padding: 15px 20px;
-            }}
+            }
 
-            .logo-container {{
+            .logo-container {
                 margin-bottom: 15px;
-            }}
+            }
 
-            .nav-menu {{
+            .nav-menu {
                 flex-direction: column;
                 width: 100%;
                 gap: 5px;
-            }}
+            }
 
-            .dropdown-menu {{
+            .dropdown-menu {
                 position: static;
                 display: none;
                 box-shadow: none;
                 border-radius: 0;
                 background: rgba(255,255,255,0.1);
-            }}
+            }
 
             .nav-menu > .dropdown:hover > .dropdown-menu,
-            .nav-menu > .dropdown.active > .dropdown-menu {{
+            .nav-menu > .dropdown.active > .dropdown-menu {
                 display: block;
-            }}
+            }
 
-            .dropdown-menu a {{
+            .dropdown-menu a {
                 color: white;
                 padding: 10px 20px;
-            }}
+            }
 
-            .stats-grid {{
+            .stats-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
 
-            .section {{
+            .section {
                 padding: 25px 15px;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <!-- Contenedor para el menú (se carga dinámicamente desde menu.html) -->
-    <div id="menu-container"></div>
-
-    <div class="container">
-        <header>
-            <h1>
-                <img src="{ruta_logo.replace(chr(92), '/')}" alt="FEDEMOTO Logo" style="height: 60px; vertical-align: middle; margin-right: 15px;">
-                {titulo_informe}
-            </h1>
-            <p>Análisis completo de participantes y categorías</p>
-        </header>
-
-        <div id="content">
-            <!-- Estadísticas principales -->
-            <div class="stats-grid" id="statsGrid">
-                <!-- Se llenará con JavaScript -->
-            </div>
-
-            <!-- Sección 1: Participación por edad -->
-            <div class="section">
-                <h2>🎂 Participación por edad</h2>
-                <div class="chart-container">
-                    <div class="column-chart" id="edadChart">
-                        <!-- Se llenará con JavaScript -->
-                    </div>
-                </div>
-            </div>
-
-            <!-- Sección 2: Pilotos por categoría -->
-            <div class="section">
-                <h2>🏆 Pilotos por categoría</h2>
-                <div class="chart-container">
-                    <div class="bar-chart" id="categoriaChart">
-                        <!-- Se llenará con JavaScript -->
-                    </div>
-                </div>
-            </div>
-
-            <!-- Sección 3: Deportistas por ligas totales -->
-            <div class="section">
-                <h2>🌎 Deportistas por ligas totales</h2>
-                <div class="filters-container">
-                    <input type="text" class="search-box" id="searchLiga" placeholder="🔍 Buscar liga...">
-                    <select class="filter-select" id="filterSortLiga">
-                        <option value="cantidad-desc">Ordenar por cantidad (mayor a menor)</option>
-                        <option value="cantidad-asc">Ordenar por cantidad (menor a mayor)</option>
-                        <option value="nombre-asc">Ordenar por nombre (A-Z)</option>
-                        <option value="nombre-desc">Ordenar por nombre (Z-A)</option>
-                    </select>
-                </div>
-                <div class="chart-container">
-                    <div class="bar-chart" id="ligasChart">
-                        <!-- Se llenará con JavaScript -->
-                    </div>
-                </div>
-            </div>
-
-            <!-- Sección 4: Deportistas por ligas por categoría -->
-            <div class="section">
-                <h2>📈 Deportistas por ligas por categoría</h2>
-                <div class="filters-container" style="grid-template-columns: 1fr; max-width: 400px; margin-bottom: 30px;">
-                    <select class="filter-select" id="filtroCategoriaLiga">
-                        <option value="">Seleccione un filtro</option>
-                    </select>
-                </div>
-                <div id="todasCategoriasLigaCharts">
-                    <!-- Se llenará con todas las gráficas de categorías -->
-                </div>
-            </div>
-        </div>
-
-        <footer>
-            <p><span class="developer">Developed by Mauricio Sánchez Aguilar - Fedemoto</span></p>
-            <p>Este proyecto es de uso interno de FEDEMOTO.</p>
-            <div style="text-align: center; margin-top: 30px; padding-top: 20px; border-top: 2px solid #e0e0e0;">
-                <button id="descargarPDF" style="background: #123E92; color: white; border: none; padding: 15px 40px; font-size: 1.1em; border-radius: 8px; cursor: pointer; font-weight: 600; transition: all 0.3s; box-shadow: 0 4px 10px rgba(0,0,0,0.2);" onmouseover="this.style.background='#0d2d6b'; this.style.transform='translateY(-2px)'; this.style.boxShadow='0 6px 15px rgba(0,0,0,0.3)';" onmouseout="this.style.background='#123E92'; this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 10px rgba(0,0,0,0.2)';">
-                    📥 Descargar PDF
-                </button>
-                <p style="margin-top: 10px; color: #666; font-size: 0.9em;">Descarga este informe completo con todas las gráficas en formato PDF</p>
-            </div>
-        </footer>
-    </div>
-
-    <script>
-        // Datos incrustados directamente para evitar problemas de CORS
-        const datos = {datos_js};
+            }
+        }
+"""
 
-        // Función para corregir ortografía de departamentos
-        function corregirOrtografiaDepartamento(nombre) {{
-            const correcciones = {{
+# Gráficas y botón PDF de los informes (usa datos, datosListos y nombreArchivoPDF de cada informe)
+SCRIPT_INFORME = """        // Función para corregir ortografía de departamentos
+        function corregirOrtografiaDepartamento(nombre) {
+            const correcciones = {
                 'NARINO': 'Nariño',
                 'QUINDIO': 'Quindío',
                 'BOGOTA': 'Bogotá',
@@ -779,81 +691,88 @@ html_content = f'''<!DOCTYPE html>
                 'RISARALDA': 'Risaralda',
                 'SANTANDER': 'Santander',
                 'TOLIMA': 'Tolima'
-            }};
+            };
             return correcciones[nombre] || nombre;
-        }}
-
-        document.addEventListener('DOMContentLoaded', function() {{
-            renderizarEstadisticas();
-            renderizarEdad();
-            renderizarCategorias();
-            renderizarLigas();
-            renderizarCategoriaLiga();
-        }});
-
-        function renderizarEstadisticas() {{
+        }
+
+        document.addEventListener('DOMContentLoaded', function() {
+            // Con los datos comprimidos, esperar a que se descompriman
+            datosListos.then(function() {
+                // Si las gráficas iniciales vienen generadas en el HTML, solo se conectan los filtros
+                const prerenderizado = document.body.hasAttribute('data-prerenderizado');
+                if (!prerenderizado) {
+                    renderizarEstadisticas();
+                    renderizarEdad();
+                    renderizarCategorias();
+                }
+                renderizarLigas(prerenderizado);
+                renderizarCategoriaLiga(prerenderizado);
+            });
+        });
+
+        function renderizarEstadisticas() {
             const statsGrid = document.getElementById('statsGrid');
             const totalCategorias = Object.keys(datos.pilotos_por_categoria).length;
             const totalLigas = Object.keys(datos.deportistas_por_liga_total).length;
 
             statsGrid.innerHTML = `
                 <div class="stat-card">
-                    <div class="number">${{datos.total_pilotos_unicos}}</div>
+                    <div class="number">${datos.total_pilotos_unicos}</div>
                     <div class="label">Licencias Únicas</div>
                 </div>
                 <div class="stat-card">
-                    <div class="number">${{datos.total_participaciones}}</div>
+                    <div class="number">${datos.total_participaciones}</div>
                     <div class="label">Total Participaciones</div>
                 </div>
                 <div class="stat-card">
-                    <div class="number">${{totalCategorias}}</div>
+                    <div class="number">${totalCategorias}</div>
                     <div class="label">Categorías</div>
                 </div>
                 <div class="stat-card">
-                    <div class="number">${{totalLigas}}</div>
+                    <div class="number">${totalLigas}</div>
                     <div class="label">Ligas</div>
                 </div>
             `;
-        }}
+        }
 
-        function renderizarCategorias() {{
+        function renderizarCategorias() {
             const chart = document.getElementById('categoriaChart');
             const categorias = Object.entries(datos.pilotos_por_categoria)
                 .sort((a, b) => b[1] - a[1]);
 
             const maxValue = Math.max(...categorias.map(([, v]) => v), 1);
 
-            chart.innerHTML = categorias.map(([categoria, cantidad]) => {{
+            chart.innerHTML = categorias.map(([categoria, cantidad]) => {
                 const porcentaje = (cantidad / maxValue) * 100;
                 return `
                     <div class="bar-item">
-                        <div class="bar-label">${{categoria}}</div>
+                        <div class="bar-label">${categoria}</div>
                         <div class="bar-wrapper">
-                            <div class="bar-fill" style="width: ${{porcentaje}}%">
-                                ${{cantidad}}
+                            <div class="bar-fill" style="width: ${porcentaje}%">
+                                ${cantidad}
                             </div>
                         </div>
                     </div>
                 `;
-            }}).join('');
-        }}
+            }).join('');
+        }
 
-        function renderizarLigas() {{
+        function renderizarLigas(prerenderizado) {
             const chart = document.getElementById('ligasChart');
             let ligas = Object.entries(datos.deportistas_por_liga_total);
             let sortBy = 'cantidad-desc';
 
-            function aplicarFiltros() {{
+            function aplicarFiltros() {
                 const search = document.getElementById('searchLiga').value.toLowerCase();
                 sortBy = document.getElementById('filterSortLiga').value;
 
-                let ligasFiltradas = ligas.filter(([liga]) => {{
+                let ligasFiltradas = ligas.filter(([liga]) => {
                     const ligaCorregida = corregirOrtografiaDepartamento(liga);
                     return ligaCorregida.toLowerCase().includes(search) || liga.toLowerCase().includes(search);
-                }});
+                });
 
-                ligasFiltradas.sort((a, b) => {{
-                    switch(sortBy) {{
+                ligasFiltradas.sort((a, b) => {
+                    switch(sortBy) {
                         case 'cantidad-desc':
                             return b[1] - a[1];
                         case 'cantidad-asc':
@@ -864,112 +783,116 @@ html_content = f'''<!DOCTYPE html>
                             return b[0].localeCompare(a[0]);
                         default:
                             return b[1] - a[1];
-                    }}
-                }});
+                    }
+                });
 
                 const maxValue = Math.max(...ligasFiltradas.map(([, v]) => v), 1);
 
-                chart.innerHTML = ligasFiltradas.map(([liga, cantidad]) => {{
+                chart.innerHTML = ligasFiltradas.map(([liga, cantidad]) => {
                     const porcentaje = (cantidad / maxValue) * 100;
                     const ligaCorregida = corregirOrtografiaDepartamento(liga);
                     return `
                         <div class="bar-item">
-                            <div class="bar-label">${{ligaCorregida}}</div>
+                            <div class="bar-label">${ligaCorregida}</div>
                             <div class="bar-wrapper">
-                                <div class="bar-fill" style="width: ${{porcentaje}}%">
-                                    ${{cantidad}}
+                                <div class="bar-fill" style="width: ${porcentaje}%">
+                                    ${cantidad}
                                 </div>
                             </div>
                         </div>
                     `;
-                }}).join('');
-            }}
+                }).join('');
+            }
 
             document.getElementById('searchLiga').addEventListener('input', aplicarFiltros);
             document.getElementById('filterSortLiga').addEventListener('change', aplicarFiltros);
-            aplicarFiltros();
-        }}
+            if (!prerenderizado) {
+                aplicarFiltros();
+            }
+        }
 
-        function renderizarCategoriaLiga() {{
+        function renderizarCategoriaLiga(prerenderizado) {
             const container = document.getElementById('todasCategoriasLigaCharts');
             const filtroSelect = document.getElementById('filtroCategoriaLiga');
             const categorias = Object.keys(datos.deportistas_por_liga_categoria).sort();
 
             // Llenar el selector con todas las categorías
-            filtroSelect.innerHTML = '<option value="">Seleccione un filtro</option>' +
-                '<option value="todas">Mostrar todas las categorías</option>' +
-                categorias.map(cat => 
-                    `<option value="${{cat}}">${{cat}}</option>`
-                ).join('');
-
-            function mostrarGraficas(categoriaFiltro) {{
+            if (!prerenderizado) {
+                filtroSelect.innerHTML = '<option value="">Seleccione un filtro</option>' +
+                    '<option value="todas">Mostrar todas las categorías</option>' +
+                    categorias.map(cat => 
+                        `<option value="${cat}">${cat}</option>`
+                    ).join('');
+            }
+
+            function mostrarGraficas(categoriaFiltro) {
                 // Si no hay filtro seleccionado, no mostrar nada
-                if (!categoriaFiltro || categoriaFiltro === '') {{
+                if (!categoriaFiltro || categoriaFiltro === '') {
                     container.innerHTML = '';
                     return;
-                }}
+                }
                 
                 // Si se selecciona "todas", mostrar todas las categorías
                 const categoriasAMostrar = categoriaFiltro === 'todas' 
                     ? categorias 
                     : [categoriaFiltro];
 
-                container.innerHTML = categoriasAMostrar.map(categoria => {{
-                    const ligas = Object.entries(datos.deportistas_por_liga_categoria[categoria] || {{}})
+                container.innerHTML = categoriasAMostrar.map(categoria => {
+                    const ligas = Object.entries(datos.deportistas_por_liga_categoria[categoria] || {})
                         .sort((a, b) => b[1] - a[1]);
 
-                    if (ligas.length === 0) {{
+                    if (ligas.length === 0) {
                         return '';
-                    }}
+                    }
 
                     const maxValue = Math.max(...ligas.map(([, v]) => v), 1);
                     const maxHeight = 200; // Altura máxima de las columnas
 
-                    const chartHTML = ligas.map(([liga, cantidad]) => {{
+                    const chartHTML = ligas.map(([liga, cantidad]) => {
                         const altura = (cantidad / maxValue) * maxHeight;
                         const ligaCorregida = corregirOrtografiaDepartamento(liga);
                         return `
                             <div class="column-item">
                                 <div class="column-wrapper">
-                                    <div class="column-fill" style="height: ${{altura}}px">
-                                        ${{cantidad}}
+                                    <div class="column-fill" style="height: ${altura}px">
+                                        ${cantidad}
                                     </div>
                                 </div>
-                                <div class="column-label">${{ligaCorregida}}</div>
+                                <div class="column-label">${ligaCorregida}</div>
                             </div>
                         `;
-                    }}).join('');
+                    }).join('');
 
                     return `
                         <div style="margin-bottom: 40px;">
-                            <h3 style="color: #123E92; margin-bottom: 20px; font-size: 1.3em; padding-bottom: 10px; border-bottom: 2px solid #F7C31D;">${{categoria}}</h3>
+                            <h3 style="color: #123E92; margin-bottom: 20px; font-size: 1.3em; padding-bottom: 10px; border-bottom: 2px solid #F7C31D;">${categoria}</h3>
                             <div class="chart-container">
                                 <div class="column-chart">
-                                    ${{chartHTML}}
+                                    ${chartHTML}
                                 </div>
                             </div>
                         </div>
                     `;
-                }}).join('');
-            }}
+                }).join('');
+            }
 
             // No mostrar nada por defecto (esperar a que el usuario seleccione un filtro)
             container.innerHTML = '';
 
             // Event listener para el filtro
-            filtroSelect.addEventListener('change', function() {{
+            filtroSelect.addEventListener('change', function() {
                 mostrarGraficas(this.value);
-            }});
-        }}
+            });
+        }
 
-        function renderizarEdad() {{
+        function renderizarEdad() {
             const chart = document.getElementById('edadChart');
-            const edades = Object.entries(datos.participaciones_por_edad || {{}});
+            const edades = Object.entries(datos.participaciones_por_edad || {});
             
-            if (edades.length === 0) {{
+            if (edades.length === 0) {
                 chart.innerHTML = '<p style="text-align: center; padding: 40px; color: #666;">No hay datos de edad disponibles</p>';
                 return;
-            }}
+            }
 
             // Ordenar por orden de edad (rango de 5 años, empezando desde 1-5)
             const ordenEdades = [
@@ -979,52 +902,52 @@ html_content = f'''<!DOCTYPE html>
                 "61-65 años", "66+ años"
             ];
             
-            edades.sort((a, b) => {{
+            edades.sort((a, b) => {
                 const idxA = ordenEdades.indexOf(a[0]);
                 const idxB = ordenEdades.indexOf(b[0]);
                 if (idxA === -1 && idxB === -1) return a[0].localeCompare(b[0]);
                 if (idxA === -1) return 1;
                 if (idxB === -1) return -1;
                 return idxA - idxB;
-            }});
+            });
 
             const maxValue = Math.max(...edades.map(([, v]) => v), 1);
             const maxHeight = 250;
 
-            chart.innerHTML = edades.map(([rango, cantidad]) => {{
+            chart.innerHTML = edades.map(([rango, cantidad]) => {
                 const altura = (cantidad / maxValue) * maxHeight;
                 return `
                     <div class="column-item">
                         <div class="column-wrapper">
-                            <div class="column-fill" style="height: ${{altura}}px">
-                                ${{cantidad}}
+                            <div class="column-fill" style="height: ${altura}px">
+                                ${cantidad}
                             </div>
                         </div>
-                        <div class="column-label">${{rango}}</div>
+                        <div class="column-label">${rango}</div>
                     </div>
                 `;
-            }}).join('');
-        }}
+            }).join('');
+        }
 
         // El menú se carga dinámicamente desde menu.html usando load-menu.js
 
         // Función para descargar el informe como PDF
-        document.getElementById('descargarPDF').addEventListener('click', function() {{
+        document.getElementById('descargarPDF').addEventListener('click', function() {
             const button = this;
             const buttonContainer = button.parentElement;
             const originalText = button.innerHTML;
             
             // Mostrar modal de carga con SweetAlert
-            Swal.fire({{
+            Swal.fire({
                 title: 'Generando PDF',
                 html: 'Por favor espere mientras se genera el documento...',
                 allowOutsideClick: false,
                 allowEscapeKey: false,
                 showConfirmButton: false,
-                didOpen: () => {{
+                didOpen: () => {
                     Swal.showLoading();
-                }}
-            }});
+                }
+            });
 
             // Deshabilitar el botón pero mantenerlo visible
             button.disabled = true;
@@ -1039,16 +962,16 @@ html_content = f'''<!DOCTYPE html>
             // Capturar el contenido del contenedor principal
             const element = document.querySelector('.container');
             
-            html2canvas(element, {{
+            html2canvas(element, {
                 scale: 2,
                 useCORS: true,
                 logging: false,
                 backgroundColor: '#ffffff',
                 windowWidth: element.scrollWidth,
                 windowHeight: element.scrollHeight
-            }}).then(canvas => {{
+            }).then(canvas => {
                 const imgData = canvas.toDataURL('image/png');
-                const {{ jsPDF }} = window.jspdf;
+                const { jsPDF } = window.jspdf;
                 const pdf = new jsPDF('p', 'mm', 'a4');
                 
                 const imgWidth = 210; // Ancho A4 en mm
@@ -1062,26 +985,26 @@ html_content = f'''<!DOCTYPE html>
                 heightLeft -= pageHeight;
 
                 // Agregar páginas adicionales si el contenido es más largo que una página
-                while (heightLeft >= 0) {{
+                while (heightLeft >= 0) {
                     position = heightLeft - imgHeight;
                     pdf.addPage();
                     pdf.addImage(imgData, 'PNG', 0, position, imgWidth, imgHeight);
                     heightLeft -= pageHeight;
-                }}
+                }
 
                 // Descargar el PDF
-                const nombreArchivo = '{nombre_valida.replace("/", "_").replace(" ", "_")}_informe.pdf';
+                const nombreArchivo = nombreArchivoPDF;
                 pdf.save(nombreArchivo);
 
                 // Cerrar el modal y mostrar éxito
-                Swal.fire({{
+                Swal.fire({
                     icon: 'success',
                     title: 'PDF generado',
                     text: 'El informe se ha descargado correctamente',
                     confirmButtonColor: '#123E92',
                     timer: 2000,
                     timerProgressBar: true
-                }});
+                });
 
                 // Restaurar el contenedor del botón (siempre centrado)
                 buttonContainer.style.display = originalDisplay || 'block';
@@ -1089,22 +1012,379 @@ html_content = f'''<!DOCTYPE html>
                 button.disabled = false;
                 button.style.opacity = '1';
                 button.style.cursor = 'pointer';
-            }}).catch(error => {{
+            }).catch(error => {
                 console.error('Error al generar PDF:', error);
-                Swal.fire({{
+                Swal.fire({
                     icon: 'error',
                     title: 'Error',
                     text: 'No se pudo generar el PDF. Por favor, intente nuevamente.',
                     confirmButtonColor: '#123E92'
-                }});
+                });
                 buttonContainer.style.display = originalDisplay || 'block';
                 button.innerHTML = originalText;
                 button.disabled = false;
                 button.style.opacity = '1';
                 button.style.cursor = 'pointer';
-            }});
-        }});
+            });
+        });
+"""
+
+def nombre_recurso(contenido, extension):
+    """
+    Nombre versionado de un recurso, informe.<hash del contenido>.<extension>:
+    el navegador lo guarda en caché entre informes y si el contenido cambia,
+    cambia el nombre.
+    """
+    return f"informe.{hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:12]}.{extension}"
+
+def escribir_recursos(project_root=None):
+    """
+    Escribe la hoja de estilos y el script de los informes en <raíz>/recursos/
+    (solo si aún no existen) y retorna sus nombres: {'css': ..., 'js': ...}.
+    """
+    if project_root is None:
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    carpeta = os.path.join(project_root, DIRECTORIO_RECURSOS)
+    os.makedirs(carpeta, exist_ok=True)
+    nombres = {}
+    for extension, contenido in (('css', ESTILOS_INFORME), ('js', SCRIPT_INFORME)):
+        nombre = nombre_recurso(contenido, extension)
+        ruta = os.path.join(carpeta, nombre)
+        if not os.path.exists(ruta):
+            # Escribir en un temporal y renombrar, porque los procesos del lote pueden escribirlo a la vez
+            descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix='.tmp')
+            with os.fdopen(descriptor, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(contenido)
+            # mkstemp crea el archivo solo legible por el usuario; el servidor web debe poder leerlo
+            os.chmod(temporal, 0o644)
+            os.replace(temporal, ruta)
+        nombres[extension] = nombre
+    return nombres
+
+# Formas de incrustar los datos en el HTML
+FORMATOS_DATOS = ('indentado', 'minificado', 'comprimido')
+
+def codificar_datos(datos, formato='indentado'):
+    """
+    Retorna las líneas de JavaScript que declaran datos y datosListos (una
+    promesa que se cumple cuando los datos están disponibles), junto con el
+    tamaño en bytes de los datos indentados y de los datos incrustados.
+    - indentado: JSON con sangría, como siempre.
+    - minificado: JSON sin espacios.
+    - comprimido: JSON minificado, comprimido con gzip y codificado en base64;
+      el navegador lo descomprime con DecompressionStream.
+    """
+    if formato not in FORMATOS_DATOS:
+        raise ValueError(f"Formato de datos no soportado: {formato}")
+    # "</" dentro de un texto cerraría la etiqueta <script>
+    indentado = json.dumps(datos, ensure_ascii=False, indent=2).replace('</', '<\\/')
+    tamano_original = len(indentado.encode('utf-8'))
+
+    if formato == 'indentado':
+        return (f"        // Datos incrustados directamente para evitar problemas de CORS\n"
+                f"        const datos = {indentado};\n"
+                f"        const datosListos = Promise.resolve(datos);"), tamano_original, tamano_original
+
+    minificado = json.dumps(datos, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    if formato == 'minificado':
+        return (f"        // Datos incrustados directamente para evitar problemas de CORS\n"
+                f"        const datos = {minificado};\n"
+                f"        const datosListos = Promise.resolve(datos);"), tamano_original, len(minificado.encode('utf-8'))
+
+    # mtime=0 para que el mismo JSON produzca siempre el mismo HTML
+    comprimido = base64.b64encode(gzip.compress(minificado.encode('utf-8'), compresslevel=9, mtime=0)).decode('ascii')
+    return (f"        // Datos comprimidos con gzip y codificados en base64\n"
+            f"        let datos = null;\n"
+            f"        const datosListos = new Response(\n"
+            f"            new Blob([Uint8Array.from(atob('{comprimido}'), c => c.charCodeAt(0))])\n"
+            f"                .stream().pipeThrough(new DecompressionStream('gzip'))\n"
+            f"        ).text().then(texto => {{ datos = JSON.parse(texto); return datos; }});\n"
+            f"        datosListos.catch(error => console.error('No se pudieron descomprimir los datos:', error));"), \
+        tamano_original, len(comprimido)
+
+# Correcciones de nombres de departamentos (las mismas de corregirOrtografiaDepartamento en SCRIPT_INFORME)
+CORRECCIONES_DEPARTAMENTOS = {
+    'NARINO': 'Nariño',
+    'QUINDIO': 'Quindío',
+    'BOGOTA': 'Bogotá',
+    'VALLE': 'Valle del Cauca',
+    'ANTIOQUIA': 'Antioquia',
+    'ARAUCA': 'Arauca',
+    'CALDAS': 'Caldas',
+    'CASANARE': 'Casanare',
+    'CAUCA': 'Cauca',
+    'CESAR': 'Cesar',
+    'CUNDINAMARCA': 'Cundinamarca',
+    'HUILA': 'Huila',
+    'META': 'Meta',
+    'PUTUMAYO': 'Putumayo',
+    'RISARALDA': 'Risaralda',
+    'SANTANDER': 'Santander',
+    'TOLIMA': 'Tolima'
+}
+
+# Orden de los rangos de edad (el mismo de renderizarEdad en SCRIPT_INFORME)
+ORDEN_EDADES = [
+    "0 años", "1-5 años", "6-10 años", "11-15 años", "16-20 años",
+    "21-25 años", "26-30 años", "31-35 años", "36-40 años",
+    "41-45 años", "46-50 años", "51-55 años", "56-60 años",
+    "61-65 años", "66+ años"
+]
+
+# Contenido de los contenedores cuando las gráficas se dibujan en el navegador
+GRAFICAS_VACIAS = {
+    'estadisticas': '<!-- Se llenará con JavaScript -->',
+    'edad': '<!-- Se llenará con JavaScript -->',
+    'categorias': '<!-- Se llenará con JavaScript -->',
+    'ligas': '<!-- Se llenará con JavaScript -->',
+    'opciones_categoria_liga': '<option value="">Seleccione un filtro</option>'
+}
+
+def _entradas_js(diccionario):
+    """
+    Retorna los pares del diccionario en el orden de Object.entries de
+    JavaScript: primero las claves que son índices enteros, de menor a mayor,
+    y luego las demás en su orden original.
+    """
+    def es_indice(clave):
+        return clave.isdigit() and (clave == '0' or not clave.startswith('0')) and int(clave) < 2 ** 32 - 1
+    indices = sorted((clave for clave in diccionario if es_indice(clave)), key=int)
+    return [(clave, diccionario[clave]) for clave in indices] + \
+        [(clave, valor) for clave, valor in diccionario.items() if not es_indice(clave)]
+
+def _numero_js(valor):
+    """
+    Escribe un número como lo hace JavaScript en una plantilla (100, no 100.0).
+    """
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+def _barra(etiqueta, cantidad, porcentaje):
+    return (f'<div class="bar-item"><div class="bar-label">{escape(etiqueta)}</div>'
+            f'<div class="bar-wrapper"><div class="bar-fill" style="width: {_numero_js(porcentaje)}%">'
+            f'{cantidad}</div></div></div>')
+
+def _columna(etiqueta, cantidad, altura):
+    return (f'<div class="column-item"><div class="column-wrapper">'
+            f'<div class="column-fill" style="height: {_numero_js(altura)}px">{cantidad}</div></div>'
+            f'<div class="column-label">{escape(etiqueta)}</div></div>')
+
+def series_graficas(datos):
+    """
+    Ordena los datos de las gráficas como lo hace el script del informe:
+    tarjetas [(número, etiqueta)], edades [(rango, cantidad)] en el orden de
+    ORDEN_EDADES, categorías y ligas [(nombre, cantidad)] de mayor a menor
+    (ligas con el nombre corregido) y categorias_liga [(categoría, ligas)]
+    con las categorías por nombre.
+    """
+    categorias = _entradas_js(datos.get('pilotos_por_categoria', {}))
+    ligas = _entradas_js(datos.get('deportistas_por_liga_total', {}))
+
+    tarjetas = [
+        (datos.get('total_pilotos_unicos', 0), 'Licencias Únicas'),
+        (datos.get('total_participaciones', 0), 'Total Participaciones'),
+        (len(categorias), 'Categorías'),
+        (len(ligas), 'Ligas')
+    ]
+
+    def orden_edad(par):
+        # Los rangos que no están en ORDEN_EDADES van al final, por nombre
+        posicion = ORDEN_EDADES.index(par[0]) if par[0] in ORDEN_EDADES else len(ORDEN_EDADES)
+        return (posicion, par[0] if posicion == len(ORDEN_EDADES) else '')
+
+    def por_cantidad(pares, corregir=False):
+        # sorted es estable, como el sort de JavaScript: los empates conservan el orden de los datos
+        pares = sorted(pares, key=lambda par: -par[1])
+        return [(CORRECCIONES_DEPARTAMENTOS.get(nombre, nombre), cantidad) for nombre, cantidad in pares] \
+            if corregir else pares
+
+    por_liga_categoria = datos.get('deportistas_por_liga_categoria', {})
+    return {
+        'tarjetas': tarjetas,
+        'edades': sorted(_entradas_js(datos.get('participaciones_por_edad') or {}), key=orden_edad),
+        'categorias': por_cantidad(categorias),
+        'ligas': por_cantidad(ligas, corregir=True),
+        'categorias_liga': [
+            (categoria, por_cantidad(_entradas_js(por_liga_categoria[categoria] or {}), corregir=True))
+            for categoria in sorted(por_liga_categoria)
+        ]
+    }
+
+def prerenderizar_graficas(datos, sangria=' ' * 24):
+    """
+    Genera el HTML inicial de las tarjetas y gráficas (lo mismo que dibujan
+    renderizarEstadisticas, renderizarEdad, renderizarCategorias,
+    renderizarLigas y las opciones de renderizarCategoriaLiga), para que la
+    página se vea completa sin esperar al script. Retorna un diccionario con
+    las mismas claves de GRAFICAS_VACIAS.
+    """
+    separador = '\n' + sangria
+    # Las tarjetas van un nivel menos adentro que las gráficas
+    separador_tarjetas = '\n' + sangria[8:]
+    series = series_graficas(datos)
+
+    estadisticas = separador_tarjetas.join(
+        f'<div class="stat-card"><div class="number">{numero}</div><div class="label">{etiqueta}</div></div>'
+        for numero, etiqueta in series['tarjetas']
+    )
+
+    edades = series['edades']
+    if edades:
+        maximo = max(max(cantidad for _, cantidad in edades), 1)
+        edad = separador.join(_columna(rango, cantidad, cantidad / maximo * 250) for rango, cantidad in edades)
+    else:
+        edad = '<p style="text-align: center; padding: 40px; color: #666;">No hay datos de edad disponibles</p>'
+
+    barras = {}
+    for clave in ('categorias', 'ligas'):
+        maximo = max([cantidad for _, cantidad in series[clave]] + [1])
+        barras[clave] = separador.join(_barra(nombre, cantidad, cantidad / maximo * 100)
+                                       for nombre, cantidad in series[clave])
+
+    opciones = ['<option value="">Seleccione un filtro</option>',
+                '<option value="todas">Mostrar todas las categorías</option>']
+    opciones += [f'<option value="{escape(c)}">{escape(c)}</option>' for c, _ in series['categorias_liga']]
+
+    return {
+        'estadisticas': estadisticas,
+        'edad': edad,
+        'categorias': barras['categorias'],
+        'ligas': barras['ligas'],
+        'opciones_categoria_liga': separador.join(opciones)
+    }
+
+def generar_html(datos, output_path, nombre_valida, recursos=None, formato_datos='indentado', prerenderizar=False):
+    """
+    Retorna el HTML del informe con los datos incrustados.
+    recursos: nombres de escribir_recursos() para enlazar los estilos y el
+    script compartidos; sin ellos se incrustan en el HTML.
+    formato_datos: 'indentado', 'minificado' o 'comprimido' (ver codificar_datos).
+    prerenderizar: incluir en el HTML las gráficas iniciales (ver prerenderizar_graficas).
+    """
+    rutas = calcular_rutas(output_path)
+    titulo_informe = titulo_del_informe(rutas['partes_directorio'], nombre_valida)
+    ruta_logo = rutas['ruta_logo']
+    ruta_load_menu = rutas['ruta_load_menu']
+
+    if recursos:
+        ruta_recursos = rutas['ruta_recursos']
+        bloque_estilos = f'    <link rel="stylesheet" href="{ruta_recursos}{recursos["css"]}">'
+        bloque_script = f'    <script src="{ruta_recursos}{recursos["js"]}"></script>'
+    else:
+        bloque_estilos = f'    <style>\n{ESTILOS_INFORME}    </style>'
+        bloque_script = f'    <script>\n{SCRIPT_INFORME}    </script>'
+
+    graficas = prerenderizar_graficas(datos) if prerenderizar else GRAFICAS_VACIAS
+
+    # Convertir datos a formato JavaScript
+    datos_js, tamano_original, tamano_final = codificar_datos(datos, formato_datos)
+    if formato_datos != 'indentado':
+        print(f"Datos incrustados ({formato_datos}): {tamano_original / 1024:.1f} KB -> "
+              f"{tamano_final / 1024:.1f} KB ({100 * tamano_final / max(tamano_original, 1):.0f}%)")
+
+    # Generar el HTML
+    html_content = f'''<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{titulo_informe}</title>
+    <link rel="icon" type="image/png" href="{ruta_logo}">
+    <!-- Librerías para generar PDF -->
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
+    <!-- SweetAlert2 para modales -->
+    <script src="https://cdn.jsdelivr.net/npm/sweetalert2@11"></script>
+{bloque_estilos}
+</head>
+<body{' data-prerenderizado' if prerenderizar else ''}>
+    <!-- Contenedor para el menú (se carga dinámicamente desde menu.html) -->
+    <div id="menu-container"></div>
+
+    <div class="container">
+        <header>
+            <h1>
+                <img src="{ruta_logo.replace(chr(92), '/')}" alt="FEDEMOTO Logo" style="height: 60px; vertical-align: middle; margin-right: 15px;">
+                {titulo_informe}
+            </h1>
+            <p>Análisis completo de participantes y categorías</p>
+        </header>
+
+        <div id="content">
+            <!-- Estadísticas principales -->
+            <div class="stats-grid" id="statsGrid">
+                {graficas['estadisticas']}
+            </div>
+
+            <!-- Sección 1: Participación por edad -->
+            <div class="section">
+                <h2>🎂 Participación por edad</h2>
+                <div class="chart-container">
+                    <div class="column-chart" id="edadChart">
+                        {graficas['edad']}
+                    </div>
+                </div>
+            </div>
+
+            <!-- Sección 2: Pilotos por categoría -->
+            <div class="section">
+                <h2>🏆 Pilotos por categoría</h2>
+                <div class="chart-container">
+                    <div class="bar-chart" id="categoriaChart">
+                        {graficas['categorias']}
+                    </div>
+                </div>
+            </div>
+
+            <!-- Sección 3: Deportistas por ligas totales -->
+            <div class="section">
+                <h2>🌎 Deportistas por ligas totales</h2>
+                <div class="filters-container">
+                    <input type="text" class="search-box" id="searchLiga" placeholder="🔍 Buscar liga...">
+                    <select class="filter-select" id="filterSortLiga">
+                        <option value="cantidad-desc">Ordenar por cantidad (mayor a menor)</option>
+                        <option value="cantidad-asc">Ordenar por cantidad (menor a mayor)</option>
+                        <option value="nombre-asc">Ordenar por nombre (A-Z)</option>
+                        <option value="nombre-desc">Ordenar por nombre (Z-A)</option>
+                    </select>
+                </div>
+                <div class="chart-container">
+                    <div class="bar-chart" id="ligasChart">
+                        {graficas['ligas']}
+                    </div>
+                </div>
+            </div>
+
+            <!-- Sección 4: Deportistas por ligas por categoría -->
+            <div class="section">
+                <h2>📈 Deportistas por ligas por categoría</h2>
+                <div class="filters-container" style="grid-template-columns: 1fr; max-width: 400px; margin-bottom: 30px;">
+                    <select class="filter-select" id="filtroCategoriaLiga">
+                        {graficas['opciones_categoria_liga']}
+                    </select>
+                </div>
+                <div id="todasCategoriasLigaCharts">
+                    <!-- Se llenará con todas las gráficas de categorías -->
+                </div>
+            </div>
+        </div>
+
+        <footer>
+            <p><span class="developer">Developed by Mauricio Sánchez Aguilar - Fedemoto</span></p>
+            <p>Este proyecto es de uso interno de FEDEMOTO.</p>
+            <div style="text-align: center; margin-top: 30px; padding-top: 20px; border-top: 2px solid #e0e0e0;">
+                <button id="descargarPDF" style="background: #123E92; color: white; border: none; padding: 15px 40px; font-size: 1.1em; border-radius: 8px; cursor: pointer; font-weight: 600; transition: all 0.3s; box-shadow: 0 4px 10px rgba(0,0,0,0.2);" onmouseover="this.style.background='#0d2d6b'; this.style.transform='translateY(-2px)'; this.style.boxShadow='0 6px 15px rgba(0,0,0,0.3)';" onmouseout="this.style.background='#123E92'; this.style.transform='translateY(0)'; this.style.boxShadow='0 4px 10px rgba(0,0,0,0.2)';">
+                    📥 Descargar PDF
+                </button>
+                <p style="margin-top: 10px; color: #666; font-size: 0.9em;">Descarga este informe completo con todas las gráficas en formato PDF</p>
+            </div>
+        </footer>
+    </div>
+
+    <script>
+{datos_js}
+        const nombreArchivoPDF = '{nombre_valida.replace("/", "_").replace(" ", "_")}_informe.pdf';
     </script>
+{bloque_script}
     
     <!-- Script para cargar el menú dinámicamente -->
     <script src="{ruta_load_menu.replace(chr(92), '/')}"></script>
@@ -1136,220 +1416,335 @@ html_content = f'''<!DOCTYPE html>
 </body>
 </html>
 '''
+    return html_content
 
-# Guardar el HTML
-# Escribir el HTML con encoding UTF-8
-try:
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-except Exception as e:
-    print(f"Error al escribir el archivo HTML: {e}")
-    sys.exit(1)
+AZUL = '#123E92'
+AMARILLO = '#F7C31D'
+GRIS_FONDO = '#e0e0e0'
 
-print(f"HTML generado en: {output_path}")
-
-# Función para agregar el enlace al nuevo informe en todos los menús HTML
-def agregar_enlace_a_menus(output_html_path, nombre_valida):
+def generar_pdf(datos, output_path, nombre_valida, ruta_pdf=None):
     """
-    Busca todos los archivos HTML y agrega el enlace al nuevo informe en el menú correspondiente.
+    Genera un PDF vectorial del informe directamente desde los datos, sin
+    navegador: encabezado, tarjetas, columnas por edad y barras por
+    categoría, por liga y por liga dentro de cada categoría, dibujadas con
+    documento_pdf. output_path es la ruta del HTML (para el título); el PDF
+    se guarda en ruta_pdf o, por defecto, junto al HTML con extensión .pdf.
+    Retorna la ruta del PDF.
     """
-    # Obtener el nombre del archivo HTML generado
-    nombre_archivo_html = os.path.basename(output_html_path)
-    
-    # Obtener la ruta relativa desde la raíz del proyecto
-    # output_html_path es relativo a Informes/, necesitamos la ruta completa
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(script_dir)
-    
-    # Buscar todos los archivos HTML en el proyecto
-    html_files = []
-    for root, dirs, files in os.walk(project_root):
-        # Excluir node_modules y otros directorios no relevantes
-        dirs[:] = [d for d in dirs if d not in ['.git', 'node_modules', '__pycache__']]
-        for file in files:
-            if file.endswith('.html'):
-                html_files.append(os.path.join(root, file))
-    
-    # Determinar la ruta relativa del nuevo informe desde cada HTML
-    # output_html_path puede ser relativo a Informes/, Resultados_validas/, o Resultados_generales/
-    # Necesitamos determinar en qué carpeta base está el informe
-    output_dir = os.path.dirname(output_html_path)
-    
-    # Determinar la carpeta base (Informes, Resultados_validas, o Resultados_generales)
-    # output_html_path puede ser "Motocross/Primer semestre/informe.html" (relativo a Informes/)
-    # o puede incluir la carpeta base: "Resultados_validas/Motocross/Primer semestre/informe.html"
-    output_path_norm = output_html_path.replace('\\', '/')
-    partes_output = [p for p in output_path_norm.split('/') if p]
-    
-    # Determinar carpeta base y ruta relativa dentro de esa carpeta
-    if partes_output[0].lower() in ['resultados_validas', 'resultados de válidas']:
-        carpeta_base = 'Resultados_validas'
-        ruta_dentro_base = '/'.join(partes_output[1:]) if len(partes_output) > 1 else ''
-        output_file_full = os.path.join(project_root, 'Resultados_validas', ruta_dentro_base) if ruta_dentro_base else os.path.join(project_root, 'Resultados_validas')
-        menu_objetivo = 'Resultados de válidas'
-    elif partes_output[0].lower() in ['resultados_generales', 'resultados generales']:
-        carpeta_base = 'Resultados_generales'
-        ruta_dentro_base = '/'.join(partes_output[1:]) if len(partes_output) > 1 else ''
-        output_file_full = os.path.join(project_root, 'Resultados_generales', ruta_dentro_base) if ruta_dentro_base else os.path.join(project_root, 'Resultados_generales')
-        menu_objetivo = 'Resultados generales'
+    ruta_pdf = ruta_pdf or os.path.splitext(output_path)[0] + '.pdf'
+    titulo_informe = titulo_del_informe(calcular_rutas(output_path)['partes_directorio'], nombre_valida)
+    series = series_graficas(datos)
+
+    pdf = DocumentoPDF(titulo_informe)
+    margen = 40
+    ancho_util = pdf.ancho - 2 * margen
+    limite = pdf.alto - 45
+    y = 0
+
+    def espacio(alto):
+        # Pasa a una página nueva si el bloque no cabe en la actual
+        nonlocal y
+        if not pdf.paginas or y + alto > limite:
+            pdf.nueva_pagina()
+            y = margen
+
+    def titulo_seccion(texto):
+        nonlocal y
+        espacio(60)
+        y += 10
+        pdf.texto(margen, y + 14, texto, 16, negrita=True, color=AZUL)
+        pdf.rectangulo(margen, y + 22, ancho_util, 2, relleno=AMARILLO)
+        y += 36
+
+    def barras(pares):
+        # Barras horizontales como .bar-chart: etiqueta, fondo gris y relleno proporcional al máximo
+        nonlocal y
+        ancho_etiqueta = 150
+        ancho_barra = ancho_util - ancho_etiqueta - 10
+        maximo = max([cantidad for _, cantidad in pares] + [1])
+        for nombre, cantidad in pares:
+            espacio(20)
+            pdf.texto(margen, y + 11, recortar_texto(nombre, ancho_etiqueta, 9), 9)
+            x = margen + ancho_etiqueta + 10
+            relleno = max(ancho_barra * cantidad / maximo, 0)
+            pdf.rectangulo(x, y, ancho_barra, 15, relleno=GRIS_FONDO)
+            pdf.rectangulo(x, y, relleno, 15, relleno=AZUL)
+            valor = str(cantidad)
+            if ancho_texto(valor, 8, negrita=True) + 10 <= relleno:
+                pdf.texto(x + relleno - 5, y + 10.5, valor, 8, negrita=True, color='#ffffff', alineacion='derecha')
+            else:
+                pdf.texto(x + relleno + 5, y + 10.5, valor, 8, negrita=True, color=AZUL)
+            y += 20
+
+    # Encabezado
+    pdf.nueva_pagina()
+    lineas_titulo = partir_lineas(titulo_informe, ancho_util - 70, 16, negrita=True)
+    alto_encabezado = max(80, 44 + 19 * len(lineas_titulo))
+    pdf.rectangulo(0, 0, pdf.ancho, alto_encabezado, relleno=AZUL)
+    ruta_logo = os.path.join(DIRECTORIO_RAIZ, 'fedemoto-logo.png')
+    if os.path.exists(ruta_logo):
+        pdf.imagen(ruta_logo, margen, (alto_encabezado - 55) / 2, 55, 55)
+    y = (alto_encabezado - 19 * len(lineas_titulo) - 14) / 2 + 14
+    for linea in lineas_titulo:
+        pdf.texto(margen + 70, y, linea, 16, negrita=True, color='#ffffff')
+        y += 19
+    pdf.texto(margen + 70, y + 2, 'Análisis completo de participantes y categorías', 10, color='#ffffff')
+    y = alto_encabezado + 25
+
+    # Tarjetas de estadísticas
+    separacion = 10
+    ancho_tarjeta = (ancho_util - separacion * (len(series['tarjetas']) - 1)) / len(series['tarjetas'])
+    for i, (numero, etiqueta) in enumerate(series['tarjetas']):
+        x = margen + i * (ancho_tarjeta + separacion)
+        pdf.rectangulo(x, y, ancho_tarjeta, 64, relleno='#ffffff', borde=GRIS_FONDO)
+        pdf.texto(x + ancho_tarjeta / 2, y + 30, str(numero), 24, negrita=True, color=AZUL, alineacion='centro')
+        pdf.texto(x + ancho_tarjeta / 2, y + 50, recortar_texto(etiqueta.upper(), ancho_tarjeta - 8, 8), 8,
+                  color='#666666', alineacion='centro')
+    y += 84
+
+    # Participación por edad (columnas verticales como .column-chart)
+    titulo_seccion('Participación por edad')
+    if series['edades']:
+        alto_grafica = 170
+        espacio(alto_grafica + 40)
+        maximo = max(max(cantidad for _, cantidad in series['edades']), 1)
+        paso = ancho_util / len(series['edades'])
+        ancho_columna = min(paso - 10, 80)
+        for i, (rango, cantidad) in enumerate(series['edades']):
+            x = margen + i * paso + (paso - ancho_columna) / 2
+            alto = max(alto_grafica * cantidad / maximo, 16)
+            pdf.rectangulo(x, y, ancho_columna, alto_grafica, relleno=GRIS_FONDO)
+            pdf.rectangulo(x, y + alto_grafica - alto, ancho_columna, alto, relleno=AZUL)
+            pdf.texto(x + ancho_columna / 2, y + alto_grafica - alto + 11, str(cantidad), 8, negrita=True,
+                      color='#ffffff', alineacion='centro')
+            # Sin " años" para que los rangos quepan bajo columnas angostas; se aclara en la leyenda
+            pdf.texto(x + ancho_columna / 2, y + alto_grafica + 13,
+                      recortar_texto(rango.replace(' años', ''), paso - 2, 8), 8, alineacion='centro')
+        pdf.texto(pdf.ancho / 2, y + alto_grafica + 28, 'Rangos de edad en años', 8, color='#666666',
+                  alineacion='centro')
+        y += alto_grafica + 40
     else:
-        # Por defecto, asumir que está en Informes/
-        carpeta_base = 'Informes'
-        ruta_dentro_base = output_html_path
-        output_file_full = os.path.join(script_dir, output_html_path) if output_html_path else script_dir
-        menu_objetivo = 'Informes'
-    
-    # La ruta dentro de la carpeta base (sin la carpeta base misma)
-    # Ejemplo: si output_html_path es "Motocross/Primer semestre/informe.html", 
-    # entonces ruta_dentro_base es "Motocross/Primer semestre/informe.html"
-    if not ruta_dentro_base:
-        ruta_dentro_base = output_html_path
-    
-    for html_file in html_files:
-        try:
-            # Leer el archivo HTML
-            with open(html_file, 'r', encoding='utf-8') as f:
-                contenido = f.read()
-            
-            # Calcular la ruta relativa desde este HTML al nuevo informe
-            html_dir = os.path.dirname(html_file)
-            try:
-                # Calcular ruta relativa desde el HTML hasta el archivo del informe
-                ruta_relativa = os.path.relpath(output_file_full, html_dir).replace('\\', '/')
-                
-                # Corregir si hay "Informes/Informes" duplicado
-                if 'Informes/Informes' in ruta_relativa:
-                    ruta_relativa = ruta_relativa.replace('Informes/Informes', 'Informes')
-                
-                # Corregir si hay duplicaciones de carpetas
-                if f'{carpeta_base}/{carpeta_base}' in ruta_relativa:
-                    ruta_relativa = ruta_relativa.replace(f'{carpeta_base}/{carpeta_base}', carpeta_base)
-                
-                # Si estamos en index.html o fuera de las carpetas base
-                if html_file == os.path.join(project_root, 'index.html'):
-                    ruta_relativa = f"{carpeta_base}/{ruta_dentro_base}".replace('\\', '/')
-                elif carpeta_base in os.path.relpath(html_file, project_root):
-                    # Si el HTML está dentro de la misma carpeta base, calcular relativa normalmente
-                    pass  # Ya calculada arriba
-                else:
-                    # Si está en otra carpeta, construir desde la raíz
-                    ruta_relativa = f"{carpeta_base}/{ruta_dentro_base}".replace('\\', '/')
-            except Exception as e:
-                # Si falla, construir desde la carpeta base
-                if html_file == os.path.join(project_root, 'index.html'):
-                    ruta_relativa = f"{carpeta_base}/{ruta_dentro_base}".replace('\\', '/')
-                else:
-                    ruta_relativa = f"{carpeta_base}/{ruta_dentro_base}".replace('\\', '/')
-            
-            # Detectar la estructura de carpetas para determinar dónde agregar el enlace
-            # ruta_dentro_base es relativa a la carpeta base, ejemplo: "Motocross/Primer semestre/informe.html"
-            ruta_dentro_base_norm = ruta_dentro_base.replace('\\', '/')
-            partes_ruta = [p for p in ruta_dentro_base_norm.split('/') if p]
-            # Si hay nombre de archivo, removerlo para quedarse solo con directorios
-            if partes_ruta and '.' in partes_ruta[-1]:
-                partes_ruta = partes_ruta[:-1]
-            
-            # Verificar si el enlace ya existe
-            if nombre_archivo_html in contenido:
-                continue  # Ya existe, no agregar de nuevo
-            
-            nuevo_contenido = contenido
-            
-            # Si el informe está en "Motocross/Primer semestre" o "Motocross/Segundo semestre"
-            if len(partes_ruta) >= 2 and partes_ruta[0].lower() == 'motocross':
-                semestre = partes_ruta[1]
-                # Buscar el patrón en el menú objetivo (Informes, Resultados de válidas, o Resultados generales)
-                # Primero encontrar el menú objetivo, luego dentro de él buscar Motocross > semestre
-                patron_menu_objetivo = rf'(<li class="dropdown">\s*<a href="#">{re.escape(menu_objetivo)}</a>\s*<ul class="dropdown-menu">.*?<li class="dropdown">\s*<a href="#">Motocross</a>\s*<ul class="dropdown-menu">.*?<li class="dropdown">\s*<a href="#">{re.escape(semestre)}</a>\s*<ul class="dropdown-menu">)(.*?)(</ul>\s*</li>\s*</li>\s*</li>)'
-                
-                def agregar_enlace_motocross(match):
-                    inicio = match.group(1)
-                    contenido_semestre = match.group(2)
-                    cierre = match.group(3)
-                    
-                    # Verificar si el enlace ya existe
-                    if nombre_archivo_html in contenido_semestre:
-                        return match.group(0)
-                    
-                    # Agregar el nuevo enlace
-                    nuevo_item = f'                                            <li><a href="{ruta_relativa}">{nombre_valida}</a></li>'
-                    return inicio + contenido_semestre + '\n' + nuevo_item + '\n                                        ' + cierre
-                
-                nuevo_contenido = re.sub(
-                    patron_menu_objetivo,
-                    agregar_enlace_motocross,
-                    nuevo_contenido,
-                    flags=re.IGNORECASE | re.DOTALL
-                )
-            
-            # Si el informe está en "Velotierra/Primer semestre" o "Velotierra/Segundo semestre"
-            elif len(partes_ruta) >= 2 and partes_ruta[0].lower() == 'velotierra':
-                semestre = partes_ruta[1]
-                # Buscar el patrón en el menú objetivo
-                patron_menu_objetivo = rf'(<li class="dropdown">\s*<a href="#">{re.escape(menu_objetivo)}</a>\s*<ul class="dropdown-menu">.*?<li class="dropdown">\s*<a href="#">Velotierra</a>\s*<ul class="dropdown-menu">.*?<li class="dropdown">\s*<a href="#">{re.escape(semestre)}</a>\s*<ul class="dropdown-menu">)(.*?)(</ul>\s*</li>\s*</li>\s*</li>)'
-                
-                def agregar_enlace_velotierra(match):
-                    inicio = match.group(1)
-                    contenido_semestre = match.group(2)
-                    cierre = match.group(3)
-                    
-                    # Verificar si el enlace ya existe
-                    if nombre_archivo_html in contenido_semestre:
-                        return match.group(0)
-                    
-                    # Agregar el nuevo enlace
-                    nuevo_item = f'                                            <li><a href="{ruta_relativa}">{nombre_valida}</a></li>'
-                    return inicio + contenido_semestre + '\n' + nuevo_item + '\n                                        ' + cierre
-                
-                nuevo_contenido = re.sub(
-                    patron_menu_objetivo,
-                    agregar_enlace_velotierra,
-                    nuevo_contenido,
-                    flags=re.IGNORECASE | re.DOTALL
-                )
-            
-            # Si el informe está en "Modalidad de ejemplo" (caso especial)
-            elif len(partes_ruta) >= 1 and partes_ruta[0].lower() == 'modalidad de ejemplo':
-                # Buscar el patrón completo del dropdown "Modalidad de ejemplo"
-                patron_completo = r'(<li class="dropdown">\s*<a href="#">Modalidad de ejemplo</a>\s*<ul class="dropdown-menu">)(.*?)(</ul>\s*</li>)'
-                
-                def agregar_enlace_modalidad(match):
-                    inicio = match.group(1)
-                    contenido_menu = match.group(2)
-                    cierre = match.group(3)
-                    
-                    # Verificar si el enlace ya existe
-                    if nombre_archivo_html in contenido_menu:
-                        return match.group(0)
-                    
-                    # Agregar el nuevo enlace
-                    nuevo_item = f'                                    <li><a href="{ruta_relativa}">{nombre_valida}</a></li>'
-                    return inicio + contenido_menu + '\n' + nuevo_item + '\n                                ' + cierre
-                
-                nuevo_contenido = re.sub(
-                    patron_completo,
-                    agregar_enlace_modalidad,
-                    nuevo_contenido,
-                    flags=re.IGNORECASE | re.DOTALL
-                )
-            
-            # Si se hizo algún cambio, escribir el archivo
-            if nuevo_contenido != contenido:
-                with open(html_file, 'w', encoding='utf-8') as f:
-                    f.write(nuevo_contenido)
-                print(f"  [OK] Enlace agregado en: {os.path.relpath(html_file, project_root)}")
-        
-        except Exception as e:
-            print(f"  [ADVERTENCIA] No se pudo actualizar {os.path.relpath(html_file, project_root)}: {e}")
+        espacio(30)
+        pdf.texto(pdf.ancho / 2, y + 15, 'No hay datos de edad disponibles', 10, color='#666666', alineacion='centro')
+        y += 30
+
+    titulo_seccion('Pilotos por categoría')
+    barras(series['categorias'])
+
+    titulo_seccion('Deportistas por ligas totales')
+    barras(series['ligas'])
+
+    titulo_seccion('Deportistas por ligas por categoría')
+    for categoria, ligas in series['categorias_liga']:
+        # El nombre de la categoría no queda solo al final de una página
+        espacio(24 + 20 * min(len(ligas), 2))
+        pdf.texto(margen, y + 12, recortar_texto(categoria, ancho_util, 12, negrita=True), 12, negrita=True, color=AZUL)
+        y += 22
+        barras(ligas)
+        y += 8
+
+    pdf.guardar(ruta_pdf)
+    print(f"PDF generado en: {ruta_pdf}")
+    return ruta_pdf
+
+def actualizar_menu(informes):
+    """
+    Registra los informes [(ruta_html, nombre_valida), ...] en el manifiesto
+    y vuelve a generar menu.html desde él, en una sola pasada.
+    """
+    registrar_informes([entrada_informe(output_path, nombre_valida) for output_path, nombre_valida in informes])
+    if generar_menu():
+        print(f"  [OK] Enlaces agregados en: {os.path.relpath(RUTA_MENU, DIRECTORIO_RAIZ)}")
 
-# Agregar el enlace al nuevo informe en todos los menús HTML
-print("\nActualizando menús en todos los archivos HTML...")
-agregar_enlace_a_menus(output_path, nombre_valida)
+def render_report(datos, output_path, nombre_valida, actualizar_menus=True, incrustar=False, pdf=False,
+                  perfil=SIN_PERFIL, **opciones):
+    """
+    Genera el informe HTML de una válida a partir de sus datos (el diccionario
+    de generar_json) y, si actualizar_menus es True, lo registra en el
+    manifiesto y agrega su enlace en menu.html. Los estilos y el script se
+    enlazan a los recursos compartidos, o van dentro del HTML si incrustar es
+    True. Con pdf=True también genera el PDF junto al HTML (ver
+    generar_pdf). Las demás opciones (formato_datos, prerenderizar) se pasan
+    a generar_html. Los tiempos de cada etapa se registran en perfil
+    (perfil_ejecucion). Retorna la ruta del informe.
+    """
+    with perfil.etapa('recursos'):
+        recursos = None if incrustar else escribir_recursos()
+    with perfil.etapa('html'):
+        html_content = generar_html(datos, output_path, nombre_valida, recursos, **opciones)
+
+    # Escribir el HTML con encoding UTF-8
+    with perfil.etapa('escritura_html'):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    print(f"HTML generado en: {output_path}")
+    if pdf:
+        with perfil.etapa('pdf'):
+            generar_pdf(datos, output_path, nombre_valida)
+
+    if actualizar_menus:
+        # Agregar el enlace al nuevo informe en el menú
+        print("\nActualizando el menú...")
+        with perfil.etapa('menu'):
+            actualizar_menu([(output_path, nombre_valida)])
+    return output_path
+
+def eliminar_json(json_path):
+    """
+    Elimina el archivo JSON después de generar el HTML.
+    """
+    try:
+        os.remove(json_path)
+        print(f"\nArchivo JSON eliminado: {json_path}")
+    except Exception as e:
+        print(f"Advertencia: No se pudo eliminar el archivo JSON {json_path}: {e}")
 
-# Eliminar el archivo JSON después de generar el HTML
-try:
-    os.remove(json_path)
-    print(f"\nArchivo JSON eliminado: {json_path}")
-except Exception as e:
-    print(f"Advertencia: No se pudo eliminar el archivo JSON {json_path}: {e}")
+def buscar_trabajos(carpeta):
+    """
+    Busca los datos_<nombre>.json bajo la carpeta y retorna los trabajos
+    (ruta_json, ruta_html, nombre_valida), con informe_<nombre>.html junto
+    al JSON como en generar_informe_completo.ps1.
+    """
+    trabajos = []
+    for json_path in sorted(glob.glob(os.path.join(carpeta, '**', 'datos_*.json'), recursive=True)):
+        carpeta_json, archivo = os.path.split(json_path)
+        nombre = os.path.splitext(archivo)[0][len('datos_'):]
+        trabajos.append((json_path, os.path.join(carpeta_json, f"informe_{nombre}.html"), nombre))
+    return trabajos
+
+def _render_trabajo(trabajo, incrustar=False, opciones=None, perfilar=False):
+    """
+    Genera un informe del lote sin tocar el menú: se actualiza una sola vez
+    al final, con todos los informes del lote. Con perfilar=True el resultado
+    incluye los tiempos de cada etapa ('etapas'), medidos en el proceso que
+    generó el informe.
+    """
+    json_path, output_path, nombre_valida = trabajo
+    perfil = Perfil(activo=perfilar)
+    inicio = time.perf_counter()
+    try:
+        with perfil.etapa('lectura_json'):
+            datos = leer_datos(json_path)
+        render_report(datos, output_path, nombre_valida, actualizar_menus=False, incrustar=incrustar,
+                      perfil=perfil, **(opciones or {}))
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return {'json': json_path, 'html': output_path, 'error': error, 'segundos': time.perf_counter() - inicio,
+            'etapas': perfil.registros}
+
+def render_batch(trabajos, procesos=1, actualizar_menus=True, eliminar_jsons=True, incrustar=False,
+                 perfil=SIN_PERFIL, **opciones):
+    """
+    Genera muchos informes en un solo proceso, o en un grupo de procesos si
+    procesos > 1 (0 o None: uno por núcleo). trabajos es una lista de
+    (ruta_json, ruta_html, nombre_valida). Al final se actualiza el menú y
+    se eliminan los JSON de los informes generados. Las demás opciones se
+    pasan a render_report (pdf) y a generar_html. Los tiempos de cada etapa
+    se registran en perfil, con el nombre del informe en lugar de la hoja.
+    Retorna el resultado de cada trabajo en el mismo orden.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    perfilar = [perfil.activo] * len(trabajos)
+    if procesos == 1 or len(trabajos) <= 1:
+        resultados = list(map(_render_trabajo, trabajos, [incrustar] * len(trabajos), [opciones] * len(trabajos),
+                              perfilar))
+    else:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(trabajos))) as grupo:
+            resultados = list(grupo.map(_render_trabajo, trabajos, [incrustar] * len(trabajos),
+                                        [opciones] * len(trabajos), perfilar))
+    for (_, _, nombre_valida), resultado in zip(trabajos, resultados):
+        perfil.agregar(resultado['etapas'], hoja=nombre_valida)
+
+    generados = [trabajo for trabajo, resultado in zip(trabajos, resultados) if not resultado['error']]
+    if actualizar_menus and generados:
+        print("\nActualizando el menú...")
+        with perfil.etapa('menu'):
+            actualizar_menu([(output_path, nombre_valida) for _, output_path, nombre_valida in generados])
+    if eliminar_jsons:
+        for json_path, _, _ in generados:
+            eliminar_json(json_path)
+    return resultados
+
+if __name__ == "__main__":
+    import argparse
+
+    # Configurar encoding UTF-8 para stdout en Windows
+    if sys.platform == 'win32':
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+    parser = argparse.ArgumentParser(description="Genera informes HTML a partir de datos JSON")
+    parser.add_argument('json_path', nargs='?', help="Ruta del JSON de datos")
+    parser.add_argument('output_path', nargs='?', help="Ruta del HTML de salida")
+    parser.add_argument('nombre_valida', nargs='?', help="Nombre de la válida")
+    parser.add_argument('--lote', default=None,
+                        help="Generar el informe de cada datos_<nombre>.json de esta carpeta (y subcarpetas)")
+    parser.add_argument('--procesos', type=int, default=1,
+                        help="Cantidad de procesos para el lote (0 = uno por núcleo; por defecto: 1)")
+    parser.add_argument('--conservar-json', action='store_true',
+                        help="No eliminar los JSON después de generar los informes")
+    parser.add_argument('--incrustar', action='store_true',
+                        help="Incluir los estilos y el script dentro de cada HTML (un solo archivo para compartir)")
+    parser.add_argument('--datos', choices=FORMATOS_DATOS, default='indentado',
+                        help="Cómo incrustar los datos: indentado, minificado o comprimido con gzip (por defecto: indentado)")
+    parser.add_argument('--prerenderizar', action='store_true',
+                        help="Incluir las gráficas iniciales en el HTML (se ven sin esperar al script)")
+    parser.add_argument('--pdf', action='store_true',
+                        help="Generar también un PDF vectorial del informe junto al HTML (sin navegador)")
+    parser.add_argument('--sin-menus', action='store_true',
+                        help="No registrar los informes en el manifiesto ni actualizar menu.html")
+    agregar_argumentos(parser, 'perfil_generar_informe.json')
+    args = parser.parse_args()
+    perfil = perfil_de_argumentos(args, 'generar_informe.py')
+
+    if args.lote:
+        trabajos = buscar_trabajos(args.lote)
+        if not trabajos:
+            print(f"No se encontraron archivos datos_*.json en {args.lote}")
+            sys.exit(1)
+        inicio = time.perf_counter()
+        resultados = render_batch(trabajos, procesos=args.procesos, actualizar_menus=not args.sin_menus,
+                                  eliminar_jsons=not args.conservar_json, incrustar=args.incrustar,
+                                  perfil=perfil, formato_datos=args.datos, prerenderizar=args.prerenderizar,
+                                  pdf=args.pdf)
+        errores = [resultado for resultado in resultados if resultado['error']]
+        print(f"\nInformes generados: {len(resultados) - len(errores)} de {len(resultados)} "
+              f"({time.perf_counter() - inicio:.2f} s)")
+        for resultado in errores:
+            print(f"  [ERROR] {resultado['json']}: {resultado['error']}")
+        if args.perfil:
+            perfil.guardar(args.perfil)
+        sys.exit(1 if errores else 0)
+
+    if not args.nombre_valida:
+        print("Uso: python generar_informe.py <ruta_json> <ruta_output_html> <nombre_valida>")
+        print('Ejemplo: python generar_informe.py "Valida de ejemplo/datos_valida_ejemplo.json" "Valida de ejemplo/informe_valida_ejemplo.html" "Valida de ejemplo"')
+        sys.exit(1)
+
+    json_path = args.json_path
+    output_path = args.output_path
+    # Decodificar nombre_valida correctamente para UTF-8
+    nombre_valida = decodificar_nombre(args.nombre_valida)
 
+    try:
+        with perfil.etapa('lectura_json'):
+            datos = leer_datos(json_path)
+    except Exception as e:
+        print(f"Error al leer el archivo JSON: {e}")
+        sys.exit(1)
+
+    try:
+        render_report(datos, output_path, nombre_valida, actualizar_menus=not args.sin_menus,
+                      incrustar=args.incrustar, pdf=args.pdf, perfil=perfil, formato_datos=args.datos,
+                      prerenderizar=args.prerenderizar)
+    except Exception as e:
+        print(f"Error al generar el informe: {e}")
+        sys.exit(1)
+
+    # Eliminar el archivo JSON después de generar el HTML
+    if not args.conservar_json:
+        eliminar_json(json_path)
+
+    if args.perfil:
+        perfil.guardar(args.perfil)
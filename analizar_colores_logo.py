@@ -1,38 +1,90 @@
-from PIL import Image
-import numpy as np
-from collections import Counter
-
-# Abrir la imagen
-img = Image.open('fedemoto-logo.png')
-
-# Convertir a RGB si tiene transparencia
-if img.mode != 'RGB':
-    img = img.convert('RGB')
+# -*- coding: utf-8 -*-
+"""
+Colores principales de imágenes de marca (logo, banners de patrocinadores),
+para revisar que usen la paleta de la federación.
 
-# Convertir a array numpy
-pixels = np.array(img)
+Cada píxel se empaqueta en un entero de 32 bits (0x00RRGGBB) y el
+histograma se calcula en NumPy sobre esos enteros, sin crear una tupla por
+píxel. Con --paso N los tonos casi iguales se agrupan: cada canal se divide
+en tramos de N valores y cada grupo se muestra con el color promedio de sus
+píxeles.
 
-# Aplanar el array para obtener todos los píxeles
-pixels_flat = pixels.reshape(-1, 3)
+Uso: python analizar_colores_logo.py [imagen_o_carpeta] [--paso N] [--top N] [--ignorar-transparentes]
+Ejemplo: python analizar_colores_logo.py Patrocinadores/ --paso 8 --ignorar-transparentes
+"""
 
-# Contar colores únicos
-colors = [tuple(p) for p in pixels_flat]
-color_counts = Counter(colors)
+import os
 
-print("=" * 60)
-print("COLORES PRINCIPALES DEL LOGO FEDEMOTO")
-print("=" * 60)
-print("\nTop 15 colores más frecuentes (RGB):\n")
-
-for i, (color, count) in enumerate(color_counts.most_common(15), 1):
-    r, g, b = color
-    hex_color = f"#{r:02x}{g:02x}{b:02x}"
-    print(f"{i:2d}. RGB({r:3d}, {g:3d}, {b:3d}) - {hex_color.upper()} - {count:6d} píxeles")
+import numpy as np
+from PIL import Image
 
-# Identificar colores principales basándose en los más frecuentes
-print("\n" + "=" * 60)
-print("COLORES PRINCIPALES IDENTIFICADOS")
-print("=" * 60)
+IMAGEN_POR_DEFECTO = 'fedemoto-logo.png'
+EXTENSIONES_IMAGEN = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.tif', '.tiff')
+
+# Colores más frecuentes que se listan al inicio del análisis
+TOP_COLORES = 15
+
+def cargar_pixeles(ruta, ignorar_transparentes=False):
+    """
+    Retorna los píxeles de la imagen como un arreglo (n, 3) de uint8.
+    Con ignorar_transparentes se descartan los píxeles con alfa 0 (el fondo
+    de los logos); si no, se convierten a RGB como cualquier otro.
+    """
+    with Image.open(ruta) as img:
+        if ignorar_transparentes:
+            rgba = np.asarray(img.convert('RGBA')).reshape(-1, 4)
+            return rgba[rgba[:, 3] > 0, :3]
+        # Convertir a RGB si tiene transparencia
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return np.asarray(img).reshape(-1, 3)
+
+def empaquetar(pixeles):
+    """
+    Empaqueta píxeles (n, 3) en enteros de 32 bits 0x00RRGGBB.
+    """
+    pixeles = pixeles.astype(np.uint32)
+    return (pixeles[:, 0] << 16) | (pixeles[:, 1] << 8) | pixeles[:, 2]
+
+def desempaquetar(codigos):
+    """
+    Inverso de empaquetar: enteros 0x00RRGGBB a un arreglo (n, 3) de uint8.
+    """
+    codigos = np.asarray(codigos, dtype=np.uint32)
+    return np.stack([(codigos >> 16) & 0xFF, (codigos >> 8) & 0xFF, codigos & 0xFF], axis=1).astype(np.uint8)
+
+def histograma_colores(pixeles, paso=1, limite=None):
+    """
+    Retorna [((r, g, b), píxeles), ...] de mayor a menor frecuencia; los
+    empates quedan en el orden en que aparece cada color en la imagen (igual
+    que Counter.most_common).
+
+    paso: tamaño de los tramos de cada canal para agrupar tonos casi iguales
+    (1 = colores exactos); cada grupo se representa con su color promedio.
+    limite: cantidad de colores a retornar (None = todos). Una fotografía
+    puede tener millones de colores distintos y solo se ordenan los que
+    pueden quedar entre los primeros.
+    """
+    if paso > 1:
+        codigos = empaquetar(pixeles // paso)
+    else:
+        codigos = empaquetar(pixeles)
+    distintos, primeros, inverso, conteos = np.unique(codigos, return_index=True, return_inverse=True,
+                                                      return_counts=True)
+    candidatos = np.arange(len(distintos))
+    if limite is not None and limite < len(distintos):
+        # Conteo del color en la posición limite: los de menor conteo no pueden entrar
+        umbral = np.partition(conteos, len(conteos) - limite)[len(conteos) - limite]
+        candidatos = np.flatnonzero(conteos >= umbral)
+    orden = candidatos[np.lexsort((primeros[candidatos], -conteos[candidatos]))][:limite]
+    if paso > 1:
+        # Color promedio de los píxeles de cada grupo
+        colores = np.stack([np.bincount(inverso, weights=pixeles[:, canal], minlength=len(distintos))[orden]
+                            for canal in range(3)], axis=1)
+        colores = np.rint(colores / conteos[orden, None]).astype(np.uint8)
+    else:
+        colores = desempaquetar(distintos[orden])
+    return [(tuple(int(c) for c in color), int(conteo)) for color, conteo in zip(colores, conteos[orden])]
 
 # Filtrar colores que no sean blanco, negro o grises
 def is_colorful(r, g, b):
@@ -47,41 +99,97 @@ def is_colorful(r, g, b):
         return False
     return True
 
-colorful_colors = [(color, count) for color, count in color_counts.most_common(30) 
-                   if is_colorful(*color)]
-
-print("\n🟡 AMARILLO (Yellow) - Colores amarillos/dorados:")
-yellow_colors = [(c, count) for c, count in colorful_colors if c[0] > c[1] and c[0] > c[2] and c[0] > 200]
-for color, count in yellow_colors[:5]:
-    r, g, b = color
-    hex_color = f"#{r:02x}{g:02x}{b:02x}"
-    print(f"   RGB({r:3d}, {g:3d}, {b:3d}) - {hex_color.upper()} - {count:6d} píxeles")
-
-print("\n🔵 AZUL (Blue) - Colores azules:")
-blue_colors = [(c, count) for c, count in colorful_colors if c[2] > c[0] and c[2] > c[1] and c[2] > 100]
-for color, count in blue_colors[:5]:
-    r, g, b = color
-    hex_color = f"#{r:02x}{g:02x}{b:02x}"
-    print(f"   RGB({r:3d}, {g:3d}, {b:3d}) - {hex_color.upper()} - {count:6d} píxeles")
-
-print("\n🔴 ROJO (Red) - Colores rojos:")
-red_colors = [(c, count) for c, count in colorful_colors if c[0] > 150 and c[1] < 100 and c[2] < 100]
-for color, count in red_colors[:5]:
-    r, g, b = color
-    hex_color = f"#{r:02x}{g:02x}{b:02x}"
-    print(f"   RGB({r:3d}, {g:3d}, {b:3d}) - {hex_color.upper()} - {count:6d} píxeles")
-
-print("\n⚫ NEGRO (Black):")
-black_colors = [(c, count) for c, count in color_counts.most_common(10) if c[0] < 10 and c[1] < 10 and c[2] < 10]
-for color, count in black_colors[:3]:
-    r, g, b = color
-    hex_color = f"#{r:02x}{g:02x}{b:02x}"
-    print(f"   RGB({r:3d}, {g:3d}, {b:3d}) - {hex_color.upper()} - {count:6d} píxeles")
-
-print("\n⚪ BLANCO (White):")
-white_colors = [(c, count) for c, count in color_counts.most_common(10) if c[0] > 240 and c[1] > 240 and c[2] > 240]
-for color, count in white_colors[:3]:
-    r, g, b = color
-    hex_color = f"#{r:02x}{g:02x}{b:02x}"
-    print(f"   RGB({r:3d}, {g:3d}, {b:3d}) - {hex_color.upper()} - {count:6d} píxeles")
-
+def imprimir_colores(colores):
+    """
+    Imprime una línea RGB / hexadecimal / píxeles por color.
+    """
+    for color, count in colores:
+        r, g, b = color
+        hex_color = f"#{r:02x}{g:02x}{b:02x}"
+        print(f"   RGB({r:3d}, {g:3d}, {b:3d}) - {hex_color.upper()} - {count:6d} píxeles")
+
+def imprimir_analisis(titulo, color_counts, top=TOP_COLORES):
+    """
+    Imprime los colores más frecuentes y los agrupados por familia
+    (amarillo, azul, rojo, negro, blanco) a partir de histograma_colores.
+    """
+    print("=" * 60)
+    print(titulo)
+    print("=" * 60)
+    print(f"\nTop {top} colores más frecuentes (RGB):\n")
+
+    for i, (color, count) in enumerate(color_counts[:top], 1):
+        r, g, b = color
+        hex_color = f"#{r:02x}{g:02x}{b:02x}"
+        print(f"{i:2d}. RGB({r:3d}, {g:3d}, {b:3d}) - {hex_color.upper()} - {count:6d} píxeles")
+
+    # Identificar colores principales basándose en los más frecuentes
+    print("\n" + "=" * 60)
+    print("COLORES PRINCIPALES IDENTIFICADOS")
+    print("=" * 60)
+
+    colorful_colors = [(color, count) for color, count in color_counts[:30] if is_colorful(*color)]
+
+    print("\n🟡 AMARILLO (Yellow) - Colores amarillos/dorados:")
+    imprimir_colores([(c, count) for c, count in colorful_colors if c[0] > c[1] and c[0] > c[2] and c[0] > 200][:5])
+
+    print("\n🔵 AZUL (Blue) - Colores azules:")
+    imprimir_colores([(c, count) for c, count in colorful_colors if c[2] > c[0] and c[2] > c[1] and c[2] > 100][:5])
+
+    print("\n🔴 ROJO (Red) - Colores rojos:")
+    imprimir_colores([(c, count) for c, count in colorful_colors if c[0] > 150 and c[1] < 100 and c[2] < 100][:5])
+
+    print("\n⚫ NEGRO (Black):")
+    imprimir_colores([(c, count) for c, count in color_counts[:10] if c[0] < 10 and c[1] < 10 and c[2] < 10][:3])
+
+    print("\n⚪ BLANCO (White):")
+    imprimir_colores([(c, count) for c, count in color_counts[:10] if c[0] > 240 and c[1] > 240 and c[2] > 240][:3])
+
+def buscar_imagenes(carpeta):
+    """
+    Imágenes de la carpeta y sus subcarpetas, en orden alfabético.
+    """
+    imagenes = []
+    for raiz, _, archivos in os.walk(carpeta):
+        imagenes += [os.path.join(raiz, archivo) for archivo in archivos
+                     if archivo.lower().endswith(EXTENSIONES_IMAGEN)]
+    return sorted(imagenes)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Muestra los colores principales de una imagen o de todas las de una carpeta")
+    parser.add_argument('ruta', nargs='?', default=IMAGEN_POR_DEFECTO,
+                        help=f"Imagen o carpeta de imágenes (por defecto: {IMAGEN_POR_DEFECTO})")
+    parser.add_argument('--paso', type=int, default=1,
+                        help="Agrupar tonos casi iguales en tramos de N valores por canal, ej. 8 (por defecto: 1, colores exactos)")
+    parser.add_argument('--top', type=int, default=TOP_COLORES,
+                        help=f"Cantidad de colores más frecuentes a listar (por defecto: {TOP_COLORES})")
+    parser.add_argument('--ignorar-transparentes', action='store_true',
+                        help="No contar los píxeles transparentes (fondo de los logos)")
+    args = parser.parse_args()
+    if not 1 <= args.paso <= 256:
+        parser.error("--paso debe estar entre 1 y 256")
+
+    if os.path.isdir(args.ruta):
+        imagenes = buscar_imagenes(args.ruta)
+        if not imagenes:
+            parser.error(f"No se encontraron imágenes en {args.ruta}")
+    else:
+        imagenes = [args.ruta]
+
+    for numero, ruta in enumerate(imagenes):
+        if numero:
+            print()
+        try:
+            pixeles = cargar_pixeles(ruta, args.ignorar_transparentes)
+        except OSError as e:
+            print(f"Error al abrir {ruta}: {e}")
+            continue
+        if os.path.basename(ruta) == IMAGEN_POR_DEFECTO:
+            titulo = "COLORES PRINCIPALES DEL LOGO FEDEMOTO"
+        else:
+            titulo = f"COLORES PRINCIPALES DE {os.path.relpath(ruta, args.ruta) if len(imagenes) > 1 else ruta}"
+        # El análisis por familias revisa los 30 más frecuentes
+        colores = histograma_colores(pixeles, args.paso, limite=max(args.top, 30))
+        imprimir_analisis(titulo, colores, args.top)
@@ -1,116 +1,145 @@
 import pandas as pd
-import unicodedata
-import re
 import json
-from collections import defaultdict
+from lector_excel import leer_hojas
+from normalizacion import normalizar_serie
+from licencias import CodificadorLicencias
+from participaciones import AgregadorIncremental, contar_agregados, modalidad_de_hoja, tabla_participaciones
+from estado_temporada import estado_valida
+from comparacion_semestres import comparaciones_semestres
+from base_participaciones import guardar_en_base
+from perfil_ejecucion import SIN_PERFIL, agregar_argumentos, perfil_de_argumentos
 
-def normalizar_liga(nombre):
+def identificar_pares_columnas(df):
     """
-    Normaliza el nombre de la liga: quita tildes, convierte a mayúsculas,
-    y limpia espacios extra.
+    Identifica los pares de columnas (número + departamento) de una hoja.
+    Retorna una lista de tuplas (categoria, col_num, col_dep).
     """
-    if pd.isna(nombre) or nombre == '':
-        return None
+    pares = []
+    i = 0
+    while i < len(df.columns):
+        col_num = df.columns[i]
+        col_dep = df.columns[i + 1] if i + 1 < len(df.columns) else None
+        
+        # Si la columna de número tiene un nombre válido (no "Unnamed")
+        if not str(col_num).startswith('Unnamed'):
+            if col_dep:
+                pares.append((str(col_num), col_num, col_dep))
+            i += 2
+        else:
+            i += 1
+    
+    return pares
+
+def convertir_numeros(serie):
+    """
+    Convierte los números de licencia a enteros igual que el recorrido por filas:
+    los valores numéricos se truncan a int y los demás (ej. "36-2") se conservan.
+    """
+    if serie.dtype.kind in 'biuf':
+        return serie.astype('int64').astype(object)
+    return serie.map(lambda v: int(v) if isinstance(v, (int, float)) else v)
+
+def construir_tabla_larga(df, pares):
+    """
+    Convierte los pares de columnas de una hoja en una sola tabla larga
+    con columnas (categoria, numero, liga), una fila por participación válida.
+    """
+    bloques = []
+    for categoria, col_num, col_dep in pares:
+        # Validar que ambos valores existan
+        bloque = df[[col_num, col_dep]].dropna()
+        if bloque.empty:
+            continue
+        
+        bloques.append(pd.DataFrame({
+            'categoria': categoria,
+            'numero': convertir_numeros(bloque[col_num]).to_numpy(),
+            'departamento': bloque[col_dep].to_numpy(dtype=object)
+        }))
     
-    # Convertir a string y limpiar
-    nombre = str(nombre).strip()
+    if not bloques:
+        return pd.DataFrame(columns=['categoria', 'numero', 'liga'])
     
-    # Quitar tildes
-    nombre = unicodedata.normalize('NFD', nombre)
-    nombre = ''.join(c for c in nombre if unicodedata.category(c) != 'Mn')
+    tabla = pd.concat(bloques, ignore_index=True)
     
-    # Convertir a mayúsculas para unificar
-    nombre = nombre.upper()
+    # Normalizar solo los valores distintos de liga y mapearlos de vuelta
+    tabla['liga'] = normalizar_serie(tabla['departamento'])
+    tabla = tabla[tabla['liga'].notna() & (tabla['liga'] != '')]
     
-    return nombre
+    return tabla[['categoria', 'numero', 'liga']].reset_index(drop=True)
 
-def extraer_datos_excel(excel_path):
+def extraer_datos_excel(excel_path, usar_cache=True, streaming=False, procesos=1, perfil=SIN_PERFIL):
     """
     Extrae todos los datos del Excel, procesando todas las hojas.
-    """
-    excel_file = pd.ExcelFile(excel_path)
+    Cada hoja se convierte en una tabla larga (categoría, número, liga) y
+    todas se unen en la tabla de participaciones, de la que se calculan los
+    agregados. Los números se codifican a enteros densos con un codificador
+    común a todas las hojas. Las hojas se leen a través de la caché de
+    libros (cache_excel) salvo que usar_cache sea False.
     
-    resultados = {
-        'modalidades': {},
-        'total_pilotos_unicos': set(),
-        'total_participaciones': 0,  # Total de participaciones (incluyendo repetidos)
-        'pilotos_por_categoria': defaultdict(set),
-        'deportistas_por_liga_total': defaultdict(set),
-        'deportistas_por_liga_categoria': defaultdict(lambda: defaultdict(set))
-    }
+    Con streaming=True las hojas se leen por bloques de filas (lector_excel)
+    y las participaciones se acumulan en un AgregadorIncremental: no se
+    tiene el libro completo en memoria, pero la tabla de participaciones sí
+    crece con el libro (solo se eliminan las filas repetidas).
     
-    print(f"Procesando {len(excel_file.sheet_names)} modalidades...")
+    Con procesos > 1 (0 = todos los núcleos) las hojas se leen en paralelo en
+    un grupo de procesos y se procesan en el orden del libro, por lo que el
+    resultado es idéntico al de la lectura secuencial. No se combina con
+    streaming=True (lector_excel.leer_hojas lo rechaza).
     
-    for sheet_name in excel_file.sheet_names:
+    perfil: Perfil (perfil_ejecucion) donde se registran los tiempos de
+    lectura, detección de columnas y participaciones de cada hoja.
+    """
+    with perfil.etapa('apertura_excel'):
+        nombres_hojas, hojas = leer_hojas(excel_path, usar_cache=usar_cache, streaming=streaming,
+                                          procesos=procesos)
+    codificador = CodificadorLicencias()
+    agregador = AgregadorIncremental() if streaming else None
+    bloques = []
+    
+    print(f"Procesando {len(nombres_hojas)} modalidades...")
+    
+    for sheet_name, bloques_hoja in hojas:
         print(f"\nProcesando modalidad: {sheet_name}")
-        df = pd.read_excel(excel_file, sheet_name=sheet_name)
-        
-        modalidad_data = {
-            'pilotos_unicos': set(),
-            'total_participaciones': 0,  # Participaciones en esta modalidad (incluyendo repetidos)
-            'pilotos_por_categoria': defaultdict(set),
-            'deportistas_por_liga': defaultdict(set),
-            'deportistas_por_liga_categoria': defaultdict(lambda: defaultdict(set))
-        }
         
-        # Identificar pares de columnas (número + departamento)
-        categorias = []
-        i = 0
-        while i < len(df.columns):
-            col_num = df.columns[i]
-            col_dep = df.columns[i + 1] if i + 1 < len(df.columns) else None
+        for numero_bloque, df in enumerate(perfil.iterar('lectura', bloques_hoja, sheet_name)):
+            with perfil.etapa('deteccion_columnas', sheet_name, len(df)):
+                pares = identificar_pares_columnas(df)
+            if numero_bloque == 0:
+                for categoria, _, _ in pares:
+                    print(f"  - Categoría: {categoria}")
             
-            # Si la columna de número tiene un nombre válido (no "Unnamed")
-            if not str(col_num).startswith('Unnamed'):
-                categoria = str(col_num)
-                categorias.append((categoria, i, i + 1 if col_dep else None))
-                i += 2
-            else:
-                i += 1
-        
-        # Procesar cada categoría
-        for categoria, idx_num, idx_dep in categorias:
-            if idx_dep is None:
-                continue
-                
-            col_num = df.columns[idx_num]
-            col_dep = df.columns[idx_dep]
-            
-            print(f"  - Categoría: {categoria}")
-            
-            # Extraer datos de esta categoría
-            for idx, row in df.iterrows():
-                numero = row[col_num]
-                departamento = row[col_dep]
-                
-                # Validar que ambos valores existan
-                if pd.notna(numero) and pd.notna(departamento):
-                    numero = int(numero) if isinstance(numero, (int, float)) else numero
-                    liga_normalizada = normalizar_liga(departamento)
-                    
-                    if liga_normalizada:
-                        # Agregar a totales
-                        resultados['total_pilotos_unicos'].add(numero)
-                        resultados['total_participaciones'] += 1  # Contar todas las participaciones
-                        resultados['pilotos_por_categoria'][categoria].add(numero)
-                        resultados['deportistas_por_liga_total'][liga_normalizada].add(numero)
-                        resultados['deportistas_por_liga_categoria'][categoria][liga_normalizada].add(numero)
-                        
-                        # Agregar a modalidad específica
-                        modalidad_data['pilotos_unicos'].add(numero)
-                        modalidad_data['total_participaciones'] += 1  # Contar participaciones en esta modalidad
-                        modalidad_data['pilotos_por_categoria'][categoria].add(numero)
-                        modalidad_data['deportistas_por_liga'][liga_normalizada].add(numero)
-                        modalidad_data['deportistas_por_liga_categoria'][categoria][liga_normalizada].add(numero)
-        
-        resultados['modalidades'][sheet_name] = modalidad_data
+            with perfil.etapa('participaciones', sheet_name, len(df)):
+                tabla = construir_tabla_larga(df, pares).rename(columns={'numero': 'licencia'})
+                tabla['codigo'] = codificador.codificar(tabla['licencia'])
+                tabla['modalidad'] = modalidad_de_hoja(sheet_name)
+                tabla['edad'] = None
+                tabla['hoja'] = sheet_name
+                if agregador:
+                    agregador.agregar(tabla)
+                else:
+                    bloques.append(tabla)
     
+    with perfil.etapa('combinacion') as registro:
+        participaciones = agregador.tabla() if agregador else tabla_participaciones(bloques)
+        registro['filas'] = len(participaciones)
+    resultados = {
+        'participaciones': participaciones,
+        'hojas': nombres_hojas,
+        'codificador': codificador
+    }
+    if agregador:
+        resultados['participaciones_por_hoja'] = agregador.participaciones_por_hoja
     return resultados
 
 def generar_informe(resultados, output_file='informe_resultados.txt'):
     """
     Genera un informe detallado con todos los resultados.
     """
+    datos = contar_agregados(resultados['participaciones'], resultados['hojas'],
+                             participaciones_por_hoja=resultados.get('participaciones_por_hoja'))
+    comparaciones = comparaciones_semestres(resultados['participaciones'], resultados['hojas'])
+    
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write("=" * 80 + "\n")
         f.write("INFORME GENERAL - FEDEMOTO 2025\n")
@@ -119,38 +148,33 @@ def generar_informe(resultados, output_file='informe_resultados.txt'):
         # 1. Total de pilotos únicos participantes
         f.write("1. CANTIDAD TOTAL DE PILOTOS ÚNICOS PARTICIPANTES\n")
         f.write("-" * 80 + "\n")
-        total_unicos = len(resultados['total_pilotos_unicos'])
-        f.write(f"Total: {total_unicos} pilotos únicos\n\n")
+        f.write(f"Total: {datos['total_pilotos_unicos']} pilotos únicos\n\n")
         
         # 1.1. Total de participaciones (incluyendo repetidos)
         f.write("1.1. CANTIDAD TOTAL DE PARTICIPACIONES (INCLUYENDO REPETIDOS)\n")
         f.write("-" * 80 + "\n")
-        total_participaciones = resultados['total_participaciones']
-        f.write(f"Total: {total_participaciones} participaciones\n\n")
+        f.write(f"Total: {datos['total_participaciones']} participaciones\n\n")
         
         # 2. Cantidad de pilotos por cada categoría
         f.write("2. CANTIDAD DE PILOTOS POR CADA CATEGORÍA\n")
         f.write("-" * 80 + "\n")
-        for categoria in sorted(resultados['pilotos_por_categoria'].keys()):
-            cantidad = len(resultados['pilotos_por_categoria'][categoria])
+        for categoria, cantidad in datos['pilotos_por_categoria'].items():
             f.write(f"{categoria}: {cantidad} pilotos únicos\n")
         f.write("\n")
         
         # 3. Cantidad de deportistas únicos por ligas totales
         f.write("3. CANTIDAD DE DEPORTISTAS ÚNICOS POR LIGAS TOTALES\n")
         f.write("-" * 80 + "\n")
-        for liga in sorted(resultados['deportistas_por_liga_total'].keys()):
-            cantidad = len(resultados['deportistas_por_liga_total'][liga])
+        for liga, cantidad in datos['deportistas_por_liga_total'].items():
             f.write(f"{liga}: {cantidad} deportistas únicos\n")
         f.write("\n")
         
         # 4. Cantidad de deportistas únicos por ligas por categoría
         f.write("4. CANTIDAD DE DEPORTISTAS ÚNICOS POR LIGAS POR CATEGORÍA\n")
         f.write("-" * 80 + "\n")
-        for categoria in sorted(resultados['deportistas_por_liga_categoria'].keys()):
+        for categoria, ligas in datos['deportistas_por_liga_categoria'].items():
             f.write(f"\n{categoria}:\n")
-            for liga in sorted(resultados['deportistas_por_liga_categoria'][categoria].keys()):
-                cantidad = len(resultados['deportistas_por_liga_categoria'][categoria][liga])
+            for liga, cantidad in ligas.items():
                 f.write(f"  {liga}: {cantidad} deportistas únicos\n")
         f.write("\n")
         
@@ -159,69 +183,54 @@ def generar_informe(resultados, output_file='informe_resultados.txt'):
         f.write("DETALLE POR MODALIDAD\n")
         f.write("=" * 80 + "\n\n")
         
-        for modalidad, data in resultados['modalidades'].items():
+        for modalidad, data in datos['modalidades'].items():
             f.write(f"\nMODALIDAD: {modalidad}\n")
             f.write("-" * 80 + "\n")
-            f.write(f"Pilotos únicos en esta modalidad: {len(data['pilotos_unicos'])}\n")
+            f.write(f"Pilotos únicos en esta modalidad: {data['pilotos_unicos']}\n")
             f.write(f"Total de participaciones en esta modalidad: {data['total_participaciones']}\n\n")
             
             f.write("Pilotos por categoría:\n")
-            for cat in sorted(data['pilotos_por_categoria'].keys()):
-                cantidad = len(data['pilotos_por_categoria'][cat])
+            for cat, cantidad in data['pilotos_por_categoria'].items():
                 f.write(f"  {cat}: {cantidad}\n")
             
             f.write("\nDeportistas por liga:\n")
-            for liga in sorted(data['deportistas_por_liga'].keys()):
-                cantidad = len(data['deportistas_por_liga'][liga])
+            for liga, cantidad in data['deportistas_por_liga'].items():
                 f.write(f"  {liga}: {cantidad}\n")
+        
+        # Retención entre semestres
+        if comparaciones:
+            f.write("\n" + "=" * 80 + "\n")
+            f.write("RETENCIÓN ENTRE SEMESTRES\n")
+            f.write("=" * 80 + "\n")
+        
+        for modalidad, comparacion in comparaciones.items():
+            total = comparacion['total']
+            f.write(f"\n{modalidad.upper()}: {comparacion['primero']} vs {comparacion['segundo']}\n")
+            f.write("-" * 80 + "\n")
+            f.write(f"Continúan (corrieron ambos semestres): {total['continuan']} ({total['retencion']}% de retención)\n")
+            f.write(f"Abandonaron (solo el primero): {total['abandonaron']}\n")
+            f.write(f"Nuevos (solo el segundo): {total['nuevos']}\n")
+            
+            f.write("\nPor liga (continúan / abandonaron / nuevos):\n")
+            for liga, conteo in comparacion['por_liga'].items():
+                f.write(f"  {liga}: {conteo['continuan']} / {conteo['abandonaron']} / {conteo['nuevos']}\n")
+            
+            f.write("\nPor categoría (continúan / abandonaron / nuevos):\n")
+            for categoria, conteo in comparacion['por_categoria'].items():
+                f.write(f"  {categoria}: {conteo['continuan']} / {conteo['abandonaron']} / {conteo['nuevos']}\n")
     
     print(f"\nInforme generado en: {output_file}")
 
 def generar_json(resultados, output_file='datos_informe.json'):
     """
     Genera un archivo JSON con los datos estructurados para la página web.
+    Todos los conteos se calculan a partir de la tabla de participaciones;
+    'comparaciones_semestres' tiene la retención entre los semestres de cada
+    modalidad (comparacion_semestres.py).
     """
-    datos_json = {
-        'total_pilotos_unicos': len(resultados['total_pilotos_unicos']),
-        'total_participaciones': resultados['total_participaciones'],
-        'pilotos_por_categoria': {
-            cat: len(pilotos) 
-            for cat, pilotos in sorted(resultados['pilotos_por_categoria'].items())
-        },
-        'deportistas_por_liga_total': {
-            liga: len(deportistas) 
-            for liga, deportistas in sorted(resultados['deportistas_por_liga_total'].items())
-        },
-        'deportistas_por_liga_categoria': {
-            cat: {
-                liga: len(deportistas)
-                for liga, deportistas in sorted(ligas.items())
-            }
-            for cat, ligas in sorted(resultados['deportistas_por_liga_categoria'].items())
-        },
-        'modalidades': {
-            modalidad: {
-                'pilotos_unicos': len(data['pilotos_unicos']),
-                'total_participaciones': data['total_participaciones'],
-                'pilotos_por_categoria': {
-                    cat: len(pilotos)
-                    for cat, pilotos in sorted(data['pilotos_por_categoria'].items())
-                },
-                'deportistas_por_liga': {
-                    liga: len(deportistas)
-                    for liga, deportistas in sorted(data['deportistas_por_liga'].items())
-                },
-                'deportistas_por_liga_categoria': {
-                    cat: {
-                        liga: len(deportistas)
-                        for liga, deportistas in sorted(ligas.items())
-                    }
-                    for cat, ligas in sorted(data['deportistas_por_liga_categoria'].items())
-                }
-            }
-            for modalidad, data in resultados['modalidades'].items()
-        }
-    }
+    datos_json = contar_agregados(resultados['participaciones'], resultados['hojas'],
+                                  participaciones_por_hoja=resultados.get('participaciones_por_hoja'))
+    datos_json['comparaciones_semestres'] = comparaciones_semestres(resultados['participaciones'], resultados['hojas'])
     
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(datos_json, f, ensure_ascii=False, indent=2)
@@ -229,15 +238,46 @@ def generar_json(resultados, output_file='datos_informe.json'):
     print(f"JSON generado en: {output_file}")
 
 # Ejecutar análisis
+# Uso: python analizar_excel_completo.py [ruta_excel] [--streaming] [--sin-cache] [--procesos N] [--perfil [ruta_json]]
 if __name__ == "__main__":
-    excel_path = "excel para informe general 2025.xlsx"
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Analiza el Excel general y genera datos_informe.json e informe_resultados.txt")
+    parser.add_argument('excel_path', nargs='?', default="excel para informe general 2025.xlsx",
+                        help="Ruta del Excel general (por defecto: excel para informe general 2025.xlsx)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Leer las hojas por bloques de filas, sin cargar el libro completo")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="Leer el Excel sin usar la caché de libros ya leídos")
+    parser.add_argument('--procesos', type=int, default=1,
+                        help="Procesos para leer las hojas en paralelo (0 = todos los núcleos)")
+    parser.add_argument('--base', default=None,
+                        help="Guardar también las participaciones en esta base SQLite (base_participaciones.py)")
+    parser.add_argument('--temporada', default=None,
+                        help="Temporada con la que se guardan las participaciones en la base, ej. 2025")
+    agregar_argumentos(parser, 'perfil_analizar_excel_completo.json')
+    args = parser.parse_args()
+    if args.base and not args.temporada:
+        parser.error("--base requiere --temporada")
+    if args.streaming and args.procesos != 1:
+        parser.error("--streaming no se puede combinar con --procesos")
+    perfil = perfil_de_argumentos(args, 'analizar_excel_completo.py')
     
     print("Iniciando análisis del Excel...")
-    resultados = extraer_datos_excel(excel_path)
+    resultados = extraer_datos_excel(args.excel_path, usar_cache=not args.sin_cache, streaming=args.streaming,
+                                     procesos=args.procesos, perfil=perfil)
     
     print("\nGenerando informe...")
-    generar_informe(resultados)
-    generar_json(resultados)
+    with perfil.etapa('informe_txt'):
+        generar_informe(resultados)
+    with perfil.etapa('json'):
+        generar_json(resultados)
+    
+    if args.base:
+        with perfil.etapa('base'):
+            guardar_en_base(args.base, estado_valida(resultados, args.excel_path), args.temporada)
+        print(f"Participaciones guardadas en la base: {args.base} (temporada {args.temporada})")
     
     print("\n¡Análisis completado!")
-
+    if args.perfil:
+        perfil.guardar(args.perfil)
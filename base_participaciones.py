@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Base de datos SQLite local con las participaciones de las válidas de todas
+las temporadas, con índices por licencia, liga, categoría, modalidad y
+temporada. Las consultas retornan la misma estructura que generar_json, así
+que cualquier pregunta nueva (ej. pilotos por liga en Enduro en los últimos
+tres años) se responde sin volver a leer los Excel.
+
+Uso: python base_participaciones.py <base.sqlite> [--temporada 2024 2025] [--modalidad Enduro] [--liga ...]
+     [--categoria ...] [--valida ...] [--por modalidad|hoja|valida|temporada] [--salida datos.json]
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from participaciones import dimensiones_conteo, ordenar
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS validas (
+    id INTEGER PRIMARY KEY,
+    temporada TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    archivo TEXT,
+    hash TEXT,
+    cargada TEXT,
+    UNIQUE (temporada, nombre)
+);
+CREATE TABLE IF NOT EXISTS hojas (
+    valida_id INTEGER NOT NULL REFERENCES validas (id) ON DELETE CASCADE,
+    orden INTEGER NOT NULL,
+    temporada TEXT NOT NULL,
+    modalidad TEXT,
+    hoja TEXT NOT NULL,
+    participaciones INTEGER NOT NULL
+);
+-- licencia y categoria sin tipo declarado: se conservan números y textos tal cual
+CREATE TABLE IF NOT EXISTS participaciones (
+    valida_id INTEGER NOT NULL REFERENCES validas (id) ON DELETE CASCADE,
+    temporada TEXT NOT NULL,
+    modalidad TEXT,
+    hoja TEXT NOT NULL,
+    licencia,
+    liga TEXT,
+    categoria,
+    edad TEXT,
+    veces INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_participaciones_licencia ON participaciones (licencia);
+CREATE INDEX IF NOT EXISTS idx_participaciones_liga ON participaciones (liga);
+CREATE INDEX IF NOT EXISTS idx_participaciones_categoria ON participaciones (categoria);
+CREATE INDEX IF NOT EXISTS idx_participaciones_modalidad ON participaciones (modalidad, temporada);
+CREATE INDEX IF NOT EXISTS idx_participaciones_temporada ON participaciones (temporada, modalidad);
+CREATE INDEX IF NOT EXISTS idx_participaciones_valida ON participaciones (valida_id);
+CREATE INDEX IF NOT EXISTS idx_hojas_valida ON hojas (valida_id);
+"""
+
+# Columnas por las que se puede filtrar y agrupar, con su expresión en las consultas
+COLUMNAS = {
+    'temporada': 'p.temporada',
+    'modalidad': 'p.modalidad',
+    'hoja': 'p.hoja',
+    'valida': 'v.nombre',
+    'liga': 'p.liga',
+    'categoria': 'p.categoria',
+    'edad': 'p.edad',
+    'licencia': 'p.licencia'
+}
+
+# Filtros que también aplican a los totales de participaciones por hoja
+COLUMNAS_HOJA = {
+    'temporada': 'h.temporada',
+    'modalidad': 'h.modalidad',
+    'hoja': 'h.hoja',
+    'valida': 'v.nombre'
+}
+
+# Agrupaciones posibles del detalle 'modalidades'
+AGRUPACIONES = ('modalidad', 'hoja', 'valida', 'temporada')
+
+def abrir_base(ruta):
+    """
+    Abre (o crea) la base de participaciones.
+    """
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("PRAGMA foreign_keys = ON")
+    conexion.executescript(ESQUEMA)
+    return conexion
+
+def insertar_valida(conexion, estado, temporada):
+    """
+    Guarda en la base el estado de una válida (estado_temporada.estado_valida).
+    Si la válida ya estaba cargada en esa temporada, se reemplaza.
+    """
+    temporada = str(temporada)
+    with conexion:
+        conexion.execute("DELETE FROM validas WHERE temporada = ? AND nombre = ?", (temporada, estado['valida']))
+        cursor = conexion.execute(
+            "INSERT INTO validas (temporada, nombre, archivo, hash, cargada) VALUES (?, ?, ?, ?, ?)",
+            (temporada, estado['valida'], estado.get('archivo'), estado.get('hash'), datetime.now().isoformat(timespec='seconds'))
+        )
+        valida_id = cursor.lastrowid
+        conexion.executemany(
+            "INSERT INTO hojas (valida_id, orden, temporada, modalidad, hoja, participaciones) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (valida_id, orden, temporada, hoja['modalidad'], hoja['nombre'], hoja['participaciones'])
+                for orden, hoja in enumerate(estado['hojas'])
+            ]
+        )
+        modalidad_por_hoja = {hoja['nombre']: hoja['modalidad'] for hoja in estado['hojas']}
+        filas = estado['participaciones']
+        veces = filas.get('veces') or [1] * len(filas['licencia'])
+        conexion.executemany(
+            "INSERT INTO participaciones (valida_id, temporada, modalidad, hoja, licencia, liga, categoria, edad, veces) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (valida_id, temporada, modalidad_por_hoja.get(hoja, modalidad), hoja, licencia, liga, categoria, edad, n)
+                for licencia, liga, categoria, modalidad, edad, hoja, n in zip(
+                    filas['licencia'], filas['liga'], filas['categoria'], filas['modalidad'],
+                    filas['edad'], filas['hoja'], veces
+                )
+            ]
+        )
+    return valida_id
+
+def guardar_en_base(ruta, estado, temporada):
+    """
+    Abre la base, guarda el estado de la válida y la cierra.
+    """
+    conexion = abrir_base(ruta)
+    try:
+        insertar_valida(conexion, estado, temporada)
+    finally:
+        conexion.close()
+
+def _condiciones(filtros, columnas):
+    """
+    Arma el WHERE de una consulta. Cada filtro puede ser un valor o una lista
+    de valores; los filtros que no están en 'columnas' se ignoran.
+    """
+    condiciones = []
+    parametros = []
+    for nombre, valor in filtros.items():
+        if valor is None or nombre not in columnas:
+            continue
+        valores = list(valor) if isinstance(valor, (list, tuple, set)) else [valor]
+        if nombre == 'temporada':
+            valores = [str(v) for v in valores]
+        condiciones.append(f"{columnas[nombre]} IN ({', '.join('?' * len(valores))})")
+        parametros.extend(valores)
+    return condiciones, parametros
+
+def _contar(conexion, columnas, filtros, grupo=None):
+    """
+    Cuenta las licencias distintas agrupadas por las columnas dadas (y por
+    'grupo' primero, si se indica) y retorna un diccionario anidado con las
+    claves ordenadas, como contar_distintos.
+    """
+    expresiones = ([COLUMNAS[grupo]] if grupo else []) + [COLUMNAS[columna] for columna in columnas]
+    condiciones, parametros = _condiciones(filtros, COLUMNAS)
+    condiciones += [f"{expresion} IS NOT NULL" for expresion in expresiones]
+    sql = (
+        f"SELECT {', '.join(expresiones + ['COUNT(DISTINCT p.licencia)'])} "
+        "FROM participaciones p JOIN validas v ON v.id = p.valida_id"
+        + (f" WHERE {' AND '.join(condiciones)}" if condiciones else "")
+        + (f" GROUP BY {', '.join(expresiones)}" if expresiones else "")
+    )
+    filas = conexion.execute(sql, parametros).fetchall()
+    if not expresiones:
+        return filas[0][0]
+
+    anidado = {}
+    for *claves, n in filas:
+        nivel = anidado
+        for clave in claves[:-1]:
+            nivel = nivel.setdefault(clave, {})
+        nivel[claves[-1]] = n
+    return ordenar(anidado)
+
+def _grupos(conexion, por, filtros):
+    """
+    Retorna los grupos del detalle 'modalidades' en orden de carga (o de
+    temporada) y el total de participaciones de las hojas de cada uno.
+    """
+    expresion = 'h.temporada' if por == 'temporada' else COLUMNAS_HOJA[por]
+    condiciones, parametros = _condiciones(filtros, COLUMNAS_HOJA)
+    orden = "h.temporada, MIN(h.valida_id)" if por == 'temporada' else "MIN(h.valida_id * 100000 + h.orden)"
+    sql = (
+        f"SELECT {expresion}, SUM(h.participaciones) FROM hojas h JOIN validas v ON v.id = h.valida_id"
+        + (f" WHERE {' AND '.join(condiciones)}" if condiciones else "")
+        + f" GROUP BY {expresion} ORDER BY {orden}"
+    )
+    return conexion.execute(sql, parametros).fetchall()
+
+def consultar(conexion, por='modalidad', con_edad=True, **filtros):
+    """
+    Calcula los agregados de las participaciones que cumplen los filtros
+    (temporada, modalidad, hoja, valida, liga, categoria, edad o licencia;
+    cada uno un valor o una lista) y los retorna con la misma estructura que
+    generar_json. El detalle 'modalidades' se agrupa según 'por'.
+
+    Las participaciones se toman de los totales de cada hoja; si se filtra por
+    liga, categoría, edad o licencia se suman las filas que cumplen el filtro.
+    """
+    if por not in AGRUPACIONES:
+        raise ValueError(f"Agrupación no soportada: {por}")
+    desconocidos = set(filtros) - set(COLUMNAS)
+    if desconocidos:
+        raise ValueError(f"Filtros no soportados: {sorted(desconocidos)}")
+
+    grupos = _grupos(conexion, por, filtros)
+    por_filas = any(filtros.get(nombre) is not None for nombre in set(COLUMNAS) - set(COLUMNAS_HOJA))
+    if por_filas:
+        condiciones, parametros = _condiciones(filtros, COLUMNAS)
+        sql = (
+            f"SELECT {COLUMNAS[por]}, SUM(p.veces) FROM participaciones p JOIN validas v ON v.id = p.valida_id"
+            f" WHERE {' AND '.join(condiciones)} GROUP BY {COLUMNAS[por]}"
+        )
+        participaciones = dict(conexion.execute(sql, parametros).fetchall())
+    else:
+        participaciones = dict(grupos)
+
+    dimensiones = dimensiones_conteo(con_edad)
+    totales = {clave: _contar(conexion, columnas, filtros) for clave, columnas in dimensiones.items()}
+    por_grupo = {clave: _contar(conexion, columnas, filtros, grupo=por) for clave, columnas in dimensiones.items()}
+    unicos_por_grupo = _contar(conexion, [], filtros, grupo=por)
+
+    datos = {
+        'total_pilotos_unicos': _contar(conexion, [], filtros),
+        'total_participaciones': int(sum(participaciones.get(grupo, 0) for grupo, _ in grupos)),
+        'pilotos_por_categoria': totales['pilotos_por_categoria'],
+        'deportistas_por_liga_total': totales['deportistas_por_liga'],
+        'deportistas_por_liga_categoria': totales['deportistas_por_liga_categoria']
+    }
+    if con_edad:
+        datos['participaciones_por_edad'] = totales['participaciones_por_edad']
+    datos['modalidades'] = {
+        grupo: {
+            'pilotos_unicos': unicos_por_grupo.get(grupo, 0),
+            'total_participaciones': int(participaciones.get(grupo, 0)),
+            **{clave: conteos.get(grupo, {}) for clave, conteos in por_grupo.items()}
+        }
+        for grupo, _ in grupos
+    }
+    return datos
+
+def validas_cargadas(conexion):
+    """
+    Lista las válidas de la base como (temporada, nombre, archivo, cargada).
+    """
+    return conexion.execute("SELECT temporada, nombre, archivo, cargada FROM validas ORDER BY temporada, id").fetchall()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Consulta la base de participaciones")
+    parser.add_argument('base', help="Ruta de la base SQLite")
+    for nombre in ('temporada', 'modalidad', 'hoja', 'valida', 'liga', 'categoria', 'edad'):
+        parser.add_argument(f'--{nombre}', nargs='+', default=None, help=f"Filtrar por {nombre} (uno o varios valores)")
+    parser.add_argument('--por', choices=AGRUPACIONES, default='modalidad',
+                        help="Agrupación del detalle por modalidad (por defecto: modalidad)")
+    parser.add_argument('--salida', default=None, help="Guardar el resultado en un JSON")
+    parser.add_argument('--listar', action='store_true', help="Listar las válidas cargadas")
+    args = parser.parse_args()
+
+    conexion = abrir_base(args.base)
+    if args.listar:
+        for temporada, nombre, archivo, cargada in validas_cargadas(conexion):
+            print(f"  {temporada} | {nombre} ({archivo}) - cargada {cargada}")
+        raise SystemExit(0)
+
+    filtros = {nombre: getattr(args, nombre) for nombre in ('temporada', 'modalidad', 'hoja', 'valida', 'liga', 'categoria', 'edad')}
+    datos = consultar(conexion, por=args.por, **filtros)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+        print(f"JSON generado en: {args.salida}")
+
+    print(f"- Total pilotos únicos: {datos['total_pilotos_unicos']}")
+    print(f"- Total participaciones: {datos['total_participaciones']}")
+    print(f"\nDeportistas por liga:")
+    for liga, n in datos['deportistas_por_liga_total'].items():
+        print(f"  - {liga}: {n}")
+    print(f"\nPor {args.por}:")
+    for grupo, detalle in datos['modalidades'].items():
+        print(f"  - {grupo}: {detalle['pilotos_unicos']} pilotos únicos, {detalle['total_participaciones']} participaciones")
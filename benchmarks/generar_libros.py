@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de libros de Excel sintéticos para medir el rendimiento de los
+extractores con tamaños configurables, en los dos formatos que entiende el
+código:
+
+- general (analizar_excel_completo.py): cada hoja es una modalidad con un
+  par de columnas por categoría, número de licencia y departamento (la
+  segunda sin encabezado), de distinto largo cada una.
+- valida (Informes/analizar_valida.py): una fila por piloto con sus datos
+  (Licencia, Nombre, Liga, FN, ...), la columna "Formatos" y luego una
+  columna por categoría marcada con "x".
+
+Los valores imitan los libros reales: ligas escritas de varias formas
+(tildes, mayúsculas, espacios), licencias numéricas, decimales o de texto,
+celdas vacías y fechas de nacimiento faltantes. Con la misma semilla se
+genera siempre el mismo contenido, así que las mediciones se pueden
+comparar entre versiones del código.
+
+Uso: python benchmarks/generar_libros.py <general|valida> <ruta_xlsx> [--pilotos N] [--hojas N] [--categorias N] [--semilla N]
+Ejemplo: python benchmarks/generar_libros.py valida benchmarks/libros/valida_10000.xlsx --pilotos 10000
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+
+from openpyxl import Workbook
+
+# Ligas con las variantes de escritura que aparecen en los libros reales
+LIGAS = {
+    'Antioquia': ['ANTIOQUIA', 'Antioquia', 'antioquia '],
+    'Bogotá': ['BOGOTÁ', 'BOGOTA', 'Bogotá', ' bogota'],
+    'Caldas': ['CALDAS', 'Caldas'],
+    'Cauca': ['CAUCA', 'Cauca'],
+    'Cundinamarca': ['CUNDINAMARCA', 'Cundinamarca'],
+    'Huila': ['HUILA', 'Huila'],
+    'Meta': ['META', 'Meta'],
+    'Nariño': ['NARIÑO', 'NARINO', 'Nariño'],
+    'Putumayo': ['PUTUMAYO', 'Putumayo'],
+    'Quindío': ['QUINDIO', 'QUINDÍO', 'Quindío'],
+    'Risaralda': ['RISARALDA', 'Risaralda'],
+    'Santander': ['SANTANDER', 'Santander'],
+    'Tolima': ['TOLIMA', 'Tolima'],
+    'Valle del Cauca': ['VALLE', 'Valle', 'VALLE DEL CAUCA']
+}
+NOMBRES_LIGAS = sorted(LIGAS)
+
+CATEGORIAS = ['MX1', 'MX2', '85cc', '65cc', '50cc', 'Femenina', 'Master', 'Master 40', 'Junior', 'Inicio',
+              '125', '150 cc', '200 Novatos', '200 Expertos', 'libre pro', 'libre novatos', 'Pit bike',
+              'infantil', 'infantil mini', 'juvenil', 'Supermoto expertos', 'Supermoto novatos']
+
+MODALIDADES = ['Motocross 1er semestre', 'Motocross 2do semestre', 'Velotierra 1er semestre',
+               'Velotierra 2do semestre', 'Velocidad', 'Enduro', 'Moto GP', 'Supermoto']
+
+COLUMNAS_PILOTO = ['Consecutivo', 'Licencia', 'Nombre', 'Apellido', 'Liga', 'Club', 'FN', 'RH', 'Formatos']
+
+def _nombres(base, cantidad):
+    """
+    Toma cantidad nombres de la lista base, con sufijos numéricos si no alcanzan.
+    """
+    return [base[i % len(base)] + ('' if i < len(base) else f" {i // len(base) + 1}") for i in range(cantidad)]
+
+def _licencia(aleatorio, maximo):
+    """
+    Licencia como en los libros: casi siempre un entero, a veces un decimal
+    (celda con formato numérico) o un texto con guion.
+    """
+    numero = aleatorio.randint(1, maximo)
+    sorteo = aleatorio.random()
+    if sorteo < 0.03:
+        return f"{numero}-{aleatorio.randint(1, 9)}"
+    if sorteo < 0.25:
+        return float(numero)
+    return numero
+
+def _liga(aleatorio, liga_por_licencia, licencia):
+    """
+    Liga del piloto (la misma en todas sus participaciones, guardada en
+    liga_por_licencia) con una escritura al azar; de vez en cuando vacía.
+    """
+    if str(licencia) not in liga_por_licencia:
+        liga_por_licencia[str(licencia)] = aleatorio.choice(NOMBRES_LIGAS)
+    if aleatorio.random() < 0.01:
+        return aleatorio.choice([None, '', ' '])
+    return aleatorio.choice(LIGAS[liga_por_licencia[str(licencia)]])
+
+def generar_libro_general(ruta, pilotos=1000, hojas=4, categorias=10, semilla=2025):
+    """
+    Escribe un libro con el formato del Excel general: hojas modalidades,
+    categorias pares de columnas (número, departamento) y hasta pilotos
+    participaciones por categoría. Retorna la cantidad de participaciones.
+    """
+    aleatorio = random.Random(semilla)
+    ligas = {}
+    libro = Workbook(write_only=True)
+    total = 0
+    for modalidad in _nombres(MODALIDADES, hojas):
+        hoja = libro.create_sheet(modalidad)
+        nombres_categorias = _nombres(CATEGORIAS, categorias)
+        encabezado = []
+        for categoria in nombres_categorias:
+            encabezado += [categoria, None]
+        hoja.append(encabezado)
+
+        # Cada categoría tiene su propia cantidad de participantes
+        largos = [max(1, int(pilotos * aleatorio.uniform(0.2, 1.0))) for _ in nombres_categorias]
+        columnas = []
+        for largo in largos:
+            columna = []
+            for _ in range(largo):
+                licencia = _licencia(aleatorio, max(pilotos, 10))
+                columna.append((licencia, _liga(aleatorio, ligas, licencia)))
+            columnas.append(columna)
+            total += largo
+
+        for fila in range(max(largos)):
+            valores = []
+            for columna in columnas:
+                valores += list(columna[fila]) if fila < len(columna) else [None, None]
+            hoja.append(valores)
+    libro.save(ruta)
+    return total
+
+def generar_libro_valida(ruta, pilotos=1000, hojas=1, categorias=8, semilla=2025):
+    """
+    Escribe un libro con el formato de una válida: pilotos filas por hoja con
+    los datos del piloto, "Formatos" y categorias columnas de marcas "x"
+    (cada piloto corre una o dos categorías). Retorna la cantidad de marcas.
+    """
+    aleatorio = random.Random(semilla)
+    ligas = {}
+    libro = Workbook(write_only=True)
+    fecha_base = datetime(1960, 1, 1)
+    total = 0
+    for nombre_hoja in _nombres(['Válida'], hojas):
+        hoja = libro.create_sheet(nombre_hoja)
+        nombres_categorias = _nombres(CATEGORIAS, categorias)
+        hoja.append(COLUMNAS_PILOTO + nombres_categorias)
+        for consecutivo in range(1, pilotos + 1):
+            licencia = _licencia(aleatorio, max(pilotos * 2, 10))
+            fecha = fecha_base + timedelta(days=aleatorio.randint(0, 60 * 365)) if aleatorio.random() > 0.05 else None
+            marcas = [None] * categorias
+            for indice in aleatorio.sample(range(categorias), min(categorias, aleatorio.choice([1, 1, 1, 2]))):
+                marcas[indice] = aleatorio.choice(['x', 'x', 'X', 'X ', ' x'])
+                total += 1
+            hoja.append([consecutivo, licencia, f"Piloto {consecutivo}", f"Apellido {consecutivo % 97}",
+                         _liga(aleatorio, ligas, licencia), f"Club {consecutivo % 23}", fecha,
+                         aleatorio.choice(['O+', 'A+', 'B+', 'O-']), aleatorio.choice(['ok', None])] + marcas)
+    libro.save(ruta)
+    return total
+
+GENERADORES = {
+    'general': generar_libro_general,
+    'valida': generar_libro_valida
+}
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera libros de Excel sintéticos para medir el rendimiento")
+    parser.add_argument('formato', choices=sorted(GENERADORES), help="Formato del libro: general o valida")
+    parser.add_argument('ruta', help="Ruta del .xlsx a generar")
+    parser.add_argument('--pilotos', type=int, default=1000,
+                        help="Filas por hoja (valida) o participaciones máximas por categoría (general)")
+    parser.add_argument('--hojas', type=int, default=None,
+                        help="Cantidad de hojas (por defecto: 4 en general, 1 en valida)")
+    parser.add_argument('--categorias', type=int, default=None,
+                        help="Cantidad de categorías por hoja (por defecto: 10 en general, 8 en valida)")
+    parser.add_argument('--semilla', type=int, default=2025, help="Semilla del generador (por defecto: 2025)")
+    args = parser.parse_args()
+
+    opciones = {clave: valor for clave, valor in (('hojas', args.hojas), ('categorias', args.categorias))
+                if valor is not None}
+    carpeta = os.path.dirname(args.ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    participaciones = GENERADORES[args.formato](args.ruta, pilotos=args.pilotos, semilla=args.semilla, **opciones)
+    print(f"Libro generado en: {args.ruta} ({participaciones} participaciones)")
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Mediciones de rendimiento de los dos extractores con libros sintéticos
+(generar_libros.py) de varios tamaños: extracción de participaciones
+(en las válidas también con el motor ligero), agregación, escritura del JSON y del informe de texto (Excel general) o
+del HTML (válida). Cada etapa se repite varias veces y se guarda el mejor
+tiempo y la mediana junto con el commit, las versiones y la máquina, para
+comparar los resultados entre versiones del código con --comparar.
+
+Los libros se generan una sola vez en benchmarks/libros/ (misma semilla,
+mismo contenido) y se leen sin la caché de libros, así que la extracción
+incluye siempre la lectura del Excel.
+
+Uso: python benchmarks/medir_rendimiento.py [--tamanos 1000,5000,20000] [--repeticiones 3] [--salida ruta_json] [--comparar resultados_anteriores.json]
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DIRECTORIO_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_RAIZ = os.path.dirname(DIRECTORIO_BENCHMARKS)
+sys.path.insert(0, DIRECTORIO_RAIZ)
+sys.path.insert(0, os.path.join(DIRECTORIO_RAIZ, 'Informes'))
+
+import pandas as pd
+
+import analizar_excel_completo
+import analizar_valida
+import generar_informe
+from generar_libros import GENERADORES
+from participaciones import contar_agregados, contar_agregados_filas
+from perfil_ejecucion import Perfil
+
+DIRECTORIO_LIBROS = os.path.join(DIRECTORIO_BENCHMARKS, 'libros')
+DIRECTORIO_RESULTADOS = os.path.join(DIRECTORIO_BENCHMARKS, 'resultados')
+TAMANOS = [1000, 5000, 20000]
+REPETICIONES = 3
+SEMILLA = 2025
+
+# Fecha fija para las edades, para que el trabajo no cambie con el día
+FECHA_REFERENCIA = datetime(2025, 12, 31)
+
+def ruta_libro(formato, tamano, semilla=SEMILLA):
+    """
+    Genera el libro sintético si no existe y retorna su ruta.
+    """
+    ruta = os.path.join(DIRECTORIO_LIBROS, f"{formato}_{tamano}_s{semilla}.xlsx")
+    if not os.path.exists(ruta):
+        os.makedirs(DIRECTORIO_LIBROS, exist_ok=True)
+        print(f"  Generando {os.path.relpath(ruta, DIRECTORIO_RAIZ)}...")
+        GENERADORES[formato](ruta, pilotos=tamano, semilla=semilla)
+    return ruta
+
+def medir(funcion, repeticiones):
+    """
+    Ejecuta funcion() repeticiones veces sin mostrar su salida. Retorna
+    (tiempos, resultado de la última ejecución).
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            resultado = funcion()
+            tiempos.append(time.perf_counter() - inicio)
+    return tiempos, resultado
+
+def etapas_de_extraccion(extraer):
+    """
+    Ejecuta una extracción con un Perfil y retorna el tiempo de cada una de
+    sus etapas internas (lectura, detección de columnas, participaciones, ...).
+    """
+    perfil = Perfil()
+    with contextlib.redirect_stdout(io.StringIO()):
+        extraer(perfil)
+    return {etapa: datos['segundos'] for etapa, datos in perfil.reporte()['por_etapa'].items()}
+
+def medir_general(tamano, repeticiones, directorio_salida):
+    """
+    Mide el Excel general: extracción, agregación, JSON e informe de texto.
+    """
+    ruta = ruta_libro('general', tamano)
+
+    def extraer(perfil=None):
+        opciones = {'perfil': perfil} if perfil else {}
+        return analizar_excel_completo.extraer_datos_excel(ruta, usar_cache=False, **opciones)
+
+    tiempos, resultados = medir(extraer, repeticiones)
+    participaciones = len(resultados['participaciones'])
+    mediciones = [('extraccion', tiempos)]
+    mediciones.append(('agregacion', medir(
+        lambda: contar_agregados(resultados['participaciones'], resultados['hojas']), repeticiones)[0]))
+    mediciones.append(('json', medir(lambda: analizar_excel_completo.generar_json(
+        resultados, os.path.join(directorio_salida, 'datos_general.json')), repeticiones)[0]))
+    mediciones.append(('informe_txt', medir(lambda: analizar_excel_completo.generar_informe(
+        resultados, os.path.join(directorio_salida, 'informe_general.txt')), repeticiones)[0]))
+    return participaciones, mediciones, etapas_de_extraccion(extraer)
+
+def medir_valida(tamano, repeticiones, directorio_salida):
+    """
+    Mide el Excel de una válida: extracción (modo matriz) y agregación con
+    los motores completo y ligero, JSON y HTML.
+    """
+    ruta = ruta_libro('valida', tamano)
+
+    def extraer(perfil=None):
+        opciones = {'perfil': perfil} if perfil else {}
+        return analizar_valida.extraer_datos_excel(ruta, fecha_referencia=FECHA_REFERENCIA, usar_cache=False,
+                                                   **opciones)
+
+    tiempos, resultados = medir(extraer, repeticiones)
+    participaciones = len(resultados['participaciones'])
+    mediciones = [('extraccion', tiempos)]
+    mediciones.append(('agregacion', medir(
+        lambda: contar_agregados(resultados['participaciones'], resultados['hojas'], con_edad=True),
+        repeticiones)[0]))
+    tiempos_ligero, ligero = medir(lambda: analizar_valida.extraer_datos_ligero(
+        ruta, fecha_referencia=FECHA_REFERENCIA), repeticiones)
+    mediciones.append(('extraccion_ligera', tiempos_ligero))
+    mediciones.append(('agregacion_ligera', medir(
+        lambda: contar_agregados_filas(ligero['filas'], ligero['hojas'], con_edad=True), repeticiones)[0]))
+    tiempos_json, datos_json = medir(lambda: analizar_valida.generar_json(
+        resultados, os.path.join(directorio_salida, 'datos_valida.json')), repeticiones)
+    mediciones.append(('json', tiempos_json))
+    ruta_html = os.path.join(directorio_salida, 'Informes', 'Benchmark', 'informe_valida.html')
+    os.makedirs(os.path.dirname(ruta_html), exist_ok=True)
+    mediciones.append(('html', medir(lambda: generar_informe.render_report(
+        datos_json, ruta_html, 'Benchmark', actualizar_menus=False, incrustar=True), repeticiones)[0]))
+    return participaciones, mediciones, etapas_de_extraccion(extraer)
+
+MEDICIONES = {
+    'general': medir_general,
+    'valida': medir_valida
+}
+
+def commit_actual():
+    """
+    Commit del repositorio (con '+' si hay cambios sin confirmar), o None sin git.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRECTORIO_RAIZ,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        cambios = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=DIRECTORIO_RAIZ,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+' if cambios else '')
+
+def ejecutar(tamanos=TAMANOS, repeticiones=REPETICIONES, formatos=tuple(MEDICIONES)):
+    """
+    Ejecuta las mediciones y retorna el reporte: una fila por formato,
+    tamaño y etapa con el mejor tiempo, la mediana y las participaciones
+    por segundo (con el mejor tiempo).
+    """
+    reporte = {
+        'commit': commit_actual(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+        'repeticiones': repeticiones,
+        'semilla': SEMILLA,
+        'resultados': []
+    }
+    with tempfile.TemporaryDirectory() as directorio_salida:
+        for formato in formatos:
+            for tamano in tamanos:
+                print(f"{formato} {tamano}:")
+                participaciones, mediciones, etapas = MEDICIONES[formato](tamano, repeticiones, directorio_salida)
+                for etapa, tiempos in mediciones:
+                    fila = {
+                        'formato': formato,
+                        'tamano': tamano,
+                        'etapa': etapa,
+                        'participaciones': participaciones,
+                        'mejor': round(min(tiempos), 5),
+                        'mediana': round(statistics.median(tiempos), 5),
+                        'participaciones_por_segundo': round(participaciones / min(tiempos)) if min(tiempos) else None
+                    }
+                    if etapa == 'extraccion':
+                        fila['etapas'] = {nombre: round(segundos, 5) for nombre, segundos in etapas.items()}
+                    reporte['resultados'].append(fila)
+                    print(f"  {etapa:<17} {fila['mejor']:>9.4f} s (mediana {fila['mediana']:.4f} s, "
+                          f"{participaciones} participaciones)")
+    return reporte
+
+def comparar(reporte, anterior):
+    """
+    Imprime la razón entre los mejores tiempos de dos reportes para las
+    mediciones que tienen en común (< 1 es más rápido que el anterior).
+    """
+    anteriores = {(fila['formato'], fila['tamano'], fila['etapa']): fila for fila in anterior['resultados']}
+    print(f"\nComparación con {anterior.get('commit')} ({anterior.get('fecha')}):")
+    for fila in reporte['resultados']:
+        previa = anteriores.get((fila['formato'], fila['tamano'], fila['etapa']))
+        if not previa or not previa['mejor']:
+            continue
+        razon = fila['mejor'] / previa['mejor']
+        print(f"  {fila['formato']:<8} {fila['tamano']:>7} {fila['etapa']:<17} "
+              f"{previa['mejor']:>9.4f} s -> {fila['mejor']:>9.4f} s  x{razon:.2f}")
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de los extractores con libros sintéticos")
+    parser.add_argument('--tamanos', type=lambda v: [int(x) for x in v.split(',')], default=TAMANOS,
+                        help=f"Tamaños de los libros separados por coma (por defecto: {','.join(map(str, TAMANOS))})")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES,
+                        help=f"Repeticiones de cada etapa (por defecto: {REPETICIONES})")
+    parser.add_argument('--formatos', nargs='+', choices=sorted(MEDICIONES), default=sorted(MEDICIONES),
+                        help="Formatos a medir (por defecto: general y valida)")
+    parser.add_argument('--salida', default=None,
+                        help="Ruta del JSON de resultados (por defecto: benchmarks/resultados/<commit>.json)")
+    parser.add_argument('--comparar', default=None,
+                        help="JSON de resultados anteriores con el que comparar")
+    args = parser.parse_args()
+
+    reporte = ejecutar(args.tamanos, args.repeticiones, args.formatos)
+
+    salida = args.salida or os.path.join(DIRECTORIO_RESULTADOS, f"{reporte['commit'] or 'sin_git'}.json")
+    carpeta = os.path.dirname(salida)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en: {salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            comparar(reporte, json.load(f))
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Caché en disco de los libros de Excel ya leídos.
+Cada hoja se guarda como un DataFrame serializado (pickle, que conserva los
+bloques de columnas de numpy) en una carpeta identificada por el hash del
+contenido del archivo, así que volver a analizar el mismo Excel no vuelve a
+interpretar el XML con openpyxl.
+
+Uso: python cache_excel.py [--limpiar]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from carga_perezosa import ModuloPerezoso
+
+# pandas solo se necesita al leer hojas; escribir_atomico y DIRECTORIO_CACHE
+# también los usan módulos que no lo importan (disposicion_valida)
+pd = ModuloPerezoso('pandas')
+
+# Carpeta de la caché (en la raíz del proyecto, ignorada por git)
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_excel')
+
+# Tamaño máximo de la caché; al superarlo se eliminan los libros usados hace más tiempo
+TAMANO_MAXIMO = 500 * 1024 * 1024
+
+# Cambiar si cambia la forma de guardar las hojas, para invalidar lo anterior
+VERSION_CACHE = 1
+
+def hash_archivo(ruta, tamano_bloque=1024 * 1024):
+    """
+    Calcula el SHA-256 del contenido del archivo.
+    """
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+def escribir_atomico(ruta, escribir):
+    """
+    Escribe un archivo en un temporal y lo renombra, para que otro proceso
+    nunca lea un archivo a medio escribir.
+    """
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+    os.close(descriptor)
+    try:
+        escribir(temporal)
+        os.replace(temporal, ruta)
+    except Exception:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+class ExcelCacheado:
+    """
+    Reemplazo de pd.ExcelFile con la misma interfaz básica (sheet_names y
+    parse). Las hojas se leen de la caché si existen; si no, se leen del
+    Excel y se guardan para la próxima vez.
+    """
+
+    def __init__(self, excel_path, usar_cache=True, directorio=DIRECTORIO_CACHE, tamano_maximo=TAMANO_MAXIMO):
+        self.excel_path = excel_path
+        self.usar_cache = usar_cache
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+        self._excel = None
+        self.sheet_names = None
+
+        if usar_cache:
+            self.clave = hash_archivo(excel_path)
+            self.carpeta = os.path.join(directorio, self.clave)
+            self.sheet_names = self._leer_manifiesto()
+
+        if self.sheet_names is None:
+            self.sheet_names = list(self._abrir_excel().sheet_names)
+            if usar_cache:
+                self._escribir_manifiesto()
+
+    def _abrir_excel(self):
+        if self._excel is None:
+            self._excel = pd.ExcelFile(self.excel_path)
+        return self._excel
+
+    def _ruta_manifiesto(self):
+        return os.path.join(self.carpeta, 'manifiesto.json')
+
+    def _ruta_hoja(self, sheet_name):
+        return os.path.join(self.carpeta, f"hoja_{self.sheet_names.index(sheet_name)}.pkl")
+
+    def _leer_manifiesto(self):
+        """
+        Retorna los nombres de las hojas guardados, o None si no hay una
+        entrada válida para este contenido y esta versión de pandas.
+        """
+        try:
+            with open(self._ruta_manifiesto(), 'r', encoding='utf-8') as f:
+                manifiesto = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifiesto.get('version') != VERSION_CACHE or manifiesto.get('pandas') != pd.__version__:
+            shutil.rmtree(self.carpeta, ignore_errors=True)
+            return None
+        # Marcar el uso para la política de eliminación (menos usado recientemente)
+        os.utime(self._ruta_manifiesto())
+        return manifiesto['hojas']
+
+    def _escribir_manifiesto(self):
+        os.makedirs(self.carpeta, exist_ok=True)
+        manifiesto = {
+            'version': VERSION_CACHE,
+            'pandas': pd.__version__,
+            'archivo': os.path.basename(self.excel_path),
+            'hojas': self.sheet_names
+        }
+
+        def escribir(ruta):
+            with open(ruta, 'w', encoding='utf-8') as f:
+                json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+
+        escribir_atomico(self._ruta_manifiesto(), escribir)
+
+    def parse(self, sheet_name):
+        """
+        Retorna la hoja como DataFrame, igual que pd.read_excel con las
+        opciones por defecto.
+        """
+        if not self.usar_cache:
+            return pd.read_excel(self._abrir_excel(), sheet_name=sheet_name)
+
+        ruta = self._ruta_hoja(sheet_name)
+        if os.path.exists(ruta):
+            try:
+                return pd.read_pickle(ruta)
+            except Exception:
+                pass  # Entrada dañada: se vuelve a leer del Excel
+
+        df = pd.read_excel(self._abrir_excel(), sheet_name=sheet_name)
+        os.makedirs(self.carpeta, exist_ok=True)
+        escribir_atomico(ruta, df.to_pickle)
+        if not os.path.exists(self._ruta_manifiesto()):
+            self._escribir_manifiesto()
+        recortar_cache(self.directorio, self.tamano_maximo, conservar=self.clave)
+        return df
+
+def abrir_excel(excel_path, usar_cache=True):
+    """
+    Abre un Excel a través de la caché. Retorna un objeto con sheet_names y
+    parse(sheet_name), como pd.ExcelFile.
+    """
+    return ExcelCacheado(excel_path, usar_cache=usar_cache)
+
+def _entradas(directorio):
+    """
+    Lista las entradas de la caché como (último uso, tamaño en bytes, ruta).
+    """
+    entradas = []
+    if not os.path.isdir(directorio):
+        return entradas
+    for nombre in os.listdir(directorio):
+        carpeta = os.path.join(directorio, nombre)
+        if not os.path.isdir(carpeta):
+            continue
+        tamano = sum(
+            os.path.getsize(os.path.join(carpeta, archivo))
+            for archivo in os.listdir(carpeta)
+        )
+        manifiesto = os.path.join(carpeta, 'manifiesto.json')
+        ultimo_uso = os.path.getmtime(manifiesto if os.path.exists(manifiesto) else carpeta)
+        entradas.append((ultimo_uso, tamano, carpeta))
+    return entradas
+
+def recortar_cache(directorio=DIRECTORIO_CACHE, tamano_maximo=TAMANO_MAXIMO, conservar=None):
+    """
+    Elimina los libros usados hace más tiempo hasta que la caché quede por
+    debajo del tamaño máximo. La entrada 'conservar' nunca se elimina.
+    """
+    entradas = sorted(_entradas(directorio))
+    total = sum(tamano for _, tamano, _ in entradas)
+    for _, tamano, carpeta in entradas:
+        if total <= tamano_maximo:
+            break
+        if os.path.basename(carpeta) == conservar:
+            continue
+        shutil.rmtree(carpeta, ignore_errors=True)
+        total -= tamano
+
+def limpiar_cache(directorio=DIRECTORIO_CACHE):
+    """
+    Elimina toda la caché.
+    """
+    shutil.rmtree(directorio, ignore_errors=True)
+
+if __name__ == "__main__":
+    import sys
+
+    if '--limpiar' in sys.argv:
+        limpiar_cache()
+        print(f"Caché eliminada: {DIRECTORIO_CACHE}")
+    else:
+        entradas = _entradas(DIRECTORIO_CACHE)
+        total = sum(tamano for _, tamano, _ in entradas)
+        print(f"Caché: {DIRECTORIO_CACHE}")
+        print(f"- Libros guardados: {len(entradas)}")
+        print(f"- Tamaño total: {total / (1024 * 1024):.1f} MB (máximo {TAMANO_MAXIMO / (1024 * 1024):.0f} MB)")
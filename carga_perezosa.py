@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Importación diferida de módulos pesados (pandas, numpy, openpyxl y los
+módulos del proyecto que los usan): el módulo se importa la primera vez que
+se usa uno de sus atributos, así que un script que no lo necesita (ej. el
+motor ligero de Informes/analizar_valida.py) no paga el tiempo de importarlo.
+
+Uso:
+    pd = ModuloPerezoso('pandas')
+    ...
+    tabla = pd.DataFrame(...)   # pandas se importa aquí
+"""
+
+import importlib
+
+class ModuloPerezoso:
+    """
+    Representa un módulo que todavía no se ha importado.
+
+    No se usa importlib.util.LazyLoader porque en Python 3.11 cualquier
+    "import pandas" posterior (ej. dentro de otro módulo) lee __spec__ del
+    módulo diferido y lo termina importando de inmediato.
+    """
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, atributo)
+
+    def __repr__(self):
+        estado = 'importado' if self._modulo is not None else 'sin importar'
+        return f"<módulo perezoso {self._nombre!r} ({estado})>"
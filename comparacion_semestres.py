@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Comparación de licencias entre dos modalidades o semestres: quiénes
+continúan (corrieron en ambos), quiénes abandonaron (solo en el primero) y
+quiénes son nuevos (solo en el segundo), en total, por liga y por categoría.
+Se calcula con intersecciones y diferencias de ConjuntoLicencias (arreglos
+ordenados de códigos) sobre la tabla de participaciones.
+
+Uso: python comparacion_semestres.py [<hoja_1> <hoja_2>] [--excel ruta_excel]
+Sin hojas, compara los semestres de cada modalidad que los tenga (ej. Motocross).
+"""
+
+from licencias import ConjuntoLicencias, agrupar_conjuntos
+from participaciones import modalidad_de_hoja
+
+def comparar_conjuntos(primero, segundo):
+    """
+    Compara dos conjuntos de licencias. La retención es el porcentaje de
+    licencias del primero que también están en el segundo.
+    """
+    continuan = len(primero & segundo)
+    return {
+        'primero': len(primero),
+        'segundo': len(segundo),
+        'continuan': continuan,
+        'abandonaron': len(primero) - continuan,
+        'nuevos': len(segundo) - continuan,
+        'retencion': round(100 * continuan / len(primero), 1) if len(primero) else 0.0
+    }
+
+class ComparadorParticipaciones:
+    """
+    Agrupa una sola vez los conjuntos de licencias de cada hoja (en total,
+    por liga y por categoría) para hacer cualquier cantidad de comparaciones.
+    """
+
+    def __init__(self, tabla, columna='hoja'):
+        self.columna = columna
+        self.totales = agrupar_conjuntos(tabla, columna)
+        self.por_liga = agrupar_conjuntos(tabla, [columna, 'liga'])
+        self.por_categoria = agrupar_conjuntos(tabla, [columna, 'categoria'])
+
+    @staticmethod
+    def _desglose(conjuntos, primero, segundo):
+        claves = sorted({clave for grupo, clave in conjuntos if grupo in (primero, segundo)})
+        vacio = ConjuntoLicencias()
+        return {
+            clave: comparar_conjuntos(conjuntos.get((primero, clave), vacio), conjuntos.get((segundo, clave), vacio))
+            for clave in claves
+        }
+
+    def comparar(self, primero, segundo):
+        """
+        Compara dos hojas (o modalidades) y retorna el total y el desglose por
+        liga y por categoría. Una licencia 'continúa' en una liga o categoría
+        si aparece en ella en ambas hojas.
+        """
+        return {
+            'primero': primero,
+            'segundo': segundo,
+            'total': comparar_conjuntos(self.totales.get(primero, ConjuntoLicencias()),
+                                       self.totales.get(segundo, ConjuntoLicencias())),
+            'por_liga': self._desglose(self.por_liga, primero, segundo),
+            'por_categoria': self._desglose(self.por_categoria, primero, segundo)
+        }
+
+def pares_semestres(hojas):
+    """
+    Retorna los pares de hojas consecutivas de una misma modalidad dividida
+    en semestres, ej. ("Motocross 1er semestre", "Motocross 2do semestre").
+    """
+    por_modalidad = {}
+    for hoja in hojas:
+        if modalidad_de_hoja(hoja) != str(hoja).strip():
+            por_modalidad.setdefault(modalidad_de_hoja(hoja), []).append(hoja)
+    return [
+        (modalidad, semestres[i], semestres[i + 1])
+        for modalidad, semestres in por_modalidad.items()
+        for i in range(len(semestres) - 1)
+    ]
+
+def comparaciones_semestres(tabla, hojas):
+    """
+    Compara los semestres de cada modalidad que los tenga. Retorna un
+    diccionario modalidad -> comparación (ver ComparadorParticipaciones.comparar).
+    """
+    pares = pares_semestres(hojas)
+    if not pares:
+        return {}
+    comparador = ComparadorParticipaciones(tabla)
+    comparaciones = {}
+    for modalidad, primero, segundo in pares:
+        clave = modalidad if modalidad not in comparaciones else f"{modalidad}: {primero} vs {segundo}"
+        comparaciones[clave] = comparador.comparar(primero, segundo)
+    return comparaciones
+
+if __name__ == "__main__":
+    import argparse
+    import contextlib
+    import io
+    from analizar_excel_completo import extraer_datos_excel
+
+    parser = argparse.ArgumentParser(description="Compara las licencias de dos hojas (semestres o modalidades) del Excel general")
+    parser.add_argument('hojas', nargs='*', help="Las dos hojas a comparar (por defecto: los semestres de cada modalidad)")
+    parser.add_argument('--excel', default="excel para informe general 2025.xlsx",
+                        help="Ruta del Excel general (por defecto: excel para informe general 2025.xlsx)")
+    args = parser.parse_args()
+    if len(args.hojas) not in (0, 2):
+        parser.error("Indique exactamente dos hojas o ninguna")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultados = extraer_datos_excel(args.excel)
+    tabla = resultados['participaciones']
+    if args.hojas:
+        comparaciones = {' vs '.join(args.hojas): ComparadorParticipaciones(tabla).comparar(*args.hojas)}
+    else:
+        comparaciones = comparaciones_semestres(tabla, resultados['hojas'])
+
+    for nombre, comparacion in comparaciones.items():
+        total = comparacion['total']
+        print(f"\n{nombre} ({comparacion['primero']} -> {comparacion['segundo']})")
+        print(f"  Pilotos: {total['primero']} -> {total['segundo']}")
+        print(f"  Continúan: {total['continuan']} (retención {total['retencion']}%)")
+        print(f"  Abandonaron: {total['abandonaron']}")
+        print(f"  Nuevos: {total['nuevos']}")
+        print(f"  Por liga:")
+        for liga, datos in comparacion['por_liga'].items():
+            print(f"    - {liga}: {datos['continuan']} continúan, {datos['abandonaron']} abandonaron, "
+                  f"{datos['nuevos']} nuevos ({datos['retencion']}%)")
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Conteo aproximado de licencias distintas con HyperLogLog.
+Pensado para resúmenes de varias temporadas y modalidades, donde guardar los
+conjuntos exactos de licencias de cada celda (liga, categoría, modalidad,
+año...) ocupa mucho y solo se necesitan las cantidades.
+
+Cada celda usa como máximo 2**precision bytes y los resúmenes se pueden unir
+(válidas, semestres, años) sin perder precisión. Error relativo típico
+(desviación estándar): 1.04 / sqrt(2**precision), es decir ~1.6% con la
+precisión por defecto (12) y ~0.8% con 14; en el 95% de los casos el error
+queda por debajo del doble. Las celdas con pocas licencias (hasta
+2**precision / 8) guardan los hashes de forma exacta y su conteo no tiene error.
+
+Uso: python conteo_aproximado.py <ruta_output_json> <resumen1.json> [<resumen2.json> ...]
+"""
+
+import base64
+import hashlib
+import json
+import numbers
+import numpy as np
+from participaciones import dimensiones_conteo, ordenar
+
+# Precisión por defecto: 4096 registros de 1 byte por celda
+PRECISION = 12
+
+# Cambiar si cambia el formato de los resúmenes guardados
+VERSION_RESUMEN = 1
+
+def hash_licencia(valor):
+    """
+    Hash de 64 bits estable entre ejecuciones (hash() de Python cambia en cada
+    proceso para los textos). Los números enteros dan el mismo hash sin
+    importar su tipo, igual que las claves del CodificadorLicencias.
+    """
+    if isinstance(valor, numbers.Integral) or (isinstance(valor, float) and valor.is_integer()):
+        texto = f"i:{int(valor)}"
+    else:
+        texto = f"{type(valor).__name__}:{valor}"
+    return int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def hash_licencias(serie):
+    """
+    Hashes de una Series de licencias; solo se calculan para los valores distintos.
+    """
+    posiciones, distintos = serie.factorize()
+    tabla = np.array([hash_licencia(valor) for valor in distintos], dtype=np.uint64)
+    return tabla[posiciones]
+
+def _longitud_bits(valores):
+    """
+    Cantidad de bits significativos de cada entero de 64 bits (0 para el 0).
+    Se calcula por mitades de 32 bits, que float64 representa sin redondeo.
+    """
+    alta = (valores >> np.uint64(32)).astype(np.float64)
+    baja = (valores & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(alta > 0, 32 + np.frexp(alta)[1], np.frexp(baja)[1])
+
+class HyperLogLog:
+    """
+    Contador aproximado de elementos distintos a partir de sus hashes de 64
+    bits. Mientras tiene pocos elementos los guarda de forma exacta (arreglo
+    ordenado de hashes); al superar el límite pasa a los 2**precision
+    registros de HyperLogLog. Se une con otro contador con el operador |.
+    """
+    __slots__ = ('precision', 'hashes', 'registros')
+
+    def __init__(self, precision=PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Precisión fuera de rango (4 a 18): {precision}")
+        self.precision = precision
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.registros = None
+
+    @property
+    def limite_exacto(self):
+        # Con este límite los hashes exactos ocupan lo mismo que los registros
+        return (1 << self.precision) // 8
+
+    @property
+    def error_relativo(self):
+        """
+        Error relativo típico (desviación estándar) de la estimación.
+        """
+        return 1.04 / np.sqrt(1 << self.precision)
+
+    def agregar_hashes(self, hashes):
+        """
+        Agrega un arreglo de hashes (np.uint64).
+        """
+        if self.registros is None:
+            self.hashes = np.union1d(self.hashes, hashes)
+            if len(self.hashes) > self.limite_exacto:
+                self._a_registros(self.hashes)
+                self.hashes = np.empty(0, dtype=np.uint64)
+        else:
+            self._a_registros(hashes)
+        return self
+
+    def _a_registros(self, hashes):
+        p = self.precision
+        if self.registros is None:
+            self.registros = np.zeros(1 << p, dtype=np.uint8)
+        if not len(hashes):
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        indices = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        # Posición del primer 1 en los 64 - p bits restantes
+        resto = (hashes << np.uint64(p)) | np.uint64(1 << (p - 1))
+        rangos = (65 - _longitud_bits(resto)).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rangos)
+
+    def __or__(self, otro):
+        if self.precision != otro.precision:
+            raise ValueError("No se pueden unir contadores con distinta precisión")
+        union = HyperLogLog(self.precision)
+        if self.registros is None and otro.registros is None:
+            return union.agregar_hashes(np.union1d(self.hashes, otro.hashes))
+        union._a_registros(self.hashes)
+        union._a_registros(otro.hashes)
+        for registros in (self.registros, otro.registros):
+            if registros is not None:
+                np.maximum(union.registros, registros, out=union.registros)
+        return union
+
+    def cardinalidad(self):
+        """
+        Cantidad estimada de elementos distintos (exacta en modo disperso).
+        """
+        if self.registros is None:
+            return len(self.hashes)
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimacion = alfa * m * m / np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        vacios = int(np.count_nonzero(self.registros == 0))
+        if estimacion <= 2.5 * m and vacios:
+            # Corrección para rangos pequeños (conteo lineal)
+            estimacion = m * np.log(m / vacios)
+        return int(round(estimacion))
+
+    def a_dict(self):
+        if self.registros is None:
+            return {'hashes': base64.b64encode(self.hashes.astype('<u8').tobytes()).decode('ascii')}
+        return {'registros': base64.b64encode(self.registros.tobytes()).decode('ascii')}
+
+    @classmethod
+    def de_dict(cls, datos, precision):
+        contador = cls(precision)
+        if 'hashes' in datos:
+            contador.hashes = np.frombuffer(base64.b64decode(datos['hashes']), dtype='<u8').astype(np.uint64)
+        else:
+            contador.registros = np.frombuffer(base64.b64decode(datos['registros']), dtype=np.uint8).copy()
+        return contador
+
+class ResumenAproximado:
+    """
+    Resumen con un contador HyperLogLog por celda de cada dimensión del JSON
+    (categoría, liga, categoría y liga, edad; en total y por hoja). Se
+    alimenta con el resultado de extraer_datos_excel o combinar_estados, se
+    une con otros resúmenes y genera un JSON con la misma forma que
+    contar_agregados, con los conteos de licencias únicas aproximados.
+    """
+
+    def __init__(self, precision=PRECISION):
+        self.precision = precision
+        self.hojas = []
+        self.participaciones_por_hoja = {}
+        # (dimensión, hoja o None para el total) -> {claves: HyperLogLog}
+        self.celdas = {}
+
+    def _celda(self, dimension, hoja, claves):
+        grupo = self.celdas.setdefault((dimension, hoja), {})
+        if claves not in grupo:
+            grupo[claves] = HyperLogLog(self.precision)
+        return grupo[claves]
+
+    def agregar(self, resultados):
+        """
+        Agrega las participaciones de un resultado de extracción.
+        """
+        tabla = resultados['participaciones']
+        participaciones_por_hoja = resultados.get('participaciones_por_hoja')
+        if participaciones_por_hoja is None:
+            participaciones_por_hoja = tabla.groupby('hoja', sort=False).size()
+        for hoja in resultados['hojas']:
+            if hoja not in self.participaciones_por_hoja:
+                self.hojas.append(hoja)
+                self.participaciones_por_hoja[hoja] = 0
+            self.participaciones_por_hoja[hoja] += int(participaciones_por_hoja.get(hoja, 0))
+
+        hashes = hash_licencias(tabla['licencia'])
+        self._celda('pilotos_unicos', None, ()).agregar_hashes(hashes)
+        for hoja, posiciones in tabla.groupby('hoja', sort=False).indices.items():
+            self._celda('pilotos_unicos', hoja, ()).agregar_hashes(hashes[posiciones])
+
+        for dimension, columnas in dimensiones_conteo(con_edad=True).items():
+            for claves, posiciones in tabla.groupby(columnas, sort=False).indices.items():
+                claves = claves if isinstance(claves, tuple) else (claves,)
+                self._celda(dimension, None, claves).agregar_hashes(hashes[posiciones])
+            for claves, posiciones in tabla.groupby(['hoja'] + columnas, sort=False).indices.items():
+                self._celda(dimension, claves[0], claves[1:]).agregar_hashes(hashes[posiciones])
+        return self
+
+    def __or__(self, otro):
+        if self.precision != otro.precision:
+            raise ValueError("No se pueden unir resúmenes con distinta precisión")
+        union = ResumenAproximado(self.precision)
+        for resumen in (self, otro):
+            for hoja in resumen.hojas:
+                if hoja not in union.participaciones_por_hoja:
+                    union.hojas.append(hoja)
+                    union.participaciones_por_hoja[hoja] = 0
+                union.participaciones_por_hoja[hoja] += resumen.participaciones_por_hoja[hoja]
+            for clave_grupo, grupo in resumen.celdas.items():
+                destino = union.celdas.setdefault(clave_grupo, {})
+                for claves, contador in grupo.items():
+                    destino[claves] = destino[claves] | contador if claves in destino else contador
+        return union
+
+    def _contar(self, dimension, hoja):
+        anidado = {}
+        for claves, contador in self.celdas.get((dimension, hoja), {}).items():
+            nivel = anidado
+            for clave in claves[:-1]:
+                nivel = nivel.setdefault(clave, {})
+            nivel[claves[-1]] = contador.cardinalidad()
+        return ordenar(anidado)
+
+    def _unicos(self, hoja):
+        contador = self.celdas.get(('pilotos_unicos', hoja), {}).get(())
+        return contador.cardinalidad() if contador else 0
+
+    def datos_json(self, con_edad=False):
+        """
+        Retorna los agregados con la misma estructura que contar_agregados.
+        """
+        dimensiones = dimensiones_conteo(con_edad)
+        datos = {
+            'total_pilotos_unicos': self._unicos(None),
+            'total_participaciones': sum(self.participaciones_por_hoja.values()),
+            'pilotos_por_categoria': self._contar('pilotos_por_categoria', None),
+            'deportistas_por_liga_total': self._contar('deportistas_por_liga', None),
+            'deportistas_por_liga_categoria': self._contar('deportistas_por_liga_categoria', None)
+        }
+        if con_edad:
+            datos['participaciones_por_edad'] = self._contar('participaciones_por_edad', None)
+        datos['modalidades'] = {
+            hoja: {
+                'pilotos_unicos': self._unicos(hoja),
+                'total_participaciones': self.participaciones_por_hoja[hoja],
+                **{dimension: self._contar(dimension, hoja) for dimension in dimensiones}
+            }
+            for hoja in self.hojas
+        }
+        return datos
+
+    def a_dict(self):
+        return {
+            'version': VERSION_RESUMEN,
+            'precision': self.precision,
+            'hojas': self.hojas,
+            'participaciones_por_hoja': self.participaciones_por_hoja,
+            'celdas': [
+                [dimension, hoja, list(claves), contador.a_dict()]
+                for (dimension, hoja), grupo in self.celdas.items()
+                for claves, contador in grupo.items()
+            ]
+        }
+
+    @classmethod
+    def de_dict(cls, datos):
+        if datos.get('version') != VERSION_RESUMEN:
+            raise ValueError(f"Versión de resumen no soportada: {datos.get('version')}")
+        resumen = cls(datos['precision'])
+        resumen.hojas = list(datos['hojas'])
+        resumen.participaciones_por_hoja = dict(datos['participaciones_por_hoja'])
+        for dimension, hoja, claves, contador in datos['celdas']:
+            resumen.celdas.setdefault((dimension, hoja), {})[tuple(claves)] = HyperLogLog.de_dict(contador, resumen.precision)
+        return resumen
+
+    def guardar(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.a_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return cls.de_dict(json.load(f))
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Uso: python conteo_aproximado.py <ruta_output_json> <resumen1.json> [<resumen2.json> ...]")
+        sys.exit(1)
+
+    resumenes = [ResumenAproximado.cargar(ruta) for ruta in sys.argv[2:]]
+    resumen = resumenes[0]
+    for otro in resumenes[1:]:
+        resumen = resumen | otro
+
+    datos_json = resumen.datos_json(con_edad=True)
+    with open(sys.argv[1], 'w', encoding='utf-8') as f:
+        json.dump(datos_json, f, ensure_ascii=False, indent=2)
+
+    error = HyperLogLog(resumen.precision).error_relativo
+    print(f"JSON generado en: {sys.argv[1]}")
+    print(f"- Resúmenes unidos: {len(resumenes)}")
+    print(f"- Total pilotos únicos (aprox.): {datos_json['total_pilotos_unicos']}")
+    print(f"- Error relativo típico: {error:.1%}")
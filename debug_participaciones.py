@@ -1,18 +1,9 @@
 import pandas as pd
-import unicodedata
-
-def normalizar_liga(nombre):
-    if pd.isna(nombre) or nombre == '':
-        return None
-    nombre = str(nombre).strip()
-    nombre = unicodedata.normalize('NFD', nombre)
-    nombre = ''.join(c for c in nombre if unicodedata.category(c) != 'Mn')
-    nombre = nombre.upper()
-    return nombre
+from cache_excel import abrir_excel
 
 excel_path = "Informes/Valida de ejemplo/valejempo.xlsx"
-excel_file = pd.ExcelFile(excel_path)
-df = pd.read_excel(excel_file, sheet_name='Hoja1')
+excel_file = abrir_excel(excel_path)
+df = excel_file.parse('Hoja1')
 
 columnas_info = ['Consecutivo', 'Licencia', 'TX', 'Nombre', 'Apellido', 'Liga', 
                 'Club', 'FN', 'RH', 'MOTO', 'Documento', 'EPS', 'Pago Licencia', 
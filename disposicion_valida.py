@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Disposición de las columnas de las hojas de válidas: columnas de licencia,
+liga y fecha de nacimiento, y columnas candidatas a categoría (las que están
+DESPUÉS de "Formatos" o, si no existe, las que no son datos del piloto).
+
+Las disposiciones se recuerdan por la huella del encabezado (hash de los
+nombres de columnas) en .cache_excel/disposiciones.json, junto con las
+categorías que tenían marcas la última vez: los libros de un mismo
+organizador repiten el encabezado, así que solo se revisan las marcas de
+esas categorías (ver recordadas_vigentes), y el archivo sirve para revisar
+qué se detectó en cada formato de libro.
+
+Uso: python disposicion_valida.py [--limpiar]
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from cache_excel import DIRECTORIO_CACHE, escribir_atomico
+
+RUTA_DISPOSICIONES = os.path.join(DIRECTORIO_CACHE, 'disposiciones.json')
+
+# Cambiar si cambia la forma de detectar la disposición, para invalidar lo anterior
+VERSION_DISPOSICIONES = 1
+
+# Columnas con la licencia, en orden de preferencia (si la primera está vacía se usa la siguiente)
+COLUMNAS_LICENCIA = ['Licencia', 'LICEN']
+COLUMNA_LIGA = 'Liga'
+COLUMNA_FN = 'FN'
+
+# Columnas de información del piloto, que no son categorías cuando no hay columna "Formatos"
+COLUMNAS_INFO = ['Consecutivo', 'Licencia', 'LICEN', 'TX', 'Nombre', 'Apellido', 'Liga',
+                 'Club', 'FN', 'RH', 'MOTO', 'Documento', 'EPS', 'Pago Licencia',
+                 'Poliza', 'Celular', 'Mail', 'Formatos', 'PRACT']
+
+def huella_encabezado(columnas):
+    """
+    Hash de los nombres de columnas (como texto, para que pandas y el motor
+    ligero den la misma huella).
+    """
+    nombres = json.dumps([str(columna) for columna in columnas], ensure_ascii=False)
+    return hashlib.sha1(nombres.encode('utf-8')).hexdigest()[:16]
+
+def indice_formatos(columnas):
+    """
+    Posición de la columna "Formatos", o None si no existe.
+    """
+    for i, columna in enumerate(columnas):
+        if str(columna).strip().upper() == 'FORMATOS':
+            return i
+    return None
+
+def _indices_candidatas(columnas, formatos):
+    if formatos is not None:
+        return [i for i in range(formatos + 1, len(columnas)) if str(columnas[i]) != 'nan']
+    return [i for i, columna in enumerate(columnas) if columna not in COLUMNAS_INFO and str(columna) != 'nan']
+
+def _avisar_formatos(formatos):
+    if formatos is not None:
+        print(f"  Columna 'Formatos' encontrada en índice {formatos}")
+    else:
+        print(f"  ADVERTENCIA: No se encontró la columna 'Formatos', usando método fallback")
+
+def columnas_candidatas(columnas):
+    """
+    Retorna las columnas que pueden ser categorías: las que están DESPUÉS de
+    la columna "Formatos" o, si no existe, las que no son de información del
+    piloto.
+    """
+    columnas = list(columnas)
+    formatos = indice_formatos(columnas)
+    _avisar_formatos(formatos)
+    return [columnas[i] for i in _indices_candidatas(columnas, formatos)]
+
+def detectar_disposicion(columnas):
+    """
+    Analiza un encabezado y retorna su disposición con posiciones de columna:
+    {'formatos', 'licencia' (lista), 'liga', 'fn', 'candidatas' (lista)};
+    las columnas que no existen quedan en None.
+    """
+    columnas = list(columnas)
+    posiciones = {columna: i for i, columna in enumerate(columnas)}
+    formatos = indice_formatos(columnas)
+    return {
+        'formatos': formatos,
+        'licencia': [posiciones[columna] for columna in COLUMNAS_LICENCIA if columna in posiciones],
+        'liga': posiciones.get(COLUMNA_LIGA),
+        'fn': posiciones.get(COLUMNA_FN),
+        'candidatas': _indices_candidatas(columnas, formatos)
+    }
+
+def recordadas_vigentes(disposicion, con_marcas, con_valores):
+    """
+    Indica si las categorías recordadas de la disposición sirven para esta
+    hoja sin revisar las demás candidatas: todas las recordadas tienen alguna
+    marca y ninguna otra candidata tiene valores (una columna sin valores no
+    puede tener marcas). con_marcas(columna) y con_valores(columna) revisan
+    la columna en la hoja. Si no, hay que volver a detectar las categorías.
+    """
+    recordadas = disposicion['categorias']
+    if recordadas is None:
+        return False
+    otras = [columna for columna in disposicion['candidatas'] if columna not in recordadas]
+    return all(con_marcas(columna) for columna in recordadas) and not any(con_valores(columna) for columna in otras)
+
+class Disposiciones:
+    """
+    Disposiciones conocidas, por huella de encabezado. Con usar_cache=False
+    no se lee ni se escribe el archivo y cada encabezado se analiza de nuevo.
+    """
+
+    def __init__(self, ruta=RUTA_DISPOSICIONES, usar_cache=True):
+        self.ruta = ruta
+        self.usar_cache = usar_cache
+        self.conocidas = self._leer() if usar_cache else {}
+        self.cambios = {}
+
+    def _leer(self):
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                contenido = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if contenido.get('version') != VERSION_DISPOSICIONES:
+            return {}
+        return contenido.get('disposiciones', {})
+
+    def obtener(self, columnas):
+        """
+        Retorna la disposición de un encabezado con los nombres de las
+        columnas: {'huella', 'licencia' (lista), 'liga', 'fn', 'candidatas',
+        'categorias'}; liga y fn son None si no existen y categorias (las
+        candidatas que tenían marcas la última vez) es None si todavía no se
+        han registrado. Solo se analiza el encabezado si su huella no se conoce.
+        """
+        columnas = list(columnas)
+        huella = huella_encabezado(columnas)
+        disposicion = self.conocidas.get(huella)
+        if disposicion is None:
+            disposicion = detectar_disposicion(columnas)
+            disposicion['encabezado'] = [str(columna) for columna in columnas]
+            self._anotar(huella, disposicion)
+        _avisar_formatos(disposicion['formatos'])
+
+        def nombre(indice):
+            return None if indice is None else columnas[indice]
+
+        return {
+            'huella': huella,
+            'licencia': [columnas[i] for i in disposicion['licencia']],
+            'liga': nombre(disposicion['liga']),
+            'fn': nombre(disposicion['fn']),
+            'candidatas': [columnas[i] for i in disposicion['candidatas']],
+            'categorias': [columnas[i] for i in disposicion['categorias']] if 'categorias' in disposicion else None
+        }
+
+    def registrar_categorias(self, disposicion, categorias):
+        """
+        Recuerda qué candidatas tenían marcas "x" en la última hoja con esta
+        disposición, para que la próxima hoja con el mismo encabezado revise
+        solo esas columnas.
+        """
+        guardada = self.conocidas[disposicion['huella']]
+        indices = [guardada['candidatas'][disposicion['candidatas'].index(c)] for c in categorias]
+        if guardada.get('categorias') != indices:
+            self._anotar(disposicion['huella'], {**guardada, 'categorias': indices})
+
+    def _anotar(self, huella, disposicion):
+        disposicion['actualizada'] = datetime.now().isoformat(timespec='seconds')
+        self.conocidas[huella] = disposicion
+        self.cambios[huella] = disposicion
+
+    def guardar(self):
+        """
+        Escribe las disposiciones nuevas o cambiadas, conservando las que
+        otro proceso haya guardado mientras tanto.
+        """
+        if not self.usar_cache or not self.cambios:
+            return
+        conocidas = {**self._leer(), **self.cambios}
+
+        def escribir(ruta):
+            with open(ruta, 'w', encoding='utf-8') as f:
+                json.dump({'version': VERSION_DISPOSICIONES, 'disposiciones': conocidas}, f,
+                          ensure_ascii=False, indent=2)
+
+        try:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            escribir_atomico(self.ruta, escribir)
+        except OSError as e:
+            print(f"  ADVERTENCIA: No se pudieron guardar las disposiciones de columnas: {e}")
+            return
+        self.conocidas = conocidas
+        self.cambios = {}
+
+if __name__ == "__main__":
+    import sys
+
+    if '--limpiar' in sys.argv:
+        if os.path.exists(RUTA_DISPOSICIONES):
+            os.remove(RUTA_DISPOSICIONES)
+        print(f"Disposiciones eliminadas: {RUTA_DISPOSICIONES}")
+    else:
+        conocidas = Disposiciones().conocidas
+        print(f"Disposiciones conocidas: {len(conocidas)} ({RUTA_DISPOSICIONES})")
+        for huella, disposicion in sorted(conocidas.items(), key=lambda par: par[1]['actualizada']):
+            encabezado = disposicion['encabezado']
+
+            def nombres(indices):
+                return ', '.join(encabezado[i] for i in indices) or '-'
+
+            print(f"\n{huella} (actualizada {disposicion['actualizada']}, {len(encabezado)} columnas)")
+            print(f"  Licencia: {nombres(disposicion['licencia'])}")
+            print(f"  Liga: {nombres([disposicion['liga']] if disposicion['liga'] is not None else [])}")
+            print(f"  FN: {nombres([disposicion['fn']] if disposicion['fn'] is not None else [])}")
+            print(f"  Candidatas: {nombres(disposicion['candidatas'])}")
+            if 'categorias' in disposicion:
+                print(f"  Categorías con marcas: {nombres(disposicion['categorias'])}")
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Escritor mínimo de PDF vectorial, sin dependencias: páginas A4 con textos
+(Helvetica y Helvetica-Bold, las fuentes estándar que trae todo lector de
+PDF, con codificación WinAnsi para acentos y ñ), rectángulos, líneas e
+imágenes PNG. Los contenidos se comprimen con zlib.
+
+Las coordenadas se miden en puntos (1/72 de pulgada) desde la esquina
+superior izquierda de la página, con y creciendo hacia abajo.
+"""
+
+import struct
+import zlib
+
+# Tamaño de página A4 en puntos
+ANCHO_A4 = 595.28
+ALTO_A4 = 841.89
+
+# Anchos de los caracteres 32 a 255 (WinAnsi) en milésimas del tamaño de la
+# fuente, tomados de las métricas AFM de Adobe
+ANCHOS_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584, 350,
+    556, 350, 222, 556, 333, 1000, 556, 556, 333, 1000, 667, 333, 1000, 350, 611, 350,
+    350, 222, 222, 333, 333, 350, 556, 1000, 333, 1000, 500, 333, 944, 350, 500, 667,
+    278, 333, 556, 556, 556, 556, 260, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 556, 537, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    667, 667, 667, 667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 500, 556, 556, 556, 556, 278, 278, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 584, 611, 556, 556, 556, 556, 500, 556, 500
+)
+
+ANCHOS_HELVETICA_NEGRITA = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584, 350,
+    556, 350, 278, 556, 500, 1000, 556, 556, 333, 1000, 667, 333, 1000, 350, 611, 350,
+    350, 278, 278, 500, 500, 350, 556, 1000, 333, 1000, 556, 333, 944, 350, 500, 667,
+    278, 333, 556, 556, 556, 556, 280, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 611, 556, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    722, 722, 722, 722, 722, 722, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 556, 556, 556, 556, 556, 278, 278, 278, 278,
+    611, 611, 611, 611, 611, 611, 611, 584, 611, 611, 611, 611, 611, 556, 611, 556
+)
+
+def color_rgb(color):
+    """
+    Convierte '#123E92' o (r, g, b) de 0 a 255 en componentes de 0 a 1.
+    """
+    if isinstance(color, str):
+        color = color.lstrip('#')
+        color = tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+    return tuple(round(c / 255, 4) for c in color)
+
+def codificar_texto(texto):
+    """
+    Codifica el texto en WinAnsi (cp1252). Los caracteres que no existen en
+    esa codificación (ej. emojis) se omiten.
+    """
+    return str(texto).encode('cp1252', errors='ignore')
+
+def ancho_texto(texto, tamano, negrita=False):
+    """
+    Ancho en puntos del texto con la fuente y el tamaño dados.
+    """
+    anchos = ANCHOS_HELVETICA_NEGRITA if negrita else ANCHOS_HELVETICA
+    return sum(anchos[b - 32] if b >= 32 else 0 for b in codificar_texto(texto)) * tamano / 1000
+
+def recortar_texto(texto, ancho_maximo, tamano, negrita=False):
+    """
+    Recorta el texto con "..." para que quepa en ancho_maximo.
+    """
+    texto = str(texto)
+    if ancho_texto(texto, tamano, negrita) <= ancho_maximo:
+        return texto
+    while texto and ancho_texto(texto + '...', tamano, negrita) > ancho_maximo:
+        texto = texto[:-1]
+    return texto.rstrip() + '...'
+
+def partir_lineas(texto, ancho_maximo, tamano, negrita=False):
+    """
+    Parte el texto en líneas por palabras para que cada una quepa en ancho_maximo.
+    """
+    lineas = []
+    actual = ''
+    for palabra in str(texto).split():
+        propuesta = f"{actual} {palabra}" if actual else palabra
+        if actual and ancho_texto(propuesta, tamano, negrita) > ancho_maximo:
+            lineas.append(actual)
+            actual = palabra
+        else:
+            actual = propuesta
+    return lineas + [actual] if actual else lineas
+
+def _escapar(datos):
+    return datos.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)').replace(b'\r', b'\\r')
+
+def _numero(valor):
+    return f"{valor:.2f}".rstrip('0').rstrip('.')
+
+def leer_png(ruta):
+    """
+    Lee un PNG de 8 bits RGB o RGBA sin entrelazar. Retorna
+    (ancho, alto, bytes RGB, bytes del canal alfa o None).
+    """
+    with open(ruta, 'rb') as f:
+        contenido = f.read()
+    if contenido[:8] != b'\x89PNG\r\n\x1a\n':
+        raise ValueError(f"No es un PNG: {ruta}")
+    posicion, idat = 8, []
+    while posicion < len(contenido):
+        longitud, tipo = struct.unpack('>I4s', contenido[posicion:posicion + 8])
+        datos = contenido[posicion + 8:posicion + 8 + longitud]
+        if tipo == b'IHDR':
+            ancho, alto, bits, tipo_color, _, _, entrelazado = struct.unpack('>IIBBBBB', datos)
+        elif tipo == b'IDAT':
+            idat.append(datos)
+        posicion += 12 + longitud
+    if bits != 8 or tipo_color not in (2, 6) or entrelazado:
+        raise ValueError(f"PNG no soportado (se necesita RGB o RGBA de 8 bits sin entrelazar): {ruta}")
+
+    canales = 3 if tipo_color == 2 else 4
+    fila = ancho * canales
+    crudo = zlib.decompress(b''.join(idat))
+    pixeles = bytearray()
+    anterior = bytearray(fila)
+    for y in range(alto):
+        inicio = y * (fila + 1)
+        filtro = crudo[inicio]
+        actual = bytearray(crudo[inicio + 1:inicio + 1 + fila])
+        # Deshacer el filtro de la fila (especificación PNG, sección 9)
+        for i in range(fila):
+            izquierda = actual[i - canales] if i >= canales else 0
+            arriba = anterior[i]
+            if filtro == 1:
+                actual[i] = (actual[i] + izquierda) & 0xFF
+            elif filtro == 2:
+                actual[i] = (actual[i] + arriba) & 0xFF
+            elif filtro == 3:
+                actual[i] = (actual[i] + (izquierda + arriba) // 2) & 0xFF
+            elif filtro == 4:
+                arriba_izquierda = anterior[i - canales] if i >= canales else 0
+                p = izquierda + arriba - arriba_izquierda
+                pa, pb, pc = abs(p - izquierda), abs(p - arriba), abs(p - arriba_izquierda)
+                prediccion = izquierda if pa <= pb and pa <= pc else (arriba if pb <= pc else arriba_izquierda)
+                actual[i] = (actual[i] + prediccion) & 0xFF
+        pixeles += actual
+        anterior = actual
+
+    if canales == 3:
+        return ancho, alto, bytes(pixeles), None
+    rgb = bytearray(ancho * alto * 3)
+    rgb[0::3], rgb[1::3], rgb[2::3] = pixeles[0::4], pixeles[1::4], pixeles[2::4]
+    return ancho, alto, bytes(rgb), bytes(pixeles[3::4])
+
+class DocumentoPDF:
+    """
+    Documento PDF que se dibuja página por página y se guarda al final.
+    pie: texto del pie de cada página, con {pagina} y {total}.
+    """
+
+    def __init__(self, titulo='', pie='Página {pagina} de {total}', ancho=ANCHO_A4, alto=ALTO_A4):
+        self.titulo = titulo
+        self.pie = pie
+        self.ancho = ancho
+        self.alto = alto
+        self.paginas = []
+        self.imagenes = []
+        self._imagenes_por_ruta = {}
+
+    def nueva_pagina(self):
+        self.paginas.append([])
+
+    def _agregar(self, operacion):
+        if not self.paginas:
+            self.nueva_pagina()
+        self.paginas[-1].append(operacion)
+
+    def texto(self, x, y, texto, tamano=10, negrita=False, color='#333333', alineacion='izquierda'):
+        """
+        Escribe una línea de texto con la línea base en y.
+        alineacion: 'izquierda', 'centro' o 'derecha' respecto de x.
+        """
+        self._agregar(self._operacion_texto(x, y, texto, tamano, negrita, color, alineacion))
+
+    def _operacion_texto(self, x, y, texto, tamano, negrita, color, alineacion):
+        if alineacion != 'izquierda':
+            ancho = ancho_texto(texto, tamano, negrita)
+            x -= ancho / 2 if alineacion == 'centro' else ancho
+        r, g, b = color_rgb(color)
+        return b'BT %s %s %s rg /F%d %s Tf %s %s Td (%s) Tj ET' % (
+            _numero(r).encode(), _numero(g).encode(), _numero(b).encode(), 2 if negrita else 1,
+            _numero(tamano).encode(), _numero(x).encode(), _numero(self.alto - y).encode(),
+            _escapar(codificar_texto(texto)))
+
+    def rectangulo(self, x, y, ancho, alto, relleno=None, borde=None, grosor=1):
+        """
+        Dibuja un rectángulo con la esquina superior izquierda en (x, y).
+        """
+        if relleno is None and borde is None:
+            return
+        partes = []
+        if relleno is not None:
+            partes.append('%s %s %s rg' % tuple(map(_numero, color_rgb(relleno))))
+        if borde is not None:
+            partes.append('%s %s %s RG %s w' % (*map(_numero, color_rgb(borde)), _numero(grosor)))
+        partes.append('%s %s %s %s re' % (_numero(x), _numero(self.alto - y - alto), _numero(ancho), _numero(alto)))
+        partes.append('B' if relleno is not None and borde is not None else ('f' if relleno is not None else 'S'))
+        self._agregar(' '.join(partes).encode())
+
+    def linea(self, x1, y1, x2, y2, color='#000000', grosor=1):
+        self._agregar(('%s %s %s RG %s w %s %s m %s %s l S' % (
+            *map(_numero, color_rgb(color)), _numero(grosor),
+            _numero(x1), _numero(self.alto - y1), _numero(x2), _numero(self.alto - y2))).encode())
+
+    def imagen(self, ruta_png, x, y, ancho, alto):
+        """
+        Dibuja un PNG con la esquina superior izquierda en (x, y). La imagen
+        se incluye una sola vez en el archivo aunque se dibuje varias veces.
+        """
+        if ruta_png not in self._imagenes_por_ruta:
+            self._imagenes_por_ruta[ruta_png] = len(self.imagenes)
+            self.imagenes.append(leer_png(ruta_png))
+        nombre = f"/Im{self._imagenes_por_ruta[ruta_png] + 1}"
+        self._agregar(('q %s 0 0 %s %s %s cm %s Do Q' % (
+            _numero(ancho), _numero(alto), _numero(x), _numero(self.alto - y - alto), nombre)).encode())
+
+    def a_bytes(self):
+        """
+        Retorna el archivo PDF completo.
+        """
+        if not self.paginas:
+            self.nueva_pagina()
+        objetos = []
+
+        def objeto(contenido):
+            objetos.append(contenido)
+            return len(objetos)
+
+        def flujo(datos, diccionario=b''):
+            comprimido = zlib.compress(datos, 9)
+            return b'<< %s /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (diccionario, len(comprimido), comprimido)
+
+        catalogo = objeto(None)
+        arbol = objeto(None)
+        info = objeto(b'<< /Title (%s) /Creator (generar_informe.py) >>' % _escapar(codificar_texto(self.titulo)))
+        fuentes = [objeto(b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % nombre)
+                   for nombre in (b'Helvetica', b'Helvetica-Bold')]
+        imagenes = []
+        for ancho, alto, rgb, alfa in self.imagenes:
+            mascara = b''
+            if alfa is not None:
+                numero = objeto(flujo(alfa, b'/Type /XObject /Subtype /Image /Width %d /Height %d '
+                                            b'/ColorSpace /DeviceGray /BitsPerComponent 8' % (ancho, alto)))
+                mascara = b' /SMask %d 0 R' % numero
+            imagenes.append(objeto(flujo(rgb, b'/Type /XObject /Subtype /Image /Width %d /Height %d '
+                                              b'/ColorSpace /DeviceRGB /BitsPerComponent 8%s' % (ancho, alto, mascara))))
+        recursos = b'<< /Font << /F1 %d 0 R /F2 %d 0 R >> /XObject << %s >> >>' % (
+            fuentes[0], fuentes[1], b' '.join(b'/Im%d %d 0 R' % (i + 1, n) for i, n in enumerate(imagenes)))
+
+        total = len(self.paginas)
+        hojas = []
+        for numero_pagina, operaciones in enumerate(self.paginas, start=1):
+            if self.pie:
+                # El pie se agrega al guardar, cuando ya se conoce el total de páginas
+                pie = self.pie.format(pagina=numero_pagina, total=total)
+                operaciones = operaciones + [self._operacion_texto(self.ancho / 2, self.alto - 20, pie, 8, False,
+                                                                   '#888888', 'centro')]
+            contenido = objeto(flujo(b'\n'.join(operaciones)))
+            hojas.append(objeto(b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Resources %s /Contents %d 0 R >>' % (
+                arbol, _numero(self.ancho).encode(), _numero(self.alto).encode(), recursos, contenido)))
+        objetos[catalogo - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % arbol
+        objetos[arbol - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % n for n in hojas), total)
+
+        salida = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        posiciones = []
+        for numero, contenido in enumerate(objetos, start=1):
+            posiciones.append(len(salida))
+            salida += b'%d 0 obj\n%s\nendobj\n' % (numero, contenido)
+        inicio_xref = len(salida)
+        salida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+        salida += b''.join(b'%010d 00000 n \n' % p for p in posiciones)
+        salida += b'trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(objetos) + 1, catalogo, info, inicio_xref)
+        return bytes(salida)
+
+    def guardar(self, ruta):
+        with open(ruta, 'wb') as f:
+            f.write(self.a_bytes())
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Estado persistido de cada válida y combinación en totales de temporada.
+El estado de una válida guarda sus participaciones sin repetidos (las
+licencias de cada categoría, liga, edad y hoja), de modo que varias válidas
+se pueden combinar en totales de semestre o de temporada con conteos de
+licencias únicas exactos, sin volver a leer sus Excel.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from cache_excel import hash_archivo, escribir_atomico
+from licencias import CodificadorLicencias
+from participaciones import COLUMNAS_PARTICIPACION, modalidad_de_hoja, tabla_participaciones
+
+# Cambiar si cambia el formato del estado, para que se vuelva a generar
+VERSION_ESTADO = 2
+
+# Columnas guardadas; 'codigo' no se guarda porque depende del codificador de cada ejecución
+COLUMNAS_ESTADO = [columna for columna in COLUMNAS_PARTICIPACION if columna != 'codigo']
+
+# Agrupaciones posibles del detalle 'modalidades' al combinar estados
+AGRUPACIONES = ('modalidad', 'valida', 'hoja')
+
+def ruta_estado(excel_path):
+    """
+    Ruta del estado de una válida: estado_<nombre>.json en la carpeta del Excel.
+    """
+    carpeta, archivo = os.path.split(excel_path)
+    return os.path.join(carpeta, f"estado_{os.path.splitext(archivo)[0]}.json")
+
+def fin_de_temporada(temporada=None):
+    """
+    Fecha de referencia por defecto de los totales de temporada: el 31 de
+    diciembre del año de la temporada (ej. '2025') o, sin temporada, del año
+    en curso. Es fija durante toda la temporada, así que los estados
+    guardados siguen vigentes de un día para otro.
+    """
+    anio = re.match(r'\d{4}', str(temporada)) if temporada else None
+    return datetime(int(anio.group()) if anio else datetime.now().year, 12, 31)
+
+def opciones_estado(fecha_referencia, limites_edad, modo, modalidad=None):
+    """
+    Opciones del análisis que afectan el estado. Un estado guardado con otras
+    opciones (ej. otra fecha para las edades) no se reutiliza.
+    """
+    return {
+        'fecha_referencia': fecha_referencia.strftime('%Y-%m-%d'),
+        'limites_edad': list(limites_edad),
+        'modo': modo,
+        'modalidad': modalidad
+    }
+
+def estado_valida(resultados, excel_path, opciones=None, nombre=None):
+    """
+    Construye el estado de una válida a partir del resultado de
+    extraer_datos_excel (Informes/analizar_valida.py).
+    """
+    tabla = resultados['participaciones']
+    participaciones_por_hoja = resultados.get('participaciones_por_hoja')
+    if participaciones_por_hoja is None:
+        participaciones_por_hoja = tabla.groupby('hoja', sort=False).size()
+    modalidad_por_hoja = resultados.get('modalidad_por_hoja', {})
+
+    # Filas sin repetidos y cuántas veces aparece cada una (para contar participaciones con filtros)
+    grupos = tabla.groupby(COLUMNAS_ESTADO, sort=False, dropna=False).ngroup().to_numpy()
+    _, primeras = np.unique(grupos, return_index=True)
+    veces = np.bincount(grupos, minlength=len(primeras))
+    tabla = tabla.iloc[primeras].reset_index(drop=True)
+    return {
+        'version': VERSION_ESTADO,
+        'valida': nombre or os.path.splitext(os.path.basename(excel_path))[0],
+        'archivo': os.path.basename(excel_path),
+        'hash': hash_archivo(excel_path),
+        'opciones': opciones or {},
+        'hojas': [
+            {
+                'nombre': hoja,
+                'modalidad': modalidad_por_hoja.get(hoja, modalidad_de_hoja(hoja)),
+                'participaciones': int(participaciones_por_hoja.get(hoja, 0))
+            }
+            for hoja in resultados['hojas']
+        ],
+        'participaciones': {
+            **{columna: tabla[columna].tolist() for columna in COLUMNAS_ESTADO},
+            'veces': veces.tolist()
+        }
+    }
+
+def guardar_estado(estado, ruta):
+    """
+    Guarda el estado en JSON (escritura atómica, así un lote interrumpido no
+    deja estados a medio escribir).
+    """
+    def escribir(temporal):
+        with open(temporal, 'w', encoding='utf-8') as f:
+            # Los escalares de numpy se guardan como números de Python
+            json.dump(estado, f, ensure_ascii=False, default=lambda valor: valor.item())
+
+    escribir_atomico(os.path.abspath(ruta), escribir)
+
+def cargar_estado(ruta):
+    """
+    Lee un estado guardado con guardar_estado.
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def estado_vigente(ruta, excel_path, opciones=None):
+    """
+    Retorna el estado guardado si corresponde al contenido actual del Excel y
+    a las mismas opciones; si no existe o está desactualizado retorna None.
+    """
+    try:
+        estado = cargar_estado(ruta)
+    except (OSError, ValueError):
+        return None
+    if estado.get('version') != VERSION_ESTADO or estado.get('hash') != hash_archivo(excel_path):
+        return None
+    if opciones is not None and estado.get('opciones') != opciones:
+        return None
+    return estado
+
+def combinar_estados(estados, por='modalidad'):
+    """
+    Combina los estados de varias válidas en un resultado con la misma forma
+    que extraer_datos_excel, listo para generar_json. Las licencias se vuelven
+    a codificar con un codificador común, así que los conteos de licencias
+    únicas son exactos (una licencia en varias válidas cuenta una vez); las
+    participaciones sí se suman.
+
+    por: cómo se agrupa el detalle 'modalidades': 'modalidad' (ej. todas las
+    válidas de Motocross juntas), 'valida' (una entrada por válida) u 'hoja'.
+    """
+    if por not in AGRUPACIONES:
+        raise ValueError(f"Agrupación no soportada: {por}")
+
+    bloques = []
+    grupos = []
+    participaciones_por_grupo = {}
+    for estado in estados:
+        tabla = pd.DataFrame(estado['participaciones'], columns=COLUMNAS_ESTADO, dtype=object)
+        if por == 'valida':
+            claves = {hoja['nombre']: estado['valida'] for hoja in estado['hojas']}
+        else:
+            claves = {hoja['nombre']: hoja['modalidad' if por == 'modalidad' else 'nombre'] for hoja in estado['hojas']}
+
+        for hoja in estado['hojas']:
+            grupo = claves[hoja['nombre']]
+            if grupo not in participaciones_por_grupo:
+                grupos.append(grupo)
+                participaciones_por_grupo[grupo] = 0
+            participaciones_por_grupo[grupo] += hoja['participaciones']
+
+        tabla['hoja'] = tabla['hoja'].map(claves)
+        bloques.append(tabla)
+
+    codificador = CodificadorLicencias()
+    tabla = pd.concat(bloques, ignore_index=True) if bloques else pd.DataFrame(columns=COLUMNAS_ESTADO, dtype=object)
+    tabla['codigo'] = codificador.codificar(tabla['licencia'])
+    return {
+        'participaciones': tabla_participaciones([tabla]),
+        'hojas': grupos,
+        'codificador': codificador,
+        'participaciones_por_hoja': participaciones_por_grupo
+    }
@@ -66,7 +66,7 @@ echo   PASO 1: Analizando Excel...
 echo ═══════════════════════════════════════════════════════════
 echo.
 
-python "Informes\analizar_valida.py" "%EXCEL_PATH%" "%JSON_PATH%"
+python "Informes\analizar_valida.py" "%EXCEL_PATH%" "%JSON_PATH%" --motor ligero
 
 if errorlevel 1 (
     echo.
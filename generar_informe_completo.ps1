@@ -54,7 +54,7 @@ Write-Host "══════════════════════
 Write-Host ""
 
 $scriptPath = Join-Path $PSScriptRoot "Informes\analizar_valida.py"
-$result1 = & python $scriptPath $ExcelPath $jsonPath
+$result1 = & python $scriptPath $ExcelPath $jsonPath --motor ligero
 
 if ($LASTEXITCODE -ne 0) {
     Write-Host ""
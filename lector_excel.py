@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Lectura por streaming de libros de Excel grandes.
+Las hojas y sus filas se recorren de forma perezosa con openpyxl en modo
+solo lectura (solo valores), sin construir el DataFrame completo de la hoja.
+Los valores se convierten igual que pd.read_excel (con las funciones de
+lector_xlsx) para que los resultados sean los mismos que con la lectura normal.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from openpyxl import load_workbook
+from cache_excel import abrir_excel
+from lector_xlsx import convertir_celda, nombres_columnas, recortar
+
+# Cantidad de filas que se convierten a DataFrame a la vez
+TAMANO_BLOQUE = 5000
+
+def iterar_hojas(excel_path):
+    """
+    Recorre las hojas del libro sin cargarlas completas. Produce tuplas
+    (nombre_hoja, encabezado, filas), donde filas es un generador de tuplas
+    de valores ya convertidos.
+    """
+    libro = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        for hoja in libro.worksheets:
+            # Igual que pandas: no confiar en las dimensiones guardadas en el archivo
+            hoja.reset_dimensions()
+            filas = (
+                recortar([convertir_celda(valor) for valor in fila])
+                for fila in hoja.iter_rows(values_only=True)
+            )
+            encabezado = next(filas, [])
+            yield hoja.title, encabezado, filas
+    finally:
+        libro.close()
+
+def iterar_bloques(encabezado, filas, tamano_bloque=None):
+    """
+    Agrupa las filas de una hoja en DataFrames de a lo sumo tamano_bloque
+    filas, con los mismos nombres de columnas que daría pd.read_excel.
+    Una hoja sin filas de datos produce un solo DataFrame vacío con las
+    columnas del encabezado.
+    """
+    tamano_bloque = tamano_bloque or TAMANO_BLOQUE
+    bloque = []
+    producidos = 0
+    for fila in filas:
+        if fila:
+            bloque.append(fila)
+        if len(bloque) >= tamano_bloque:
+            yield _a_dataframe(encabezado, bloque)
+            producidos += 1
+            bloque = []
+    if bloque or not producidos:
+        yield _a_dataframe(encabezado, bloque)
+
+def _a_dataframe(encabezado, bloque):
+    ancho = max([len(encabezado)] + [len(fila) for fila in bloque])
+    filas = [fila + [None] * (ancho - len(fila)) for fila in bloque]
+    return pd.DataFrame(filas, columns=nombres_columnas(encabezado, ancho), dtype=object)
+
+def leer_hoja(excel_path, sheet_name, usar_cache=True):
+    """
+    Lee una sola hoja completa (a través de la caché de libros). Es la tarea
+    que ejecuta cada proceso en la lectura en paralelo.
+    """
+    return abrir_excel(excel_path, usar_cache=usar_cache).parse(sheet_name)
+
+def _perezoso(funcion, *args):
+    """
+    Iterador de un solo elemento que llama a funcion(*args) al pedirlo, para
+    que la lectura de la hoja ocurra al recorrer sus bloques (y así se mida
+    como parte de ella, ver perfil_ejecucion).
+    """
+    yield funcion(*args)
+
+def _hojas_en_paralelo(excel_path, nombres, usar_cache, procesos):
+    """
+    Lee las hojas en un grupo de procesos y las entrega en el orden del libro,
+    a medida que cada una está lista.
+    """
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        futuros = [grupo.submit(leer_hoja, excel_path, nombre, usar_cache) for nombre in nombres]
+        for nombre, futuro in zip(nombres, futuros):
+            yield nombre, _perezoso(futuro.result)
+
+def leer_hojas(excel_path, usar_cache=True, streaming=False, procesos=1):
+    """
+    Punto de entrada común de los extractores. Retorna (nombres_hojas, hojas),
+    donde hojas produce tuplas (nombre_hoja, bloques) y bloques es un
+    iterador de DataFrames:
+    - streaming=False: un solo DataFrame con la hoja completa (a través de la
+      caché de libros de cache_excel).
+    - streaming=True: bloques de TAMANO_BLOQUE filas leídos de forma perezosa,
+      sin tener la hoja completa ni el libro como DataFrame en memoria.
+    
+    procesos: cantidad de procesos para leer las hojas en paralelo (solo sin
+    streaming); 0 o None usa todos los núcleos. Las hojas se entregan siempre
+    en el orden del libro, así que el resultado no depende de este valor.
+    """
+    if not procesos:
+        procesos = os.cpu_count() or 1
+    
+    if streaming:
+        if procesos > 1:
+            raise ValueError("La lectura por streaming no se puede combinar con varios procesos")
+        libro = load_workbook(excel_path, read_only=True, data_only=True)
+        nombres = list(libro.sheetnames)
+        libro.close()
+        hojas = (
+            (nombre, iterar_bloques(encabezado, filas))
+            for nombre, encabezado, filas in iterar_hojas(excel_path)
+        )
+        return nombres, hojas
+
+    excel_file = abrir_excel(excel_path, usar_cache=usar_cache)
+    nombres = list(excel_file.sheet_names)
+    if procesos > 1 and len(nombres) > 1:
+        return nombres, _hojas_en_paralelo(excel_path, nombres, usar_cache, min(procesos, len(nombres)))
+    
+    hojas = (
+        (nombre, _perezoso(excel_file.parse, nombre))
+        for nombre in nombres
+    )
+    return nombres, hojas
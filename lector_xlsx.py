@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""
+Lector mínimo de libros .xlsx con la biblioteca estándar (zipfile y
+xml.etree), sin openpyxl ni pandas, para el motor ligero de
+Informes/analizar_valida.py: importar pandas y openpyxl toma más tiempo que
+analizar una válida pequeña.
+
+Las celdas se interpretan como openpyxl en modo solo lectura (valores
+calculados, fechas según el formato de número de la celda) y se convierten
+como pd.read_excel (convertir_celda). Las celdas con error (#N/A, #DIV/0!,
+...) quedan vacías, igual que en pandas.
+"""
+
+import re
+import zipfile
+from datetime import datetime, time, timedelta
+from xml.etree.ElementTree import iterparse, parse
+
+# Textos que pd.read_excel interpreta como vacíos (na_values por defecto)
+VALORES_NULOS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+
+NS_HOJA = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_RELACION = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_RELACIONES = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Formatos de número integrados de Excel que son fechas u horas (los demás
+# integrados son números o texto)
+FORMATOS_INTEGRADOS = {
+    14: 'mm-dd-yy', 15: 'd-mmm-yy', 16: 'd-mmm', 17: 'mmm-yy', 18: 'h:mm AM/PM', 19: 'h:mm:ss AM/PM',
+    20: 'h:mm', 21: 'h:mm:ss', 22: 'm/d/yy h:mm', 45: 'mm:ss', 46: '[h]:mm:ss', 47: 'mmss.0'
+}
+
+# Igual que openpyxl: se ignoran los textos entre comillas y los corchetes que
+# no son duraciones ([$-409], [Red], ...)
+_SIN_LITERALES = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_FORMATO_DURACION = re.compile(r'\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?', re.I)
+_COORDENADA = re.compile(r'([A-Z]+)')
+
+# Textos que pandas interpreta como números o booleanos al inferir el tipo de una columna
+_NUMERO = re.compile(r'\s*[+-]?(\d+\.?\d*([eE][+-]?\d+)?|\.\d+([eE][+-]?\d+)?|inf(inity)?)\s*$', re.I)
+_ENTERO = re.compile(r'\s*[+-]?\d+\s*$')
+_BOOLEANOS = {'True': True, 'TRUE': True, 'true': True, 'False': False, 'FALSE': False, 'false': False}
+
+EPOCA_WINDOWS = datetime(1899, 12, 30)
+EPOCA_MAC = datetime(1904, 1, 1)
+
+def convertir_celda(valor):
+    """
+    Convierte el valor de una celda como lo hace pd.read_excel: los números
+    enteros quedan como int y los vacíos o textos nulos como None.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        return None if valor in VALORES_NULOS else valor
+    if isinstance(valor, float):
+        return int(valor) if valor.is_integer() else valor
+    return valor
+
+def nombres_columnas(encabezado, ancho):
+    """
+    Construye los nombres de columnas como pd.read_excel: las columnas sin
+    nombre quedan como "Unnamed: i" y los nombres repetidos como "nombre.1".
+    """
+    nombres = []
+    vistos = {}
+    for i in range(ancho):
+        nombre = encabezado[i] if i < len(encabezado) else None
+        if nombre is None:
+            nombre = f"Unnamed: {i}"
+        if nombre in vistos:
+            base = nombre
+            while nombre in vistos:
+                vistos[base] += 1
+                nombre = f"{base}.{vistos[base]}"
+        vistos[nombre] = 0
+        nombres.append(nombre)
+    return nombres
+
+def recortar(fila):
+    """
+    Quita las celdas vacías al final de la fila.
+    """
+    fin = len(fila)
+    while fin and fila[fin - 1] is None:
+        fin -= 1
+    return fila[:fin]
+
+def inferir_tipos(valores):
+    """
+    Convierte los valores de una columna (ya pasados por convertir_celda)
+    con la inferencia de tipos de pd.read_excel:
+    - si todos los valores no vacíos son números, booleanos o textos
+      numéricos (ej. "00123", " 7 ", "1e3"), la columna queda numérica:
+      float si hay vacíos o algún decimal, si no int (o bool si todos son
+      booleanos);
+    - si todos son booleanos o textos "True"/"false"/... (y el primero es
+      un texto), quedan booleanos;
+    - en otro caso los valores se conservan tal como vienen.
+    """
+    no_vacios = [valor for valor in valores if valor is not None]
+    if not no_vacios:
+        return valores
+
+    if all(isinstance(valor, (int, float)) or (isinstance(valor, str) and _NUMERO.match(valor))
+           for valor in no_vacios):
+        if all(isinstance(valor, bool) for valor in no_vacios) and len(no_vacios) == len(valores):
+            return valores
+        decimal = len(no_vacios) < len(valores) or any(
+            isinstance(valor, float) or (isinstance(valor, str) and not _ENTERO.match(valor))
+            for valor in no_vacios
+        )
+        tipo = float if decimal else int
+        return [None if valor is None else tipo(valor) for valor in valores]
+
+    # pandas solo intenta los booleanos si el primer valor es un texto
+    if isinstance(no_vacios[0], str) and all(
+            isinstance(valor, bool) or (isinstance(valor, str) and valor in _BOOLEANOS) for valor in no_vacios):
+        return [_BOOLEANOS.get(valor, valor) if isinstance(valor, str) else valor for valor in valores]
+    return valores
+
+def es_formato_fecha(formato):
+    """
+    Indica si un formato de número muestra fechas u horas (criterio de openpyxl).
+    """
+    if formato is None:
+        return False
+    formato = _SIN_LITERALES.sub('', formato.split(';')[0])
+    return re.search(r'(?<![_\\])[dmhysDMHYS]', formato) is not None
+
+def es_formato_duracion(formato):
+    """
+    Indica si un formato de número muestra duraciones, ej. [h]:mm:ss.
+    """
+    return formato is not None and _FORMATO_DURACION.search(formato.split(';')[0]) is not None
+
+def desde_serial(valor, epoca=EPOCA_WINDOWS, duracion=False):
+    """
+    Convierte un número de serie de Excel a fecha, hora o duración, como
+    openpyxl.utils.datetime.from_excel.
+    """
+    if duracion:
+        dias = timedelta(days=valor)
+        if dias.microseconds:
+            dias = timedelta(seconds=dias.total_seconds() // 1, microseconds=round(dias.microseconds, -3))
+        return dias
+    dia, fraccion = divmod(valor, 1)
+    diferencia = timedelta(milliseconds=round(fraccion * 86400 * 1000))
+    if 0 <= valor < 1 and diferencia.days == 0:
+        segundos = diferencia.seconds
+        return time(segundos // 3600, segundos // 60 % 60, segundos % 60, diferencia.microseconds)
+    # Excel cuenta el 29/02/1900, que no existió
+    if 0 < valor < 60 and epoca == EPOCA_WINDOWS:
+        dia += 1
+    return epoca + timedelta(days=dia) + diferencia
+
+def _desde_iso(texto):
+    """
+    Fecha, hora o fecha y hora de una celda t="d" (formato ISO 8601).
+    """
+    texto = texto.rstrip('Z')
+    if 'T' not in texto and ':' in texto:
+        return time.fromisoformat(texto)
+    fecha = datetime.fromisoformat(texto)
+    return fecha if 'T' in texto else fecha.date()
+
+def _indice_columna(referencia):
+    """
+    Índice (desde 0) de la columna de una referencia como "AB12".
+    """
+    indice = 0
+    for letra in _COORDENADA.match(referencia).group(1):
+        indice = indice * 26 + ord(letra) - 64
+    return indice - 1
+
+def _texto(elemento):
+    """
+    Texto de un <si> o <is>: el <t> directo más los <t> de cada <r> (sin las
+    guías fonéticas <rPh>).
+    """
+    partes = [elemento.findtext(f'{NS_HOJA}t') or '']
+    partes += [r.findtext(f'{NS_HOJA}t') or '' for r in elemento.iterfind(f'{NS_HOJA}r')]
+    return ''.join(partes)
+
+def _ruta_en_libro(destino):
+    """
+    Ruta dentro del zip de un destino de xl/_rels/workbook.xml.rels.
+    """
+    return destino.lstrip('/') if destino.startswith('/') else f"xl/{destino}"
+
+class LibroXlsx:
+    """
+    Libro .xlsx abierto para leer sus hojas fila por fila:
+        with LibroXlsx(ruta) as libro:
+            for nombre in libro.nombres_hojas:
+                for fila in libro.filas(nombre):
+                    ...
+    """
+
+    def __init__(self, ruta):
+        self.archivo = zipfile.ZipFile(ruta)
+        try:
+            self._leer_libro()
+        except BaseException:
+            self.archivo.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        self.archivo.close()
+
+    def _leer_libro(self):
+        libro = parse(self.archivo.open('xl/workbook.xml')).getroot()
+        propiedades = libro.find(f'{NS_HOJA}workbookPr')
+        fecha1904 = propiedades is not None and propiedades.get('date1904', '').lower() in ('1', 'true')
+        self.epoca = EPOCA_MAC if fecha1904 else EPOCA_WINDOWS
+
+        relaciones = {}
+        for relacion in parse(self.archivo.open('xl/_rels/workbook.xml.rels')).getroot():
+            relaciones[relacion.get('Id')] = (relacion.get('Type', '').rsplit('/', 1)[-1],
+                                              _ruta_en_libro(relacion.get('Target')))
+        rutas_por_tipo = {tipo: ruta for tipo, ruta in relaciones.values()}
+
+        # Solo las hojas de cálculo (no las de gráficos), en el orden del libro
+        self.rutas_hojas = {}
+        for hoja in libro.iterfind(f'{NS_HOJA}sheets/{NS_HOJA}sheet'):
+            tipo, ruta = relaciones[hoja.get(f'{NS_RELACION}id')]
+            if tipo == 'worksheet':
+                self.rutas_hojas[hoja.get('name')] = ruta
+        self.nombres_hojas = list(self.rutas_hojas)
+
+        self.textos = []
+        if 'sharedStrings' in rutas_por_tipo:
+            for _, elemento in iterparse(self.archivo.open(rutas_por_tipo['sharedStrings'])):
+                if elemento.tag == f'{NS_HOJA}si':
+                    self.textos.append(_texto(elemento).replace('x005F_', ''))
+                    elemento.clear()
+
+        self.estilos_fecha = set()
+        self.estilos_duracion = set()
+        if 'styles' in rutas_por_tipo:
+            estilos = parse(self.archivo.open(rutas_por_tipo['styles'])).getroot()
+            formatos = dict(FORMATOS_INTEGRADOS)
+            for formato in estilos.iterfind(f'{NS_HOJA}numFmts/{NS_HOJA}numFmt'):
+                formatos[int(formato.get('numFmtId'))] = formato.get('formatCode')
+            for indice, estilo in enumerate(estilos.iterfind(f'{NS_HOJA}cellXfs/{NS_HOJA}xf')):
+                formato = formatos.get(int(estilo.get('numFmtId', 0)))
+                if es_formato_fecha(formato):
+                    self.estilos_fecha.add(indice)
+                if es_formato_duracion(formato):
+                    self.estilos_duracion.add(indice)
+
+    def _valor(self, celda):
+        """
+        Valor de una celda <c> como lo entrega openpyxl (solo valores); las
+        celdas con error quedan en None.
+        """
+        tipo = celda.get('t', 'n')
+        if tipo == 'inlineStr':
+            texto = celda.find(f'{NS_HOJA}is')
+            return None if texto is None else _texto(texto)
+        valor = celda.findtext(f'{NS_HOJA}v') or None
+        if valor is None or tipo == 'e':
+            return None
+        if tipo == 'n':
+            numero = float(valor) if any(c in valor for c in '.eE') else int(valor)
+            estilo = int(celda.get('s', 0))
+            if estilo in self.estilos_fecha:
+                try:
+                    return desde_serial(numero, self.epoca, estilo in self.estilos_duracion)
+                except (OverflowError, ValueError):
+                    # openpyxl la marca como error (#VALUE!)
+                    return None
+            return numero
+        if tipo == 's':
+            return self.textos[int(valor)]
+        if tipo == 'b':
+            return bool(int(valor))
+        if tipo == 'd':
+            return _desde_iso(valor)
+        return valor
+
+    def filas(self, nombre_hoja):
+        """
+        Recorre las filas de una hoja como listas de valores, desde la fila 1
+        y la columna A; las filas que faltan en el archivo salen vacías.
+        """
+        numero_fila = 0
+        for _, elemento in iterparse(self.archivo.open(self.rutas_hojas[nombre_hoja])):
+            if elemento.tag != f'{NS_HOJA}row':
+                continue
+            siguiente = int(float(elemento.get('r', numero_fila + 1)))
+            for _ in range(numero_fila + 1, siguiente):
+                yield []
+            numero_fila = siguiente
+
+            fila = []
+            for celda in elemento.iterfind(f'{NS_HOJA}c'):
+                referencia = celda.get('r')
+                columna = _indice_columna(referencia) if referencia else len(fila)
+                if columna > len(fila):
+                    fila.extend([None] * (columna - len(fila)))
+                valor = self._valor(celda)
+                if columna < len(fila):
+                    fila[columna] = valor
+                else:
+                    fila.append(valor)
+            elemento.clear()
+            yield fila
+
+    def leer_hoja(self, nombre_hoja):
+        """
+        Lee una hoja completa como pd.read_excel (la primera fila es el
+        encabezado). Retorna (columnas, filas): los nombres de columnas y las
+        filas de datos como listas de valores convertidos, sin las filas
+        vacías del final. Las filas pueden ser más cortas que las columnas.
+        """
+        filas = [recortar([convertir_celda(valor) for valor in fila]) for fila in self.filas(nombre_hoja)]
+        encabezado, datos = (filas[0], filas[1:]) if filas else ([], [])
+        while datos and not datos[-1]:
+            datos.pop()
+        ancho = max([len(encabezado)] + [len(fila) for fila in datos])
+        return nombres_columnas(encabezado, ancho), datos
+
+def columna(filas, indice):
+    """
+    Valores de una columna de las filas de LibroXlsx.leer_hoja, con None en
+    las filas que no llegan hasta ella.
+    """
+    return [fila[indice] if indice < len(fila) else None for fila in filas]
+
+def iterar_hojas(excel_path):
+    """
+    Recorre las hojas del libro. Produce tuplas (nombre_hoja, encabezado,
+    filas), donde filas es un generador de listas de valores ya convertidos
+    (como lector_excel.iterar_hojas, pero sin openpyxl).
+    """
+    with LibroXlsx(excel_path) as libro:
+        for nombre in libro.nombres_hojas:
+            filas = (recortar([convertir_celda(valor) for valor in fila]) for fila in libro.filas(nombre))
+            encabezado = next(filas, [])
+            yield nombre, encabezado, filas
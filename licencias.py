@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Representación compacta de conjuntos de licencias.
+Las licencias se codifican a enteros densos (0, 1, 2, ...) y cada conjunto
+guarda un arreglo ordenado de códigos, en lugar de un set de Python.
+"""
+
+import numpy as np
+
+# Tipo de los códigos: alcanza para más de 2 mil millones de licencias distintas
+TIPO_CODIGO = np.int32
+
+class ConjuntoLicencias:
+    """
+    Conjunto inmutable de códigos de licencia guardados en un arreglo ordenado
+    y sin repetidos. Soporta len(), in, iteración y los operadores de conjuntos
+    | (unión), & (intersección) y - (diferencia).
+    """
+    __slots__ = ('codigos',)
+
+    def __init__(self, codigos=None, ordenado=False):
+        if codigos is None:
+            codigos = np.empty(0, dtype=TIPO_CODIGO)
+        elif not ordenado:
+            codigos = np.unique(np.asarray(codigos, dtype=TIPO_CODIGO))
+        self.codigos = codigos
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __iter__(self):
+        return iter(self.codigos.tolist())
+
+    def __contains__(self, codigo):
+        posicion = np.searchsorted(self.codigos, codigo)
+        return posicion < len(self.codigos) and self.codigos[posicion] == codigo
+
+    def __eq__(self, otro):
+        return isinstance(otro, ConjuntoLicencias) and np.array_equal(self.codigos, otro.codigos)
+
+    def __repr__(self):
+        return f"ConjuntoLicencias({len(self)} licencias)"
+
+    def __or__(self, otro):
+        if not len(otro):
+            return self
+        if not len(self):
+            return otro
+        return ConjuntoLicencias(np.union1d(self.codigos, otro.codigos), ordenado=True)
+
+    def __and__(self, otro):
+        return ConjuntoLicencias(np.intersect1d(self.codigos, otro.codigos, assume_unique=True), ordenado=True)
+
+    def __sub__(self, otro):
+        return ConjuntoLicencias(np.setdiff1d(self.codigos, otro.codigos, assume_unique=True), ordenado=True)
+
+class CodificadorLicencias:
+    """
+    Diccionario que asigna a cada licencia (número o texto) un código entero
+    denso. Compartir un mismo codificador entre hojas permite unir e
+    intersectar sus conjuntos directamente.
+    """
+
+    def __init__(self):
+        self.codigos = {}
+        self.valores = []
+
+    def __len__(self):
+        return len(self.valores)
+
+    def codigo(self, valor):
+        """
+        Retorna el código de una licencia, asignando uno nuevo si no existe.
+        """
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = len(self.valores)
+            self.codigos[valor] = codigo
+            self.valores.append(valor)
+        return codigo
+
+    def codificar(self, valores):
+        """
+        Convierte una secuencia de licencias en un arreglo de códigos. Con una
+        Series de pandas solo se buscan en el diccionario los valores distintos.
+        """
+        if hasattr(valores, 'factorize'):
+            posiciones, distintos = valores.factorize()
+            tabla = np.array([self.codigo(valor) for valor in distintos], dtype=TIPO_CODIGO)
+            return tabla[posiciones]
+        return np.array([self.codigo(valor) for valor in valores], dtype=TIPO_CODIGO)
+
+    def decodificar(self, conjunto):
+        """
+        Retorna la lista de licencias originales de un conjunto.
+        """
+        return [self.valores[codigo] for codigo in conjunto]
+
+def agrupar_conjuntos(tabla, columnas, columna_codigo='codigo'):
+    """
+    Agrupa una tabla de pandas por las columnas dadas y retorna un
+    ConjuntoLicencias con los códigos de cada grupo.
+    """
+    return {
+        clave: ConjuntoLicencias(codigos.to_numpy())
+        for clave, codigos in tabla.groupby(columnas, sort=False)[columna_codigo]
+    }
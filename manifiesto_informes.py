@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Manifiesto de los informes publicados y generación del menú.
+Cada informe generado se registra en manifiesto_informes.json (carpeta base,
+modalidad, semestre, nombre y ruta desde la raíz) y menu.html se reconstruye
+desde el manifiesto en una sola pasada: agregar un informe solo modifica el
+manifiesto y menu.html, que load-menu.js carga en todas las páginas.
+
+Los enlaces generados llevan el atributo data-manifiesto; el resto del menú
+(reglamentos, informe anual, etc.) se sigue editando a mano en menu.html.
+
+Uso: python manifiesto_informes.py [--agregar <ruta_html> <nombre>] [--quitar <ruta_html>] [--listar]
+Sin opciones, vuelve a generar menu.html desde el manifiesto.
+"""
+
+import html
+import json
+import os
+from html.parser import HTMLParser
+
+DIRECTORIO_RAIZ = os.path.dirname(os.path.abspath(__file__))
+RUTA_MANIFIESTO = os.path.join(DIRECTORIO_RAIZ, 'manifiesto_informes.json')
+RUTA_MENU = os.path.join(DIRECTORIO_RAIZ, 'menu.html')
+
+VERSION_MANIFIESTO = 1
+
+# Carpeta base de los informes -> menú donde se enlazan
+MENUS = {
+    'Informes': 'Informes',
+    'Resultados_validas': 'Resultados de válidas',
+    'Resultados_generales': 'Resultados generales'
+}
+
+# Otros nombres con los que se escriben las carpetas base
+ALIAS_CARPETAS = {
+    'informes': 'Informes',
+    'resultados_validas': 'Resultados_validas',
+    'resultados de válidas': 'Resultados_validas',
+    'resultados_generales': 'Resultados_generales',
+    'resultados generales': 'Resultados_generales'
+}
+
+# Atributo que marca los enlaces generados desde el manifiesto
+MARCA = 'data-manifiesto'
+
+# Clase original de un <li> simple que el manifiesto convirtió en desplegable,
+# para dejarlo como estaba cuando se queda sin informes
+MARCA_CLASE = 'data-manifiesto-clase'
+
+# Elementos sin etiqueta de cierre
+ELEMENTOS_VACIOS = {'img', 'br', 'hr', 'input', 'meta', 'link'}
+
+def entrada_informe(output_html_path, nombre_valida, project_root=DIRECTORIO_RAIZ):
+    """
+    Crea la entrada del manifiesto de un informe. output_html_path puede ser
+    absoluto, relativo a la raíz ("Informes/Motocross/...") o relativo a
+    Informes/ ("Motocross/Primer semestre/informe.html").
+    """
+    ruta = output_html_path
+    if os.path.isabs(ruta):
+        ruta = os.path.relpath(ruta, project_root)
+    partes = [p for p in ruta.replace('\\', '/').split('/') if p and p != '.']
+
+    carpeta_base = ALIAS_CARPETAS.get(partes[0].lower()) if len(partes) > 1 else None
+    if carpeta_base:
+        partes = partes[1:]
+    else:
+        # Por defecto, asumir que está en Informes/
+        carpeta_base = 'Informes'
+
+    directorios = partes[:-1]
+    return {
+        'carpeta_base': carpeta_base,
+        'modalidad': directorios[0] if len(directorios) > 0 else '',
+        'semestre': directorios[1] if len(directorios) > 1 else '',
+        'nombre': nombre_valida,
+        'ruta': '/'.join([carpeta_base] + partes)
+    }
+
+def cargar_manifiesto(ruta=RUTA_MANIFIESTO):
+    """
+    Lee el manifiesto. Si no existe, retorna uno vacío.
+    """
+    if not os.path.exists(ruta):
+        return {'version': VERSION_MANIFIESTO, 'informes': []}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def guardar_manifiesto(manifiesto, ruta=RUTA_MANIFIESTO):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+def registrar_informes(entradas, ruta=RUTA_MANIFIESTO):
+    """
+    Agrega (o actualiza, si la ruta ya estaba) los informes en el manifiesto
+    y lo guarda. Retorna el manifiesto.
+    """
+    manifiesto = cargar_manifiesto(ruta)
+    posiciones = {informe['ruta']: i for i, informe in enumerate(manifiesto['informes'])}
+    for entrada in entradas:
+        if entrada['ruta'] in posiciones:
+            manifiesto['informes'][posiciones[entrada['ruta']]] = entrada
+        else:
+            posiciones[entrada['ruta']] = len(manifiesto['informes'])
+            manifiesto['informes'].append(entrada)
+    guardar_manifiesto(manifiesto, ruta)
+    return manifiesto
+
+def quitar_informes(rutas, ruta=RUTA_MANIFIESTO):
+    """
+    Quita los informes con esas rutas (desde la raíz) del manifiesto.
+    """
+    manifiesto = cargar_manifiesto(ruta)
+    rutas = set(rutas)
+    manifiesto['informes'] = [informe for informe in manifiesto['informes'] if informe['ruta'] not in rutas]
+    guardar_manifiesto(manifiesto, ruta)
+    return manifiesto
+
+class Nodo:
+    """
+    Elemento de menu.html: etiqueta, atributos (en orden) e hijos, que son
+    otros nodos o textos. Los comentarios se guardan con etiqueta '!--'.
+    """
+    __slots__ = ('etiqueta', 'atributos', 'hijos')
+
+    def __init__(self, etiqueta, atributos=None, hijos=None):
+        self.etiqueta = etiqueta
+        self.atributos = atributos or []
+        self.hijos = hijos or []
+
+    def atributo(self, nombre):
+        return dict(self.atributos).get(nombre)
+
+    def elementos(self, etiqueta=None):
+        return [h for h in self.hijos if isinstance(h, Nodo) and (etiqueta is None or h.etiqueta == etiqueta)]
+
+    def tiene(self, nombre):
+        return any(clave == nombre for clave, _ in self.atributos)
+
+    def texto(self):
+        return ''.join(h if isinstance(h, str) else h.texto() for h in self.hijos).strip()
+
+class _LectorMenu(HTMLParser):
+    """
+    Convierte menu.html en un árbol de Nodo. Los espacios entre etiquetas se
+    descartan porque el menú se vuelve a escribir con su sangría.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.raiz = Nodo(None)
+        self.pila = [self.raiz]
+
+    def handle_starttag(self, etiqueta, atributos):
+        nodo = Nodo(etiqueta, atributos)
+        self.pila[-1].hijos.append(nodo)
+        if etiqueta not in ELEMENTOS_VACIOS:
+            self.pila.append(nodo)
+
+    def handle_startendtag(self, etiqueta, atributos):
+        self.pila[-1].hijos.append(Nodo(etiqueta, atributos))
+
+    def handle_endtag(self, etiqueta):
+        for i in range(len(self.pila) - 1, 0, -1):
+            if self.pila[i].etiqueta == etiqueta:
+                del self.pila[i:]
+                break
+
+    def handle_data(self, datos):
+        if datos.strip():
+            self.pila[-1].hijos.append(datos.strip())
+
+    def handle_comment(self, comentario):
+        self.pila[-1].hijos.append(Nodo('!--', hijos=[comentario]))
+
+def leer_menu(contenido):
+    lector = _LectorMenu()
+    lector.feed(contenido)
+    lector.close()
+    return lector.raiz
+
+def _etiqueta_apertura(nodo):
+    atributos = ''.join(
+        f' {nombre}' if valor is None else f' {nombre}="{html.escape(valor)}"'
+        for nombre, valor in nodo.atributos
+    )
+    return f"<{nodo.etiqueta}{atributos}>"
+
+def _en_linea(nodo):
+    """
+    Un nodo se escribe en una sola línea si solo tiene texto, o si es un <li>
+    con un único enlace de texto (<li><a href="...">Nombre</a></li>).
+    """
+    if all(isinstance(h, str) for h in nodo.hijos):
+        return True
+    return nodo.etiqueta == 'li' and len(nodo.hijos) == 1 and isinstance(nodo.hijos[0], Nodo) \
+        and nodo.hijos[0].etiqueta == 'a' and _en_linea(nodo.hijos[0])
+
+def _escribir_en_linea(nodo):
+    if nodo.etiqueta in ELEMENTOS_VACIOS:
+        return _etiqueta_apertura(nodo)
+    contenido = ''.join(html.escape(h, quote=False) if isinstance(h, str) else _escribir_en_linea(h) for h in nodo.hijos)
+    return f"{_etiqueta_apertura(nodo)}{contenido}</{nodo.etiqueta}>"
+
+def escribir_menu(raiz, sangria='    '):
+    """
+    Escribe el árbol del menú con cuatro espacios de sangría por nivel (el
+    formato de menu.html).
+    """
+    lineas = []
+
+    def escribir(nodo, nivel):
+        prefijo = sangria * nivel
+        if isinstance(nodo, str):
+            lineas.append(prefijo + html.escape(nodo, quote=False))
+        elif nodo.etiqueta == '!--':
+            lineas.append(f"{prefijo}<!--{nodo.hijos[0]}-->")
+        elif nodo.etiqueta in ELEMENTOS_VACIOS or (_en_linea(nodo) and nodo.etiqueta != 'ul'):
+            lineas.append(prefijo + _escribir_en_linea(nodo))
+        else:
+            lineas.append(prefijo + _etiqueta_apertura(nodo))
+            for hijo in nodo.hijos:
+                escribir(hijo, nivel + 1)
+            lineas.append(f"{prefijo}</{nodo.etiqueta}>")
+
+    for hijo in raiz.hijos:
+        escribir(hijo, 0)
+    return '\n'.join(lineas)
+
+def _submenu(li, nombre):
+    """
+    Retorna el <ul class="dropdown-menu"> del elemento de li llamado nombre.
+    Si no existe se crea, y si es un enlace simple (ej. <li><a href="#">Enduro</a></li>)
+    se convierte en desplegable: el <ul> creado lleva la marca y el <li>
+    guarda su clase original (ver _restaurar_simple).
+    """
+    ul = li.elementos('ul')[0]
+    for hijo in ul.elementos('li'):
+        enlaces = hijo.elementos('a')
+        if enlaces and enlaces[0].texto().lower() == nombre.lower() and enlaces[0].atributo('href') == '#':
+            if not hijo.elementos('ul'):
+                clase = hijo.atributo('class')
+                if clase is None:
+                    hijo.atributos.append(('class', 'dropdown'))
+                else:
+                    hijo.atributos = [(c, 'dropdown' if c == 'class' else v) for c, v in hijo.atributos]
+                hijo.atributos.append((MARCA_CLASE, clase or ''))
+                hijo.hijos.append(Nodo('ul', [('class', 'dropdown-menu'), (MARCA, None)]))
+            return hijo
+    # Los desplegables creados para el manifiesto también se marcan, para quitarlos si quedan vacíos
+    nuevo = Nodo('li', [('class', 'dropdown'), (MARCA, None)],
+                 [Nodo('a', [('href', '#')], [nombre]), Nodo('ul', [('class', 'dropdown-menu')])])
+    ul.hijos.append(nuevo)
+    return nuevo
+
+def _restaurar_simple(li):
+    """
+    Deja como estaba un <li> simple que _submenu convirtió en desplegable.
+    """
+    clase = li.atributo(MARCA_CLASE)
+    li.atributos = [(c, clase if c == 'class' else v) for c, v in li.atributos
+                    if c != MARCA_CLASE and not (c == 'class' and not clase)]
+
+def _quitar_generados(nodo):
+    nodo.hijos = [h for h in nodo.hijos if not (isinstance(h, Nodo) and h.tiene(MARCA))]
+    for hijo in nodo.elementos():
+        _quitar_generados(hijo)
+        if hijo.tiene(MARCA_CLASE) and not hijo.elementos('ul'):
+            _restaurar_simple(hijo)
+
+def _buscar_menu(raiz, titulo):
+    """
+    Busca el desplegable principal (hijo de <ul class="nav-menu">) con ese título.
+    """
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo.etiqueta == 'ul' and 'nav-menu' in (nodo.atributo('class') or '').split():
+            for li in nodo.elementos('li'):
+                enlaces = li.elementos('a')
+                if enlaces and enlaces[0].texto() == titulo and li.elementos('ul'):
+                    return li
+            return None
+        pendientes.extend(reversed(nodo.elementos()))
+    return None
+
+def construir_menu(contenido, informes):
+    """
+    Retorna menu.html con los enlaces de los informes del manifiesto: se
+    quitan los enlaces generados antes y se agregan todos los del manifiesto
+    en su menú > modalidad > semestre. Los informes de una carpeta base sin
+    menú se omiten y se retornan aparte.
+    """
+    raiz = leer_menu(contenido)
+    _quitar_generados(raiz)
+    omitidos = []
+    for informe in informes:
+        li = _buscar_menu(raiz, MENUS.get(informe['carpeta_base'], informe['carpeta_base']))
+        if li is None:
+            omitidos.append(informe)
+            continue
+        for nivel in (informe['modalidad'], informe['semestre']):
+            if nivel:
+                li = _submenu(li, nivel)
+        enlace = Nodo('a', [('href', informe['ruta'])], [informe['nombre']])
+        li.elementos('ul')[0].hijos.append(Nodo('li', [(MARCA, None)], [enlace]))
+    # Conservar el final del archivo (saltos de línea) tal como estaba
+    return escribir_menu(raiz) + (contenido[len(contenido.rstrip()):] or '\n'), omitidos
+
+def generar_menu(ruta_manifiesto=RUTA_MANIFIESTO, ruta_menu=RUTA_MENU):
+    """
+    Vuelve a generar menu.html desde el manifiesto. Solo escribe el archivo
+    si cambió. Retorna True si lo escribió.
+    """
+    with open(ruta_menu, 'r', encoding='utf-8') as f:
+        contenido = f.read()
+    nuevo_contenido, omitidos = construir_menu(contenido, cargar_manifiesto(ruta_manifiesto)['informes'])
+    for informe in omitidos:
+        print(f"  [ADVERTENCIA] No hay menú para la carpeta {informe['carpeta_base']}: {informe['ruta']}")
+    if nuevo_contenido == contenido:
+        return False
+    with open(ruta_menu, 'w', encoding='utf-8') as f:
+        f.write(nuevo_contenido)
+    return True
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manifiesto de informes y generación de menu.html")
+    parser.add_argument('--agregar', nargs=2, metavar=('RUTA_HTML', 'NOMBRE'),
+                        help="Registrar un informe (ruta desde la raíz o desde Informes/) con el nombre del menú")
+    parser.add_argument('--quitar', nargs='+', metavar='RUTA_HTML',
+                        help="Quitar informes del manifiesto")
+    parser.add_argument('--listar', action='store_true',
+                        help="Mostrar los informes del manifiesto")
+    args = parser.parse_args()
+
+    if args.agregar:
+        registrar_informes([entrada_informe(*args.agregar)])
+    if args.quitar:
+        quitar_informes([entrada_informe(ruta, '')['ruta'] for ruta in args.quitar])
+
+    if args.listar:
+        for informe in cargar_manifiesto()['informes']:
+            ubicacion = ' > '.join(p for p in (MENUS.get(informe['carpeta_base'], informe['carpeta_base']),
+                                               informe['modalidad'], informe['semestre']) if p)
+            print(f"{ubicacion} > {informe['nombre']}: {informe['ruta']}")
+    else:
+        cambio = generar_menu()
+        print("menu.html actualizado" if cambio else "menu.html ya estaba al día")
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Normalización de nombres de ligas compartida por los scripts de análisis.
+Quita tildes, convierte a mayúsculas y limpia espacios extra.
+"""
+
+import unicodedata
+from functools import lru_cache
+
+# Cantidad máxima de nombres distintos que se recuerdan ya normalizados
+TAMANO_CACHE = 1024
+
+def _sin_marcas(texto):
+    """
+    Quita las marcas diacríticas (categoría Mn) usando la descomposición NFD.
+    """
+    texto = unicodedata.normalize('NFD', texto)
+    return ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
+
+# Tabla de traducción para los caracteres latinos (Latin-1 y Latin Extended)
+# y las marcas combinantes más comunes; cubre todos los nombres de ligas.
+TABLA_SIN_TILDES = {
+    codigo: _sin_marcas(chr(codigo)) or None
+    for codigo in range(0xC0, 0x250)
+    if _sin_marcas(chr(codigo)) != chr(codigo)
+}
+TABLA_SIN_TILDES.update({codigo: None for codigo in range(0x300, 0x370)})
+
+def es_nulo(valor):
+    """
+    Indica si el valor es vacío (None, NaN, NaT o pd.NA) sin depender de pandas.
+    """
+    if valor is None:
+        return True
+    try:
+        return bool(valor != valor)
+    except TypeError:
+        # pd.NA no se puede convertir a booleano
+        return True
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _normalizar_texto(texto):
+    """
+    Normaliza un texto ya limpio. Usa la tabla de traducción y solo recurre a
+    la descomposición NFD completa si quedan caracteres fuera de la tabla.
+    """
+    traducido = texto.translate(TABLA_SIN_TILDES)
+    if not traducido.isascii():
+        traducido = _sin_marcas(texto)
+
+    # Convertir a mayúsculas para unificar
+    return traducido.upper()
+
+def normalizar_liga(nombre):
+    """
+    Normaliza el nombre de la liga: quita tildes, convierte a mayúsculas,
+    y limpia espacios extra.
+    """
+    if es_nulo(nombre) or nombre == '':
+        return None
+
+    # Convertir a string y limpiar
+    return _normalizar_texto(str(nombre).strip())
+
+def normalizar_serie(serie):
+    """
+    Normaliza una Series de pandas con nombres de ligas. Solo se normalizan
+    los valores distintos y el resultado se mapea de vuelta a cada fila.
+    """
+    normalizados = {nombre: normalizar_liga(nombre) for nombre in serie.dropna().unique()}
+    return serie.map(normalizados)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Tabla de participaciones: representación intermedia común de los extractores.
+Cada fila es una participación (una licencia en una categoría de una hoja) y
+todos los agregados de los JSON se calculan a partir de ella.
+"""
+
+import re
+
+from carga_perezosa import ModuloPerezoso
+
+# pandas se importa al construir la primera tabla: el motor ligero de las
+# válidas solo usa contar_agregados_filas y modalidad_de_hoja
+pd = ModuloPerezoso('pandas')
+
+# Columnas de la tabla de participaciones. 'codigo' es la licencia codificada
+# con un CodificadorLicencias común a todas las hojas de la ejecución.
+COLUMNAS_PARTICIPACION = ['licencia', 'codigo', 'liga', 'categoria', 'modalidad', 'edad', 'hoja']
+
+# Orden de los valores de cada participación en las tuplas de contar_agregados_filas
+COLUMNAS_FILA = ['licencia', 'liga', 'categoria', 'edad', 'hoja']
+
+def modalidad_de_hoja(nombre_hoja):
+    """
+    Obtiene la modalidad a partir del nombre de la hoja, quitando el semestre
+    si lo tiene. Ej: "Motocross 1er semestre" -> "Motocross".
+    """
+    return re.sub(r'\s+(1er|2do|primer|segundo)\s+semestre\s*$', '', str(nombre_hoja), flags=re.IGNORECASE).strip()
+
+def tabla_participaciones(bloques):
+    """
+    Une los bloques de participaciones de cada hoja en una sola tabla con las
+    columnas de COLUMNAS_PARTICIPACION.
+    """
+    bloques = [bloque for bloque in bloques if len(bloque)]
+    if not bloques:
+        return pd.DataFrame({columna: pd.Series(dtype=object) for columna in COLUMNAS_PARTICIPACION})
+    return pd.concat(bloques, ignore_index=True)[COLUMNAS_PARTICIPACION]
+
+def contar_distintos(tabla, columnas):
+    """
+    Cuenta las licencias distintas por grupo y retorna un diccionario anidado
+    con un nivel por columna, ej. {categoria: {liga: n}}. Las claves se ordenan.
+    """
+    if isinstance(columnas, str):
+        columnas = [columnas]
+    conteos = tabla.groupby(columnas, sort=False)['codigo'].nunique()
+
+    anidado = {}
+    for claves, n in conteos.items():
+        if len(columnas) == 1:
+            claves = (claves,)
+        nivel = anidado
+        for clave in claves[:-1]:
+            nivel = nivel.setdefault(clave, {})
+        nivel[claves[-1]] = int(n)
+    return ordenar(anidado)
+
+def ordenar(anidado):
+    """
+    Ordena recursivamente las claves de un diccionario anidado.
+    """
+    if not isinstance(anidado, dict):
+        return anidado
+    return {clave: ordenar(valor) for clave, valor in sorted(anidado.items())}
+
+# Dimensiones de los conteos de licencias distintas (clave del JSON -> columnas)
+DIMENSIONES = {
+    'pilotos_por_categoria': ['categoria'],
+    'deportistas_por_liga': ['liga'],
+    'deportistas_por_liga_categoria': ['categoria', 'liga']
+}
+
+# Licencias únicas por edad (no participaciones); las filas sin edad se omiten
+DIMENSION_EDAD = {'participaciones_por_edad': ['edad']}
+
+def dimensiones_conteo(con_edad=False):
+    """
+    Retorna las dimensiones que se cuentan, con la edad al final si se pide.
+    """
+    return {**DIMENSIONES, **(DIMENSION_EDAD if con_edad else {})}
+
+def contar_agregados(tabla, hojas, con_edad=False, participaciones_por_hoja=None):
+    """
+    Calcula todos los agregados de datos_informe.json a partir de la tabla de
+    participaciones, con un conteo de licencias distintas agrupado por cada
+    dimensión (y por hoja para el detalle por modalidad). 'hojas' indica las
+    hojas procesadas y su orden; una hoja sin participaciones aparece con
+    conteos en cero.
+    
+    participaciones_por_hoja: total de participaciones (con repetidos) de
+    cada hoja, para tablas compactadas por AgregadorIncremental en las que
+    las filas repetidas ya se eliminaron.
+    """
+    dimensiones = dimensiones_conteo(con_edad)
+
+    totales = {clave: contar_distintos(tabla, columnas) for clave, columnas in dimensiones.items()}
+    por_hoja = {clave: contar_distintos(tabla, ['hoja'] + columnas) for clave, columnas in dimensiones.items()}
+    unicos_por_hoja = tabla.groupby('hoja', sort=False)['codigo'].nunique()
+    if participaciones_por_hoja is None:
+        participaciones_por_hoja = tabla.groupby('hoja', sort=False).size()
+
+    datos = {
+        'total_pilotos_unicos': int(tabla['codigo'].nunique()),
+        'total_participaciones': int(sum(participaciones_por_hoja.get(hoja, 0) for hoja in hojas)),
+        'pilotos_por_categoria': totales['pilotos_por_categoria'],
+        'deportistas_por_liga_total': totales['deportistas_por_liga'],
+        'deportistas_por_liga_categoria': totales['deportistas_por_liga_categoria']
+    }
+    if con_edad:
+        datos['participaciones_por_edad'] = totales['participaciones_por_edad']
+    datos['modalidades'] = {
+        hoja: {
+            'pilotos_unicos': int(unicos_por_hoja.get(hoja, 0)),
+            'total_participaciones': int(participaciones_por_hoja.get(hoja, 0)),
+            **{clave: conteos.get(hoja, {}) for clave, conteos in por_hoja.items()}
+        }
+        for hoja in hojas
+    }
+    return datos
+
+def contar_agregados_filas(filas, hojas, con_edad=False):
+    """
+    Mismos agregados que contar_agregados, calculados con conjuntos de Python
+    a partir de una lista de participaciones (tuplas con los valores de
+    COLUMNAS_FILA) en lugar de la tabla de pandas. Lo usa el motor ligero de
+    Informes/analizar_valida.py.
+    """
+    dimensiones = dimensiones_conteo(con_edad)
+    posiciones = {columna: i for i, columna in enumerate(COLUMNAS_FILA)}
+
+    conjuntos = {clave: {} for clave in dimensiones}
+    por_hoja = {clave: {} for clave in dimensiones}
+    unicos_por_hoja = {}
+    participaciones_por_hoja = {}
+    for fila in filas:
+        licencia, hoja = fila[0], fila[4]
+        unicos_por_hoja.setdefault(hoja, set()).add(licencia)
+        participaciones_por_hoja[hoja] = participaciones_por_hoja.get(hoja, 0) + 1
+        for clave, columnas in dimensiones.items():
+            grupo = tuple(fila[posiciones[columna]] for columna in columnas)
+            # Igual que groupby: los grupos con algún valor vacío (ej. sin edad) se omiten
+            if None in grupo:
+                continue
+            conjuntos[clave].setdefault(grupo, set()).add(licencia)
+            por_hoja[clave].setdefault((hoja,) + grupo, set()).add(licencia)
+
+    def anidar(grupos):
+        anidado = {}
+        for claves, licencias in grupos.items():
+            nivel = anidado
+            for clave in claves[:-1]:
+                nivel = nivel.setdefault(clave, {})
+            nivel[claves[-1]] = len(licencias)
+        return ordenar(anidado)
+
+    totales = {clave: anidar(grupos) for clave, grupos in conjuntos.items()}
+    por_hoja = {clave: anidar(grupos) for clave, grupos in por_hoja.items()}
+
+    datos = {
+        'total_pilotos_unicos': len(set().union(*unicos_por_hoja.values())),
+        'total_participaciones': sum(participaciones_por_hoja.get(hoja, 0) for hoja in hojas),
+        'pilotos_por_categoria': totales['pilotos_por_categoria'],
+        'deportistas_por_liga_total': totales['deportistas_por_liga'],
+        'deportistas_por_liga_categoria': totales['deportistas_por_liga_categoria']
+    }
+    if con_edad:
+        datos['participaciones_por_edad'] = totales['participaciones_por_edad']
+    datos['modalidades'] = {
+        hoja: {
+            'pilotos_unicos': len(unicos_por_hoja.get(hoja, ())),
+            'total_participaciones': participaciones_por_hoja.get(hoja, 0),
+            **{clave: conteos.get(hoja, {}) for clave, conteos in por_hoja.items()}
+        }
+        for hoja in hojas
+    }
+    return datos
+
+class AgregadorIncremental:
+    """
+    Acumula bloques de participaciones. Cada cierto número de filas la tabla
+    se compacta eliminando las participaciones repetidas (misma licencia,
+    liga, categoría, edad y hoja), que no cambian ningún conteo de licencias
+    distintas; el total de participaciones con repetidos se lleva aparte por
+    hoja.
+
+    La memoria no queda acotada: en los libros reales casi no hay filas
+    repetidas, así que la tabla crece con las participaciones distintas. Se
+    conserva la tabla (y no solo los conjuntos de licencias de cada conteo)
+    porque estado_temporada y base_participaciones necesitan cada licencia
+    con su liga, categoría y edad.
+    """
+
+    def __init__(self, filas_para_compactar=50000):
+        self.filas_para_compactar = filas_para_compactar
+        self.compactada = tabla_participaciones([])
+        self.pendientes = []
+        self.filas_pendientes = 0
+        self.participaciones_por_hoja = {}
+
+    def agregar(self, bloque):
+        """
+        Agrega un bloque con las columnas de COLUMNAS_PARTICIPACION.
+        """
+        for hoja, n in bloque['hoja'].value_counts(sort=False).items():
+            self.participaciones_por_hoja[hoja] = self.participaciones_por_hoja.get(hoja, 0) + int(n)
+        self.pendientes.append(bloque)
+        self.filas_pendientes += len(bloque)
+        if self.filas_pendientes >= self.filas_para_compactar:
+            self.compactar()
+
+    def compactar(self):
+        tabla = tabla_participaciones([self.compactada] + self.pendientes)
+        self.compactada = tabla.drop_duplicates(subset=['codigo', 'liga', 'categoria', 'modalidad', 'edad', 'hoja'], ignore_index=True)
+        self.pendientes = []
+        self.filas_pendientes = 0
+
+    def tabla(self):
+        """
+        Retorna la tabla compactada con todas las participaciones agregadas.
+        """
+        self.compactar()
+        return self.compactada
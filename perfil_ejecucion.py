@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Medición de tiempos por etapa de los scripts de análisis e informes: cada
+etapa (lectura del Excel, detección de columnas, participaciones, JSON,
+HTML, menú, ...) registra su tiempo de reloj, las filas procesadas y el
+rendimiento, por hoja cuando corresponde. Al final se escribe un reporte
+JSON para comparar ejecuciones a medida que crecen los libros y,
+opcionalmente, un volcado de cProfile (se lee con pstats o snakeviz).
+
+Uso desde un script:
+    perfil = Perfil('analizar_valida.py', ruta_cprofile=args.cprofile)
+    with perfil.etapa('json'):
+        generar_json(...)
+    perfil.guardar('perfil.json')
+
+Sin --perfil los scripts usan SIN_PERFIL, que no registra nada.
+"""
+
+import cProfile
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+class Perfil:
+    """
+    Registro de etapas de una ejecución. Cada registro es un diccionario
+    {etapa, hoja, segundos, filas}; 'hoja' es None en las etapas generales.
+    Con activo=False no se registra nada (ver SIN_PERFIL).
+    """
+
+    def __init__(self, script='', ruta_cprofile=None, activo=True):
+        self.script = script
+        self.activo = activo
+        self.ruta_cprofile = ruta_cprofile
+        self.registros = []
+        self.inicio = datetime.now()
+        self._reloj = time.perf_counter()
+        self._cprofile = None
+        if activo and ruta_cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @contextmanager
+    def etapa(self, nombre, hoja=None, filas=0):
+        """
+        Mide el tiempo del bloque with. Produce el registro de la etapa para
+        completar las filas cuando se conocen al final:
+            with perfil.etapa('participaciones', hoja) as registro:
+                tabla = ...
+                registro['filas'] = len(tabla)
+        """
+        registro = {'etapa': nombre, 'hoja': hoja, 'segundos': 0.0, 'filas': filas}
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['segundos'] = time.perf_counter() - inicio
+            if self.activo:
+                self.registros.append(registro)
+
+    def iterar(self, nombre, iterable, hoja=None):
+        """
+        Recorre un iterable perezoso (ej. los bloques de una hoja) midiendo
+        solo el tiempo de producir cada elemento, que se suma en un registro
+        de la etapa; las filas son la suma de len() de los elementos.
+        """
+        if not self.activo:
+            yield from iterable
+            return
+        registro = {'etapa': nombre, 'hoja': hoja, 'segundos': 0.0, 'filas': 0}
+        self.registros.append(registro)
+        iterador = iter(iterable)
+        while True:
+            inicio = time.perf_counter()
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                registro['segundos'] += time.perf_counter() - inicio
+                return
+            registro['segundos'] += time.perf_counter() - inicio
+            registro['filas'] += len(elemento)
+            yield elemento
+
+    def agregar(self, registros, **campos):
+        """
+        Agrega registros medidos en otro proceso (ej. un trabajo del lote),
+        con campos adicionales como el informe al que pertenecen.
+        """
+        if self.activo:
+            self.registros.extend({**registro, **campos} for registro in registros)
+
+    def reporte(self):
+        """
+        Retorna el reporte de la ejecución: los registros en orden y los
+        totales por etapa y por hoja, con filas por segundo.
+        """
+        por_etapa = {}
+        por_hoja = {}
+        for registro in self.registros:
+            _acumular(por_etapa.setdefault(registro['etapa'], _total_vacio()), registro)
+            if registro['hoja'] is not None:
+                hoja = por_hoja.setdefault(registro['hoja'], {'segundos': 0.0, 'etapas': {}})
+                hoja['segundos'] += registro['segundos']
+                _acumular(hoja['etapas'].setdefault(registro['etapa'], _total_vacio()), registro)
+
+        return {
+            'script': self.script,
+            'argumentos': sys.argv[1:],
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            'segundos_total': round(time.perf_counter() - self._reloj, 4),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'etapas': [_con_rendimiento(dict(registro)) for registro in self.registros],
+            'por_etapa': {etapa: _con_rendimiento(total) for etapa, total in por_etapa.items()},
+            'por_hoja': {
+                hoja: {'segundos': round(datos['segundos'], 4),
+                       'etapas': {etapa: _con_rendimiento(total) for etapa, total in datos['etapas'].items()}}
+                for hoja, datos in por_hoja.items()
+            }
+        }
+
+    def guardar(self, ruta):
+        """
+        Escribe el reporte JSON (y el volcado de cProfile si se pidió) e
+        imprime el resumen por etapa. Retorna el reporte.
+        """
+        if self._cprofile:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.ruta_cprofile)
+        reporte = self.reporte()
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        imprimir_resumen(reporte)
+        print(f"Perfil guardado en: {ruta}")
+        if self._cprofile:
+            print(f"Volcado de cProfile en: {self.ruta_cprofile}")
+        return reporte
+
+def _total_vacio():
+    return {'segundos': 0.0, 'filas': 0, 'veces': 0}
+
+def _acumular(total, registro):
+    total['segundos'] += registro['segundos']
+    total['filas'] += registro['filas']
+    total['veces'] += 1
+
+def _con_rendimiento(datos):
+    if datos.get('filas'):
+        datos['filas_por_segundo'] = round(datos['filas'] / datos['segundos']) if datos['segundos'] else None
+    datos['segundos'] = round(datos['segundos'], 4)
+    return datos
+
+def imprimir_resumen(reporte):
+    """
+    Imprime el tiempo total de cada etapa, con su porcentaje y rendimiento.
+    Con etapas medidas en varios procesos a la vez (ej. un lote en paralelo)
+    los porcentajes pueden sumar más de 100%.
+    """
+    total = reporte['segundos_total'] or 1
+    print(f"\nTiempos por etapa ({reporte['segundos_total']:.3f} s en total):")
+    for etapa, datos in reporte['por_etapa'].items():
+        linea = f"  {etapa:<24} {datos['segundos']:>9.3f} s  {100 * datos['segundos'] / total:5.1f}%"
+        if datos.get('filas_por_segundo'):
+            linea += f"  {datos['filas']} filas ({datos['filas_por_segundo']} filas/s)"
+        print(linea)
+
+# Perfil que no registra nada, valor por defecto de las funciones que aceptan perfil
+SIN_PERFIL = Perfil(activo=False)
+
+def agregar_argumentos(parser, ruta_por_defecto):
+    """
+    Agrega --perfil (alias --profile) y --cprofile a un ArgumentParser.
+    """
+    parser.add_argument('--perfil', '--profile', nargs='?', const=ruta_por_defecto, default=None,
+                        help=f"Medir los tiempos por etapa y por hoja y guardarlos en un reporte JSON "
+                             f"(por defecto: {ruta_por_defecto})")
+    parser.add_argument('--cprofile', default=None,
+                        help="Guardar también un volcado de cProfile en esta ruta, ej. perfil.prof (implica --perfil)")
+    parser.set_defaults(perfil_por_defecto=ruta_por_defecto)
+
+def perfil_de_argumentos(args, script):
+    """
+    Crea el Perfil de un script según --perfil y --cprofile (SIN_PERFIL si
+    no se pidió ninguno). --cprofile sin --perfil deja args.perfil en la ruta
+    por defecto del reporte, para que el script lo guarde con el volcado.
+    """
+    if args.cprofile and not args.perfil:
+        args.perfil = args.perfil_por_defecto
+    if not args.perfil:
+        return SIN_PERFIL
+    return Perfil(script, ruta_cprofile=args.cprofile)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de manifiesto_informes: enlaces bajo un <li> simple del menú.
+
+Uso: python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import manifiesto_informes
+from manifiesto_informes import MARCA, construir_menu, entrada_informe, generar_menu, quitar_informes, registrar_informes
+
+MENU = """<nav class="navbar">
+    <ul class="nav-menu">
+        <li class="dropdown">
+            <a href="#">Informes</a>
+            <ul class="dropdown-menu">
+                <li id="enduro"><a href="#">Enduro</a></li>
+                <li class="destacado"><a href="#">Velocidad</a></li>
+            </ul>
+        </li>
+    </ul>
+</nav>
+"""
+
+def test_submenu_de_li_simple_se_marca_y_se_restaura(tmp_path):
+    ruta_menu = tmp_path / 'menu.html'
+    ruta_manifiesto = str(tmp_path / 'manifiesto_informes.json')
+    ruta_menu.write_text(MENU, encoding='utf-8')
+    entrada = entrada_informe('Informes/Enduro/informe_valida1.html', 'Válida 1')
+
+    registrar_informes([entrada], ruta_manifiesto)
+    assert generar_menu(ruta_manifiesto, str(ruta_menu))
+    menu = ruta_menu.read_text(encoding='utf-8')
+    assert '<li id="enduro" class="dropdown"' in menu
+    assert f'<ul class="dropdown-menu" {MARCA}>' in menu
+    assert 'href="Informes/Enduro/informe_valida1.html"' in menu
+
+    quitar_informes([entrada['ruta']], ruta_manifiesto)
+    assert generar_menu(ruta_manifiesto, str(ruta_menu))
+    assert ruta_menu.read_text(encoding='utf-8') == MENU
+
+def test_li_con_clase_recupera_su_clase():
+    entrada = entrada_informe('Informes/Velocidad/informe_valida2.html', 'Válida 2')
+    con_informe, _ = construir_menu(MENU, [entrada])
+    assert '<li class="dropdown" data-manifiesto-clase="destacado">' in con_informe
+    # Regenerar con el mismo manifiesto no cambia nada, y sin informes vuelve al original
+    assert construir_menu(con_informe, [entrada])[0] == con_informe
+    assert construir_menu(con_informe, [])[0] == MENU
+
+def test_menu_del_proyecto_no_cambia_al_regenerar():
+    with open(manifiesto_informes.RUTA_MENU, 'r', encoding='utf-8') as f:
+        contenido = f.read()
+    informes = manifiesto_informes.cargar_manifiesto()['informes']
+    assert construir_menu(contenido, informes)[0] == contenido
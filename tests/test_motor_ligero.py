@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del motor ligero de Informes/analizar_valida.py: con libros pequeños
+escritos con openpyxl, extraer_datos_ligero debe dar el mismo JSON que
+extraer_datos_excel (pd.read_excel, openpyxl y dateutil). Cada libro cubre
+una de las reglas que el motor ligero reimplementa: valores nulos, texto
+numérico, booleanos, fechas seriales (incluido el 29/02/1900 de Excel y el
+sistema 1904) y fechas escritas como texto.
+
+Uso: python -m pytest tests
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+from datetime import date, datetime, time
+
+import pytest
+from openpyxl import Workbook
+
+DIRECTORIO_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_RAIZ)
+sys.path.insert(0, os.path.join(DIRECTORIO_RAIZ, 'Informes'))
+
+import analizar_valida
+
+FECHA_REFERENCIA = datetime(2025, 12, 31)
+
+ENCABEZADO = ['Consecutivo', 'Licencia', 'Nombre', 'Liga', 'FN', 'Formatos', 'MX1', 'MX2', 'Femenina']
+
+def _filas(licencias=None, ligas=None, fechas=None, marcas=None):
+    """
+    Filas con el ENCABEZADO; los valores que no se dan se completan con
+    datos válidos para que cada libro pruebe solo una columna.
+    """
+    cantidad = max(len(valores) for valores in (licencias, ligas, fechas, marcas) if valores is not None)
+    licencias = licencias or [100 + i for i in range(cantidad)]
+    ligas = ligas or ['Antioquia', 'BOGOTA', ' bogotá ', 'Nariño'] * cantidad
+    fechas = fechas or [datetime(1990 + i % 30, 1 + i % 12, 1 + i % 28) for i in range(cantidad)]
+    marcas = marcas or [['x', None, 'X ', ' x'][i % 4] for i in range(cantidad)]
+    return [[i + 1, licencias[i], f"Piloto {i}", ligas[i], fechas[i], 'ok', marcas[i], 'x' if i % 3 == 0 else None,
+             None] for i in range(cantidad)]
+
+def libro_nulos(hoja):
+    hoja.append(ENCABEZADO)
+    for fila in _filas(licencias=[1, 'NA', 'null', 'N/A', '#N/A', '', ' ', 'None', 2, 'nan'],
+                       ligas=['Antioquia', 'Caldas', 'NULL', 'nan', 'Huila', '<NA>', 'n/a', 'Meta', 'None', 'Cauca']):
+        hoja.append(fila)
+
+def libro_texto_numerico(hoja):
+    hoja.append(ENCABEZADO)
+    for fila in _filas(licencias=['00123', '123', 123, 123.0, '1,500', '1e3', ' 45 ', 45.5, 'A-1', '7']):
+        hoja.append(fila)
+    otra = hoja.parent.create_sheet('Solo texto numérico')
+    otra.append(ENCABEZADO)
+    for fila in _filas(licencias=['10', '11', '12.0', '013', None, '14']):
+        otra.append(fila)
+
+def libro_booleanos(hoja):
+    hoja.append(ENCABEZADO)
+    for fila in _filas(licencias=[True, False, 5, 'TRUE', 'false', 6],
+                       ligas=['True', 'FALSE', 'Antioquia', True, 'Caldas', 'Meta'],
+                       marcas=[True, 'x', 1, 'x', 'TRUE', 'x']):
+        hoja.append(fila)
+    otra = hoja.parent.create_sheet('Solo booleanos')
+    otra.append(ENCABEZADO)
+    for fila in _filas(licencias=[True, False, None, True]):
+        otra.append(fila)
+
+def libro_fechas_seriales(hoja):
+    hoja.append(ENCABEZADO)
+    seriales = [1, 59, 60, 61, 366, 25000.5, 45000, 0]
+    for numero, fila in enumerate(_filas(fechas=[None] * len(seriales)), start=2):
+        hoja.append(fila)
+        hoja.cell(row=numero, column=5, value=seriales[numero - 2]).number_format = 'dd/mm/yyyy'
+    hoja.append([99, 200, 'Fecha', 'Caldas', date(1950, 2, 3), 'ok', 'x'])
+    hoja.append([100, 201, 'Hora', 'Caldas', time(10, 30), 'ok', 'x'])
+
+def libro_fechas_texto(hoja):
+    hoja.append(ENCABEZADO)
+    textos = ['2010-05-03', '03/05/2010', '31/12/2010', 'March 3, 2001', '2001-02-03 10:00', '20100102', '999',
+              '1000', '1,500', '15', 'garbage', '2000-02-30', '  2012-02-02  ', 'today', 'now', '10:30', '2010',
+              '12/31/99', 'Jan 2000', '2010-W01-1']
+    for fila in _filas(fechas=textos):
+        hoja.append(fila)
+
+def libro_fechas_mezcla(hoja):
+    hoja.append(ENCABEZADO)
+    for fila in _filas(fechas=[datetime(2001, 1, 1), '2005-06-07', 12, None, date(2003, 4, 5), 'texto', 2010, True]):
+        hoja.append(fila)
+
+def libro_disposiciones(hoja):
+    # Sin "Formatos", con LICEN de respaldo, una hoja sin Liga y una hoja vacía
+    hoja.append(['Licencia', 'LICEN', 'Liga', 'FN', 'MX1', 'Enduro', 'Club'])
+    hoja.append([None, 300, 'Antioquia', datetime(2000, 1, 1), 'x', None, 'Club A'])
+    hoja.append([301, 302, 'Caldas', None, None, 'x', 'Club B'])
+    hoja.append([None, None, 'Meta', None, 'x', 'x', None])
+    sin_liga = hoja.parent.create_sheet('Sin liga')
+    sin_liga.append(['Licencia', 'FN', 'Formatos', 'MX1'])
+    sin_liga.append([1, None, None, 'x'])
+    hoja.parent.create_sheet('Vacía')
+
+LIBROS = {
+    'nulos': libro_nulos,
+    'texto_numerico': libro_texto_numerico,
+    'booleanos': libro_booleanos,
+    'fechas_seriales': libro_fechas_seriales,
+    'fechas_texto': libro_fechas_texto,
+    'fechas_mezcla': libro_fechas_mezcla,
+    'disposiciones': libro_disposiciones
+}
+
+def _json(resultados, ruta):
+    with contextlib.redirect_stdout(io.StringIO()):
+        analizar_valida.generar_json(resultados, ruta)
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _comparar_motores(ruta_excel, directorio):
+    with contextlib.redirect_stdout(io.StringIO()):
+        completo = analizar_valida.extraer_datos_excel(ruta_excel, fecha_referencia=FECHA_REFERENCIA, usar_cache=False)
+        ligero = analizar_valida.extraer_datos_ligero(ruta_excel, fecha_referencia=FECHA_REFERENCIA, usar_cache=False)
+    datos_completo = _json(completo, os.path.join(directorio, 'completo.json'))
+    assert datos_completo['total_participaciones'] > 0
+    assert _json(ligero, os.path.join(directorio, 'ligero.json')) == datos_completo
+
+@pytest.mark.parametrize('nombre', sorted(LIBROS))
+@pytest.mark.parametrize('sistema_1904', [False, True], ids=['1900', '1904'])
+def test_motor_ligero_igual_al_completo(tmp_path, nombre, sistema_1904):
+    libro = Workbook()
+    hoja = libro.active
+    hoja.title = 'Motocross 1er semestre'
+    LIBROS[nombre](hoja)
+    if sistema_1904:
+        libro.epoch = datetime(1904, 1, 1)
+    ruta = str(tmp_path / f"{nombre}.xlsx")
+    libro.save(ruta)
+    _comparar_motores(ruta, str(tmp_path))
@@ -1,10 +1,11 @@
 import pandas as pd
+from cache_excel import abrir_excel
 
 excel_path = "Informes/Valida de ejemplo/valejempo.xlsx"
 print("Analizando Excel para verificar participaciones...")
 
-excel_file = pd.ExcelFile(excel_path)
-df = pd.read_excel(excel_file, sheet_name='Hoja1')
+excel_file = abrir_excel(excel_path)
+df = excel_file.parse('Hoja1')
 
 print(f"\nTotal de filas: {len(df)}")
 